@@ -0,0 +1,4 @@
+"""
+Benchmarks for the LLM agent demo. Run each module from the repository root, e.g.
+``python -m benchmarks.async_throughput``.
+"""
@@ -0,0 +1,75 @@
+"""
+Throughput benchmark for AsyncLLMAgent against the local mock OpenAI server.
+
+Runs N concurrent sessions on one event loop, all sharing a single AsyncOpenAI
+client, and reports completed turns per second for each concurrency level. The
+synchronous LLMAgent is measured first as a one-conversation-at-a-time baseline.
+
+Usage:
+    python -m benchmarks.async_throughput --latency 0.1 --levels 1 10 50 100 250
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+from openai import AsyncOpenAI, OpenAI
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from llm_agent import AsyncLLMAgent, LLMAgent
+
+SESSION_QUERIES = [
+    "What's the weather like in San Francisco?",
+    "What's 2 + 2?",
+]
+
+
+def run_sync_baseline(base_url: str, sessions: int) -> float:
+    """Run sessions one after another with the blocking agent and return turns/sec."""
+    client = OpenAI(base_url=base_url, api_key="mock", max_retries=0)
+    start = time.perf_counter()
+    for _ in range(sessions):
+        agent = LLMAgent(client=client, verbose=False)
+        for query in SESSION_QUERIES:
+            agent.chat(query)
+    elapsed = time.perf_counter() - start
+    return sessions * len(SESSION_QUERIES) / elapsed
+
+
+async def _run_session(agent: AsyncLLMAgent):
+    for query in SESSION_QUERIES:
+        await agent.chat(query)
+
+
+async def run_concurrent(base_url: str, concurrency: int) -> float:
+    """Run `concurrency` sessions at once on one event loop and return turns/sec."""
+    client = AsyncOpenAI(base_url=base_url, api_key="mock", max_retries=0)
+    agents = [AsyncLLMAgent(client=client, verbose=False) for _ in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*(_run_session(agent) for agent in agents))
+    elapsed = time.perf_counter() - start
+    await client.close()
+    return concurrency * len(SESSION_QUERIES) / elapsed
+
+
+def main(latency: float, levels: List[int]):
+    with MockOpenAIServer(latency=latency) as server:
+        print(f"🧪 Mock endpoint {server.base_url} (latency {latency * 1000:.0f} ms per call)")
+        print("-" * 50)
+
+        baseline = run_sync_baseline(server.base_url, sessions=min(levels))
+        print(f"{'sync LLMAgent':>20}: {baseline:8.1f} turns/s")
+
+        for concurrency in levels:
+            throughput = asyncio.run(run_concurrent(server.base_url, concurrency))
+            print(f"{f'async x{concurrency}':>20}: {throughput:8.1f} turns/s "
+                  f"({throughput / baseline:5.1f}x baseline)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark AsyncLLMAgent throughput")
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 10, 50, 100, 250])
+    args = parser.parse_args()
+    main(args.latency, args.levels)
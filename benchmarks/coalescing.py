@@ -0,0 +1,58 @@
+"""
+Request coalescing benchmark: identical concurrent chats with and without single-flight.
+
+A burst of users (one agent per thread) asks the same question at the same
+moment, as a shared dashboard would. Without coalescing every agent sends its
+own completion; with a shared SingleFlight the identical requests share one.
+
+Usage:
+    python -m benchmarks.coalescing --users 50 --latency 0.3
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from client_factory import close_shared_clients, get_openai_client
+from llm_agent import LLMAgent
+from single_flight import SingleFlight
+
+QUERY = "What's 2 + 2?"
+
+
+def run(server: MockOpenAIServer, users: int, coalescer) -> dict:
+    client = get_openai_client(api_key="mock", base_url=server.base_url)
+    agents = [LLMAgent(client=client, verbose=False, coalescer=coalescer) for _ in range(users)]
+    barrier = threading.Barrier(users)
+
+    def ask(agent):
+        barrier.wait()
+        return agent.chat(QUERY)
+
+    requests_before = server.request_count
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        list(pool.map(ask, agents))
+    return {"calls": server.request_count - requests_before, "total_ms": (time.perf_counter() - started) * 1000}
+
+
+def main(users: int, latency: float):
+    with MockOpenAIServer(latency=latency) as server:
+        print(f"🧪 {users} users asking '{QUERY}' at once, {latency * 1000:.0f} ms per call")
+        print("-" * 50)
+        coalescer = SingleFlight()
+        for label, c in (("independent", None), ("single-flight", coalescer)):
+            r = run(server, users, c)
+            print(f"{label:>14}: {r['calls']:4d} LLM calls  {r['total_ms']:7.1f} ms for the burst")
+        print(f"🔗 Leaders {coalescer.stats['leaders']}, coalesced {coalescer.stats['coalesced']}")
+    close_shared_clients()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark single-flight request coalescing")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+    main(args.users, args.latency)
@@ -0,0 +1,65 @@
+"""
+Connection setup benchmark: one client per agent vs the shared connection pool.
+
+The mock server charges a fixed delay for every new TCP connection to stand in
+for TCP/TLS handshakes to the real API. Agents that each build their own OpenAI
+client open a new connection per agent; agents on the shared pool reuse
+keep-alive connections.
+
+Usage:
+    python -m benchmarks.connection_pool --agents 20 --connect-latency 0.05
+"""
+
+import argparse
+import time
+
+from openai import OpenAI
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from client_factory import PoolConfig, close_shared_clients, configure_pool, get_openai_client
+from llm_agent import LLMAgent
+
+QUERIES = ["What's the weather like in Tokyo?", "What's 2 + 2?"]
+
+
+def run_agents(server: MockOpenAIServer, agents: int, shared: bool) -> dict:
+    """Run `agents` short conversations one after another and measure connection use."""
+    connections_before = server.connection_count
+    start = time.perf_counter()
+    for _ in range(agents):
+        if shared:
+            client = get_openai_client(api_key="mock", base_url=server.base_url)
+        else:
+            client = OpenAI(api_key="mock", base_url=server.base_url, max_retries=0)
+        agent = LLMAgent(client=client, verbose=False)
+        for query in QUERIES:
+            agent.chat(query)
+    elapsed = time.perf_counter() - start
+    turns = agents * len(QUERIES)
+    return {
+        "connections": server.connection_count - connections_before,
+        "total_s": elapsed,
+        "turn_ms": elapsed / turns * 1000
+    }
+
+
+def main(agents: int, latency: float, connect_latency: float):
+    configure_pool(PoolConfig(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30))
+    with MockOpenAIServer(latency=latency, connect_latency=connect_latency) as server:
+        print(f"🧪 Mock endpoint {server.base_url} ({latency * 1000:.0f} ms per call, "
+              f"{connect_latency * 1000:.0f} ms per new connection)")
+        print("-" * 50)
+        for label, shared in (("client per agent", False), ("shared pool", True)):
+            result = run_agents(server, agents, shared)
+            print(f"{label:>18}: {result['connections']:4d} new connections, "
+                  f"{result['total_s']:6.2f} s total, {result['turn_ms']:6.1f} ms/turn")
+    close_shared_clients()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark shared vs per-agent connection pools")
+    parser.add_argument("--agents", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--connect-latency", type=float, default=0.05)
+    args = parser.parse_args()
+    main(args.agents, args.latency, args.connect_latency)
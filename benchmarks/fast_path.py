@@ -0,0 +1,59 @@
+"""
+Intent fast path benchmark: LLM calls and turn latency with and without the pre-planner.
+
+Weather queries normally take two LLM round trips, one to choose the tool calls
+and one for the answer. With the IntentPlanner, obvious ones are planned locally
+and need only the second call; the rest fall back to the normal path.
+
+Usage:
+    python -m benchmarks.fast_path --latency 0.3
+"""
+
+import argparse
+import time
+
+from openai import OpenAI
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from intent_planner import IntentPlanner
+from llm_agent import LLMAgent
+
+QUERIES = [
+    "What's the weather like in San Francisco?",
+    "I'm planning a trip to London tomorrow. How's the weather?",
+    "Compare the weather between New York and Tokyo",
+    "What should I wear today if I'm in London?",
+    "Is it going to rain in Tokyo?",
+    "What was the weather in London last week?",
+    "What's 2 + 2?",
+]
+
+
+def run(server: MockOpenAIServer, planner) -> dict:
+    client = OpenAI(api_key="mock", base_url=server.base_url, max_retries=0)
+    agent = LLMAgent(client=client, verbose=False, intent_planner=planner)
+    requests_before = server.request_count
+    started = time.perf_counter()
+    for query in QUERIES:
+        agent.reset_conversation()
+        agent.chat(query)
+    elapsed = time.perf_counter() - started
+    return {"calls": server.request_count - requests_before, "turn_ms": elapsed / len(QUERIES) * 1000}
+
+
+def main(latency: float):
+    with MockOpenAIServer(latency=latency) as server:
+        print(f"🧪 Mock endpoint {server.base_url} ({latency * 1000:.0f} ms per call), {len(QUERIES)} queries")
+        print("-" * 50)
+        planner = IntentPlanner()
+        for label, p in (("two-call path", None), ("fast path", planner)):
+            r = run(server, p)
+            print(f"{label:>14}: {r['calls']:3d} LLM calls  {r['turn_ms']:6.1f} ms/turn")
+        print(f"⚡ Planned locally: {planner.stats['planned']}, fell back: {planner.stats['fallbacks']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the local intent fast path")
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+    main(args.latency)
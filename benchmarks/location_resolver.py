@@ -0,0 +1,86 @@
+"""
+Location resolver benchmark: fuzzy lookup latency and accuracy at gazetteer scale.
+
+Builds the resolver over N synthetic place names (plus the weather tool's real
+ones) and looks up misspelled copies of randomly chosen names, each with one or
+two edits (substitution, deletion, insertion or swap). Reports build time, mean
+and p99 lookup latency, and recall: how often a typo within the resolver's edit
+budget resolved to the original name or to another name at least as close.
+
+Usage:
+    python -m benchmarks.location_resolver --names 10000 50000 --queries 2000
+"""
+
+import argparse
+import random
+import statistics
+import string
+import time
+
+from location_resolver import LocationResolver, edit_distance, normalize
+from weather_tool import LOCATION_INDEX
+
+ONSETS = ["b", "br", "c", "ch", "d", "f", "g", "gr", "h", "k", "l", "m", "n", "p", "r", "s", "st", "t", "v", "w", "z"]
+VOWELS = ["a", "e", "i", "o", "u", "ai", "ea", "ou"]
+SUFFIXES = ["", "", "", "", "ville", "burg", "ford", "ton", "field", "stad", "grad", "ia"]
+PREFIXES = ["", "", "", "", "", "new ", "san ", "port ", "east ", "west ", "lake ", "st "]
+
+
+def place_names(count: int, rng: random.Random):
+    """The weather tool's names plus generated ones like "port brastonville"."""
+    names = set(LOCATION_INDEX)
+    while len(names) < count:
+        word = "".join(rng.choice(ONSETS) + rng.choice(VOWELS) for _ in range(rng.randint(1, 3)))
+        names.add(rng.choice(PREFIXES) + word + rng.choice(SUFFIXES))
+    return sorted(names)
+
+
+def misspell(name: str, edits: int, rng: random.Random) -> str:
+    for _ in range(edits):
+        i = rng.randrange(len(name))
+        kind = rng.choice(("substitute", "delete", "insert", "swap"))
+        if kind == "substitute":
+            name = name[:i] + rng.choice(string.ascii_lowercase) + name[i + 1:]
+        elif kind == "delete" and len(name) > 3:
+            name = name[:i] + name[i + 1:]
+        elif kind == "insert":
+            name = name[:i] + rng.choice(string.ascii_lowercase) + name[i:]
+        elif i + 1 < len(name):
+            name = name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    return name
+
+
+def main(counts, queries: int, seed: int):
+    print(f"{'names':>7} {'build s':>8} {'mean µs':>8} {'p99 µs':>8} {'recall':>7}")
+    for count in counts:
+        rng = random.Random(seed)
+        names = place_names(count, rng)
+        started = time.perf_counter()
+        resolver = LocationResolver({name: name for name in names})
+        build = time.perf_counter() - started
+
+        targets = [rng.choice(names) for _ in range(queries)]
+        typos = [misspell(target, rng.randint(1, 2), rng) for target in targets]
+        latencies, reachable, found = [], 0, 0
+        for target, typo in zip(targets, typos):
+            started = time.perf_counter()
+            match = resolver.resolve(typo)
+            latencies.append((time.perf_counter() - started) * 1e6)
+            # Typos beyond the default edit budget (a quarter of the length) aren't expected to resolve
+            budget = max(1, len(normalize(typo)) // 4)
+            distance = edit_distance(target, normalize(typo), budget)
+            if distance <= budget:
+                reachable += 1
+                found += match is not None and edit_distance(match.name, normalize(typo), budget) <= distance
+        latencies.sort()
+        print(f"{len(resolver):>7} {build:>8.2f} {statistics.mean(latencies):>8.1f} "
+              f"{latencies[int(len(latencies) * 0.99)]:>8.1f} {found / reachable:>7.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark fuzzy location resolution")
+    parser.add_argument("--names", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    main(args.names, args.queries, args.seed)
@@ -0,0 +1,301 @@
+"""
+Local mock of the OpenAI chat completions endpoint for offline benchmarks.
+
+The server answers ``POST /v1/chat/completions`` after a configurable delay that
+stands in for network and generation time. When tools are offered and the last
+message is a user query mentioning a known city, it replies with ``get_weather``
+tool calls, mirroring what gpt-4o does for the demo queries; when
+``get_weather_batch`` is offered, queries about several cities get one batch
+call instead. Requests with
+``stream: true`` are answered as server-sent events, one word per chunk.
+
+Faults can be injected to exercise the agent's resilience layer: a fraction of
+requests can fail with 429/503 (with a ``retry-after-ms`` header) and a fraction
+can be answered after a much longer "slow" delay to create a latency tail.
+Per-model delays let benchmarks compare a large model against a cheaper one,
+and a per-prompt-token delay stands in for prefill time, so larger prompts are
+answered more slowly.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from weather_tool import KNOWN_LOCATIONS
+
+
+def _tool_calls_for(query: str, request_id: int, batch: bool = False) -> List[Dict[str, Any]]:
+    """Build get_weather tool calls for each known city mentioned in the query, or one batch call."""
+    lowered = query.lower()
+    cities = [c for c in KNOWN_LOCATIONS if c in lowered]
+    if batch and len(cities) > 1:
+        return [{
+            "id": f"call_mock_{request_id}_0",
+            "type": "function",
+            "function": {"name": "get_weather_batch", "arguments": json.dumps({"locations": cities})}
+        }]
+    return [
+        {
+            "id": f"call_mock_{request_id}_{i}",
+            "type": "function",
+            "function": {"name": "get_weather", "arguments": json.dumps({"location": city})}
+        }
+        for i, city in enumerate(cities)
+    ]
+
+
+def build_completion(body: Dict[str, Any], request_id: int) -> Dict[str, Any]:
+    """
+    Build a chat.completion payload for a request body.
+
+    Args:
+        body (Dict[str, Any]): The decoded request body
+        request_id (int): Sequence number used to make ids unique
+
+    Returns:
+        Dict[str, Any]: A payload shaped like the OpenAI chat.completion object
+    """
+    messages = body.get("messages", [])
+    last = messages[-1] if messages else {"role": "user", "content": ""}
+    content = last.get("content") or ""
+
+    tool_calls = []
+    if body.get("tools") and last.get("role") == "user":
+        offered = {t.get("function", {}).get("name") for t in body["tools"]}
+        tool_calls = _tool_calls_for(content, request_id, batch="get_weather_batch" in offered)
+
+    if tool_calls:
+        message = {"role": "assistant", "content": None, "tool_calls": tool_calls}
+        finish_reason = "tool_calls"
+    elif last.get("role") == "tool":
+        message = {"role": "assistant", "content": f"Based on the weather data: {content[:80]}"}
+        finish_reason = "stop"
+    else:
+        message = {"role": "assistant", "content": f"Mock answer to: {content}"}
+        finish_reason = "stop"
+
+    prompt_tokens = sum(len(str(m.get("content") or "")) for m in messages) // 4
+    completion_tokens = len(message.get("content") or "") // 4 + 10 * len(tool_calls)
+    return {
+        "id": f"chatcmpl-mock-{request_id}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+def build_chunks(completion: Dict[str, Any], include_usage: bool) -> List[Dict[str, Any]]:
+    """
+    Split a chat.completion payload into chat.completion.chunk payloads.
+
+    Content is sent one word per chunk; each tool call is sent as a header delta
+    (id and name) followed by its arguments in two fragments.
+    """
+    choice = completion["choices"][0]
+    message = choice["message"]
+    base = {
+        "id": completion["id"],
+        "object": "chat.completion.chunk",
+        "created": completion["created"],
+        "model": completion["model"]
+    }
+
+    def chunk(delta, finish_reason=None):
+        return {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+    chunks = [chunk({"role": "assistant", "content": ""})]
+    for index, tool_call in enumerate(message.get("tool_calls") or []):
+        arguments = tool_call["function"]["arguments"]
+        middle = len(arguments) // 2
+        chunks.append(chunk({"tool_calls": [{
+            "index": index, "id": tool_call["id"], "type": "function",
+            "function": {"name": tool_call["function"]["name"], "arguments": ""}
+        }]}))
+        for fragment in (arguments[:middle], arguments[middle:]):
+            chunks.append(chunk({"tool_calls": [{"index": index, "function": {"arguments": fragment}}]}))
+    words = (message.get("content") or "").split(" ")
+    for i, word in enumerate(words if message.get("content") else []):
+        chunks.append(chunk({"content": word if i == 0 else " " + word}))
+    chunks.append(chunk({}, choice["finish_reason"]))
+    if include_usage:
+        chunks.append({**base, "choices": [], "usage": completion["usage"]})
+    return chunks
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        # Stand-in for the TCP/TLS handshake cost paid once per new connection
+        if self.server.connect_latency:
+            time.sleep(self.server.connect_latency)
+        super().setup()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+            request_id = server.request_count
+        if server.error_rate and random.random() < server.error_rate:
+            status = random.choice((429, 503))
+            self._send_json(status, {"error": {"message": "Injected failure", "code": status}},
+                            {"retry-after-ms": "50"})
+            return
+        slow = server.slow_rate and random.random() < server.slow_rate
+        latency = server.model_latency.get(body.get("model"), server.latency)
+        completion = build_completion(body, request_id)
+        prefill = completion["usage"]["prompt_tokens"] * server.prompt_token_delay
+        time.sleep((server.slow_latency if slow else latency) + prefill)
+        if body.get("stream"):
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            self._send_stream(build_chunks(completion, include_usage), server.token_delay)
+        else:
+            self._send_json(200, completion)
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, chunks: List[Dict[str, Any]], token_delay: float):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        events = [f"data: {json.dumps(chunk)}\n\n" for chunk in chunks] + ["data: [DONE]\n\n"]
+        for i, event in enumerate(events):
+            if i and token_delay:
+                time.sleep(token_delay)
+            data = event.encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, latency: float, token_delay: float, connect_latency: float,
+                 error_rate: float, slow_rate: float, slow_latency: float,
+                 model_latency: Dict[str, float], prompt_token_delay: float):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.prompt_token_delay = prompt_token_delay
+        self.model_latency = model_latency
+        self.token_delay = token_delay
+        self.connect_latency = connect_latency
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.connection_count = 0
+
+    def get_request(self):
+        request = super().get_request()
+        with self.lock:
+            self.connection_count += 1
+        return request
+
+
+class MockOpenAIServer:
+    """
+    A threaded mock OpenAI server running in the background.
+
+    Usage:
+        with MockOpenAIServer(latency=0.05) as server:
+            client = AsyncOpenAI(base_url=server.base_url, api_key="mock")
+    """
+
+    def __init__(self, latency: float = 0.05, token_delay: float = 0.0, connect_latency: float = 0.0,
+                 error_rate: float = 0.0, slow_rate: float = 0.0, slow_latency: float = 1.0,
+                 model_latency: Optional[Dict[str, float]] = None, prompt_token_delay: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            latency (float): Seconds to wait before answering each request
+            token_delay (float): Seconds between chunks of a streamed response
+            connect_latency (float): Extra seconds spent on each new connection (handshake cost)
+            error_rate (float): Fraction of requests answered with 429 or 503
+            slow_rate (float): Fraction of requests answered after slow_latency instead
+            slow_latency (float): Delay for the slow requests
+            model_latency (Dict[str, float], optional): Per-model delays overriding latency
+            prompt_token_delay (float): Extra seconds per prompt token (prefill time)
+            host (str): Interface to bind
+            port (int): Port to bind, 0 picks a free one
+        """
+        self._server = _Server((host, port), latency, token_delay, connect_latency,
+                               error_rate, slow_rate, slow_latency, model_latency or {},
+                               prompt_token_delay)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def request_count(self) -> int:
+        return self._server.request_count
+
+    @property
+    def connection_count(self) -> int:
+        """Number of TCP connections accepted so far."""
+        return self._server.connection_count
+
+    def start(self) -> "MockOpenAIServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a mock OpenAI chat completions server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(latency=args.latency, token_delay=args.token_delay,
+                              error_rate=args.error_rate, slow_rate=args.slow_rate, port=args.port)
+    print(f"🧪 Mock OpenAI server listening on {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
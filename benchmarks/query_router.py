@@ -0,0 +1,116 @@
+"""
+Query router benchmark: accuracy, latency and cost over a replayable query set.
+
+Every query in benchmarks/data/router_queries.jsonl carries the category it
+should be routed to. The benchmark reports the router's accuracy against those
+labels and how often queries that need the weather tool got it, then replays the
+set through an agent with and without the router against the mock server, where
+the cheap model answers faster than the main one. Cost is estimated from the
+prompt tokens of every request sent (tool schemas included) with the
+usage accountant's price table.
+
+Usage:
+    python -m benchmarks.query_router --latency 0.3 --cheap-latency 0.1
+"""
+
+import argparse
+import json
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+from openai import OpenAI
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from llm_agent import LLMAgent
+from query_router import DEFAULT, QueryRouter, WEATHER
+from rate_limiter import DEFAULT_COMPLETION_ESTIMATE, estimate_request_tokens
+
+QUERY_SET = Path(__file__).parent / "data" / "router_queries.jsonl"
+
+
+class MeteredAgent(LLMAgent):
+    """Agent that records the model and prompt size of every request it sends."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sent = []
+
+    def _send(self, request, timeout):
+        prompt_tokens = estimate_request_tokens(request) - DEFAULT_COMPLETION_ESTIMATE
+        self.sent.append((request["model"], prompt_tokens))
+        return super()._send(request, timeout)
+
+
+def load_queries(path: Path = QUERY_SET) -> List[Dict[str, str]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def evaluate(router: QueryRouter, queries: List[Dict[str, str]]) -> dict:
+    """Compare the router's categories with the labels."""
+    correct, needs_tools, tools_given, confusion = 0, 0, 0, Counter()
+    started = time.perf_counter()
+    for item in queries:
+        route = router.route(item["query"])
+        correct += route.category == item["label"]
+        confusion[(item["label"], route.category)] += 1
+        if item["label"] in (WEATHER, DEFAULT):
+            needs_tools += 1
+            tools_given += route.use_tools
+    elapsed = time.perf_counter() - started
+    return {
+        "accuracy": correct / len(queries),
+        "tool_recall": tools_given / needs_tools if needs_tools else 1.0,
+        "classify_us": elapsed / len(queries) * 1e6,
+        "errors": {pair: n for pair, n in confusion.items() if pair[0] != pair[1]}
+    }
+
+
+def replay(server: MockOpenAIServer, queries: List[Dict[str, str]], router) -> dict:
+    client = OpenAI(api_key="mock", base_url=server.base_url, max_retries=0)
+    agent = MeteredAgent(client=client, verbose=False, query_router=router)
+    started = time.perf_counter()
+    for item in queries:
+        agent.reset_conversation()
+        agent.chat(item["query"])
+    elapsed = time.perf_counter() - started
+    cost = sum(agent.accountant.cost(model, tokens, DEFAULT_COMPLETION_ESTIMATE) for model, tokens in agent.sent)
+    return {
+        "turn_ms": elapsed / len(queries) * 1000,
+        "calls": len(agent.sent),
+        "prompt_tokens": sum(tokens for _, tokens in agent.sent),
+        "cost": cost,
+        "models": Counter(model for model, _ in agent.sent)
+    }
+
+
+def main(latency: float, cheap_latency: float):
+    queries = load_queries()
+    result = evaluate(QueryRouter(), queries)
+    print(f"🧭 Router on {len(queries)} labelled queries: accuracy {result['accuracy']:.1%}, "
+          f"tool recall {result['tool_recall']:.1%}, {result['classify_us']:.1f} µs per query")
+    for (label, got), n in sorted(result["errors"].items()):
+        print(f"   {label} -> {got}: {n}")
+
+    with MockOpenAIServer(latency=latency, model_latency={"gpt-4o-mini": cheap_latency}) as server:
+        print(f"🧪 Mock endpoint: gpt-4o {latency * 1000:.0f} ms, gpt-4o-mini {cheap_latency * 1000:.0f} ms "
+              f"(cost assumes {DEFAULT_COMPLETION_ESTIMATE} completion tokens per call)")
+        print("-" * 50)
+        baseline = replay(server, queries, None)
+        routed = replay(server, queries, QueryRouter())
+        for label, r in (("gpt-4o + tools", baseline), ("routed", routed)):
+            models = ", ".join(f"{model} x{n}" for model, n in r["models"].items())
+            print(f"{label:>15}: {r['turn_ms']:6.1f} ms/turn  {r['prompt_tokens']:6d} prompt tokens  "
+                  f"${r['cost']:.4f}  ({models})")
+        print(f"💰 Savings: {1 - routed['cost'] / baseline['cost']:.0%} cost, "
+              f"{1 - routed['turn_ms'] / baseline['turn_ms']:.0%} latency")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the query router")
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--cheap-latency", type=float, default=0.1)
+    args = parser.parse_args()
+    main(args.latency, args.cheap_latency)
@@ -0,0 +1,84 @@
+"""
+Hit-rate and lookup-latency benchmark for the semantic cache.
+
+Replays groups of paraphrased weather questions: the first query of each group
+is answered "by the LLM" and stored, the paraphrases should then hit. Lookup
+latency is also measured with the index filled with filler entries.
+
+Usage:
+    python -m benchmarks.semantic_cache --entries 10000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from intent_planner import mentioned_places
+from semantic_cache import SemanticCache
+
+PARAPHRASE_GROUPS = [
+    ["What's the weather like in San Francisco?", "How's the weather in SF?",
+     "What is the weather in San Fransisco today?", "weather san francisco"],
+    ["What's the weather like in London?", "How is the weather in London right now?",
+     "Tell me the weather in London", "London weather?"],
+    ["What's the weather in New York?", "How's the weather in NYC?",
+     "weather for new york please"],
+    ["What's the weather in Tokyo?", "How is the weather in Tokyo today?", "Tokyo weather"],
+]
+
+# Queries that must not be answered from another group's entry
+NEGATIVE_QUERIES = ["What's 2 + 2?", "What's the weather in Paris?",
+                    "Compare the weather between New York and Tokyo"]
+
+# (stored query, query that must not reuse its answer): same wording, different places
+CITY_SWAPS = [
+    ("Compare the weather between New York and Tokyo", "Compare the weather between New York and London"),
+    ("Is it warmer in London or San Francisco right now?", "Is it warmer in London or Paris right now?"),
+    ("What should I wear today if I'm in London?", "What should I wear today if I'm in Tokyo?"),
+]
+
+
+def main(entries: int, threshold: float):
+    cache = SemanticCache(mentioned_places, threshold=threshold, max_entries=entries + 100)
+
+    for group in PARAPHRASE_GROUPS:
+        cache.store(group[0], f"answer for {group[0]}", turn_seconds=1.5)
+
+    correct = wrong = missed = 0
+    for group in PARAPHRASE_GROUPS:
+        for query in group[1:]:
+            hit = cache.lookup(query)
+            if hit is None:
+                missed += 1
+            elif hit.matched_query == group[0]:
+                correct += 1
+            else:
+                wrong += 1
+    false_hits = sum(cache.lookup(query) is not None for query in NEGATIVE_QUERIES)
+    for stored, _ in CITY_SWAPS:
+        cache.store(stored, f"answer for {stored}")
+    swapped = sum(cache.lookup(query) is not None for _, query in CITY_SWAPS)
+
+    print(f"🧠 Paraphrase hits: {correct} correct, {wrong} wrong, {missed} missed")
+    print(f"🚫 False hits on unrelated queries: {false_hits}/{len(NEGATIVE_QUERIES)}")
+    print(f"🏙️  Answers reused for another place: {swapped}/{len(CITY_SWAPS)}")
+    print(f"📊 Report: {cache.report()}")
+
+    for i in range(entries):
+        cache.store(f"filler question number {i} about topic {i * 7919 % 1000}", "filler")
+    timings = []
+    for _ in range(200):
+        started = time.perf_counter()
+        cache.lookup("How's the weather in SF?")
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f"⏱️  Lookup with {len(cache)} entries: p50 {np.percentile(timings, 50):.3f} ms, "
+          f"p95 {np.percentile(timings, 95):.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the semantic response cache")
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+    main(args.entries, args.threshold)
@@ -0,0 +1,157 @@
+"""
+Local stub of a weather HTTP service for offline tests and benchmarks.
+
+The server answers ``GET /weather?location=<name>`` with the same JSON payloads
+as the static weather table, after a configurable delay that stands in for the
+upstream service. Like the mock OpenAI server it can inject faults: a fraction
+of requests fail with 429/503 (with a ``retry-after-ms`` header) and a fraction
+are answered after a much longer "slow" delay.
+
+It is a minimal HTTP/1.1 keep-alive server on asyncio rather than a
+thread-per-connection http.server: under a load benchmark with dozens of
+persistent connections, the handler threads contend for the GIL and the stub,
+not the client, becomes the bottleneck.
+"""
+
+import argparse
+import asyncio
+import random
+import socket
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from weather_tool import StaticWeatherProvider
+
+_REASONS = {200: "OK", 400: "Bad Request", 429: "Too Many Requests", 503: "Service Unavailable"}
+
+
+class StubWeatherServer:
+    """
+    A stub weather service running on its own event loop in the background.
+
+    Usage:
+        with StubWeatherServer(latency=0.05) as server:
+            provider = HTTPWeatherProvider(server.base_url)
+    """
+
+    def __init__(self, latency: float = 0.05, error_rate: float = 0.0, slow_rate: float = 0.0,
+                 slow_latency: float = 1.0, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            latency (float): Seconds to wait before answering each request
+            error_rate (float): Fraction of requests answered with 429 or 503
+            slow_rate (float): Fraction of requests answered after slow_latency instead
+            slow_latency (float): Delay for the slow requests
+            host (str): Interface to bind
+            port (int): Port to bind, 0 picks a free one
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.provider = StaticWeatherProvider()
+        self.request_count = 0
+        self.connection_count = 0
+        self._socket = socket.create_server((host, port))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._socket.getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def _respond(self, target: str) -> Tuple[int, str, Dict[str, str]]:
+        url = urlsplit(target)
+        location = parse_qs(url.query).get("location", [""])[0]
+        if url.path.rstrip("/") != "/weather" or not location:
+            return 400, '{"error": "Use GET /weather?location=<name>"}', {}
+
+        self.request_count += 1
+        if self.error_rate and random.random() < self.error_rate:
+            return random.choice((429, 503)), '{"error": "Injected failure"}', {"retry-after-ms": "20"}
+        slow = self.slow_rate and random.random() < self.slow_rate
+        await asyncio.sleep(self.slow_latency if slow else self.latency)
+        return 200, self.provider.get(location), {}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connection_count += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                await reader.readexactly(int(headers.get("content-length", 0)))
+
+                _, target, _ = request_line.decode("latin-1").split(" ", 2)
+                status, body, extra = await self._respond(target)
+                data = body.encode()
+                head = [f"HTTP/1.1 {status} {_REASONS[status]}", "Content-Type: application/json",
+                        f"Content-Length: {len(data)}"] + [f"{name}: {value}" for name, value in extra.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + data)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError, asyncio.CancelledError):
+            # Cancelled when the server stops; end quietly
+            pass
+        finally:
+            writer.close()
+
+    def serve_forever(self):
+        """Run the server on the current thread until stop() is called."""
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(asyncio.start_server(self._handle, sock=self._socket))
+        try:
+            self._loop.run_forever()
+        finally:
+            server.close()
+            # Close the kept-alive connections still waiting for a next request
+            handlers = asyncio.all_tasks(self._loop)
+            for handler in handlers:
+                handler.cancel()
+            self._loop.run_until_complete(asyncio.gather(*handlers, return_exceptions=True))
+            self._loop.close()
+
+    def start(self) -> "StubWeatherServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "StubWeatherServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a stub weather service")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubWeatherServer(latency=args.latency, error_rate=args.error_rate,
+                               slow_rate=args.slow_rate, port=args.port)
+    print(f"🌦️  Stub weather service listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,66 @@
+"""
+Tail latency benchmark for retries and hedged requests.
+
+The mock server fails a fraction of requests with 429/503 and answers another
+fraction slowly. Each configuration runs the same number of single-call turns
+and reports the success rate and p50/p95/p99 turn latency.
+
+Usage:
+    python -m benchmarks.tail_latency --turns 200 --error-rate 0.05 --slow-rate 0.05
+"""
+
+import argparse
+import time
+
+import numpy as np
+from openai import OpenAI
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from llm_agent import LLMAgent
+from resilience import HedgePolicy, ResilientCaller, RetryPolicy
+
+CONFIGURATIONS = {
+    "no retries": lambda: ResilientCaller(RetryPolicy(max_attempts=1)),
+    "retries": lambda: ResilientCaller(RetryPolicy(base_delay=0.05)),
+    "retries + hedging": lambda: ResilientCaller(
+        RetryPolicy(base_delay=0.05), HedgePolicy(min_samples=20, default_delay=0.1)
+    ),
+}
+
+
+def run(server: MockOpenAIServer, resilience: ResilientCaller, turns: int) -> dict:
+    client = OpenAI(api_key="mock", base_url=server.base_url, max_retries=0)
+    agent = LLMAgent(client=client, verbose=False, resilience=resilience)
+    latencies, failures = [], 0
+    for _ in range(turns):
+        agent.reset_conversation()
+        started = time.perf_counter()
+        answer = agent.chat("What's 2 + 2?")
+        latencies.append((time.perf_counter() - started) * 1000)
+        failures += answer.startswith("Sorry, I encountered an error")
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {"success": 1 - failures / turns, "p50": p50, "p95": p95, "p99": p99, **resilience.stats}
+
+
+def main(turns: int, latency: float, error_rate: float, slow_rate: float, slow_latency: float):
+    with MockOpenAIServer(latency=latency, error_rate=error_rate, slow_rate=slow_rate,
+                          slow_latency=slow_latency) as server:
+        print(f"🧪 {latency * 1000:.0f} ms calls, {error_rate:.0%} errors, "
+              f"{slow_rate:.0%} slow ({slow_latency * 1000:.0f} ms)")
+        print("-" * 50)
+        for label, make in CONFIGURATIONS.items():
+            r = run(server, make(), turns)
+            print(f"{label:>18}: success {r['success']:6.1%}  p50 {r['p50']:6.0f} ms  "
+                  f"p95 {r['p95']:6.0f} ms  p99 {r['p99']:6.0f} ms  "
+                  f"retries {r['retries']}  hedges {r['hedges_fired']} ({r['hedges_won']} won)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark retries and hedged requests")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.03)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=1.0)
+    args = parser.parse_args()
+    main(args.turns, args.latency, args.error_rate, args.slow_rate, args.slow_latency)
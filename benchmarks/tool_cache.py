@@ -0,0 +1,92 @@
+"""
+Tool result cache benchmark: weather lookups saved across sessions and under bursts.
+
+Replays sessions that ask about a skewed mix of cities (a few popular ones
+asked about again and again) through agents backed by the HTTP weather
+provider and the stub weather service, with and without a shared
+ToolResultCache. Then fires a burst of concurrent identical lookups at an
+empty cache to show the stampede protection, and repeats a lookup for a city
+the service doesn't know to show the negative caching.
+
+Usage:
+    python -m benchmarks.tool_cache --sessions 40 --weather-latency 0.2
+"""
+
+import argparse
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import OpenAI
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from benchmarks.stub_weather_server import StubWeatherServer
+from client_factory import close_shared_clients
+from llm_agent import LLMAgent
+from tool_cache import ToolResultCache
+from tool_registry import default_registry
+from weather_provider import HTTPWeatherProvider
+from weather_tool import WEATHER_CACHE_POLICY, set_weather_provider
+
+CITIES = ["tokyo", "london", "new york", "san francisco"]
+WEIGHTS = [8, 4, 2, 1]
+
+
+def replay(llm: MockOpenAIServer, weather: StubWeatherServer, sessions: int, cache, seed: int) -> dict:
+    rng = random.Random(seed)
+    client = OpenAI(api_key="mock", base_url=llm.base_url, max_retries=0)
+    requests = weather.request_count
+    started = time.perf_counter()
+    for _ in range(sessions):
+        agent = LLMAgent(client=client, verbose=False, tool_cache=cache)
+        for city in rng.choices(CITIES, WEIGHTS, k=2):
+            agent.chat(f"What's the weather in {city}?")
+    return {
+        "turn_ms": (time.perf_counter() - started) / (sessions * 2) * 1000,
+        "lookups": weather.request_count - requests
+    }
+
+
+def lookups(weather: StubWeatherServer, location: str, callers: int, concurrent: bool) -> int:
+    """Identical get_weather calls through an empty cache; returns the weather requests they cost."""
+    cache = ToolResultCache()
+    arguments = json.dumps({"location": location})
+
+    def call(_):
+        return cache.call("get_weather", arguments, lambda: default_registry.execute("get_weather", arguments),
+                          WEATHER_CACHE_POLICY)
+    requests = weather.request_count
+    with ThreadPoolExecutor(max_workers=callers if concurrent else 1) as pool:
+        list(pool.map(call, range(callers)))
+    return weather.request_count - requests
+
+
+def main(sessions: int, llm_latency: float, weather_latency: float, seed: int):
+    print(f"🧪 {sessions} sessions x 2 turns, LLM {llm_latency * 1000:.0f} ms, "
+          f"weather service {weather_latency * 1000:.0f} ms")
+    print("-" * 50)
+    with MockOpenAIServer(latency=llm_latency) as llm, StubWeatherServer(latency=weather_latency) as weather:
+        previous = set_weather_provider(HTTPWeatherProvider(weather.base_url))
+        try:
+            baseline = replay(llm, weather, sessions, None, seed)
+            cache = ToolResultCache()
+            cached = replay(llm, weather, sessions, cache, seed)
+            for label, r in (("no cache", baseline), ("tool cache", cached)):
+                print(f"{label:>11}: {r['turn_ms']:6.1f} ms/turn  {r['lookups']:4d} weather requests")
+            print(f"📦 {cache.report()}")
+            print(f"🐘 Burst of 50 concurrent lookups for Tokyo: {lookups(weather, 'Tokyo', 50, True)} weather request(s)")
+            print(f"🚫 10 lookups for Atlantis (unknown): {lookups(weather, 'Atlantis', 10, False)} weather request(s)")
+        finally:
+            set_weather_provider(previous)
+            close_shared_clients()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the tool result cache")
+    parser.add_argument("--sessions", type=int, default=40)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--weather-latency", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+    main(args.sessions, args.llm_latency, args.weather_latency, args.seed)
@@ -0,0 +1,63 @@
+"""
+Tool registry microbenchmark: dispatch and schema cost as the number of tools grows.
+
+Registers N generated tools in a fresh registry and measures registration
+(schema generation and validator compilation, paid once), reading the tool
+definitions sent with every request, and dispatching a call by name.
+
+Usage:
+    python -m benchmarks.tool_dispatch --tools 1 10 50 200
+"""
+
+import argparse
+import json
+import time
+
+from tool_registry import ToolRegistry
+from weather_tool import get_weather
+
+
+def make_tool(i: int):
+    def lookup(location: str, units: str = "metric") -> str:
+        """
+        Look up a value for a location.
+
+        Args:
+            location (str): The city or location
+            units (str): Unit system
+        """
+        return location
+    lookup.__name__ = f"lookup_{i}"
+    return lookup
+
+
+def timed(fn, repeat: int) -> float:
+    """Mean microseconds per call."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main(counts, repeat: int):
+    arguments = json.dumps({"location": "tokyo"})
+    print(f"{'tools':>6} {'register µs/tool':>17} {'definitions µs':>15} {'dispatch µs':>12}")
+    for count in counts:
+        registry = ToolRegistry()
+        started = time.perf_counter()
+        registry.register(get_weather)
+        for i in range(count - 1):
+            registry.register(make_tool(i))
+        register_us = (time.perf_counter() - started) / count * 1e6
+        registry.definitions  # build the cached list once
+        definitions_us = timed(lambda: registry.definitions, repeat)
+        dispatch_us = timed(lambda: registry.execute("get_weather", arguments), repeat)
+        print(f"{count:>6} {register_us:>17.1f} {definitions_us:>15.3f} {dispatch_us:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark tool registry dispatch")
+    parser.add_argument("--tools", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.tools, args.repeat)
@@ -0,0 +1,89 @@
+"""
+Tool output encoding benchmark: prompt tokens and turn latency per encoding.
+
+First prints the size of get_weather and get_weather_batch results in every
+encoding. Then runs the demo queries, plus a multi-city one that takes the batch
+tool (the agents opt in to it), through agents that send tool results in each
+encoding. The mock endpoint charges a delay per prompt token on top of its fixed
+latency, standing in for prefill time. Reports, per turn, the tokens of the tool
+exchange, the follow-up prompt (which carries the tool messages) and the
+end-to-end turn time. Token counts use tiktoken when it is installed and a
+characters/4 estimate otherwise.
+
+Usage:
+    python -m benchmarks.tool_output --latency 0.02 --prompt-token-delay 0.0005
+"""
+
+import argparse
+import statistics
+import time
+
+from openai import OpenAI
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from benchmarks.weather_batch import RecordingAgent
+from tokens import count_tokens, tiktoken
+from tool_output import ENCODINGS, RAW_ENCODING, encode_tool_result
+from weather_tool import get_weather, get_weather_batch
+
+QUERIES = [
+    "What's the weather like in San Francisco?",
+    "I'm planning a trip to London tomorrow. How's the weather?",
+    "Compare the weather between New York and Tokyo",
+    "What should I wear today if I'm in London?",
+    "What's 2 + 2?",
+    "Weather in San Francisco, New York, London and Tokyo please",
+]
+
+
+def run(server: MockOpenAIServer, encoding: str) -> dict:
+    client = OpenAI(api_key="mock", base_url=server.base_url, max_retries=0)
+    agent = RecordingAgent(client=client, verbose=False, tool_output=encoding,
+                           opt_in_tools=["get_weather_batch"])
+    started = time.perf_counter()
+    for query in QUERIES:
+        agent.reset_conversation()
+        agent.chat(query)
+    elapsed = time.perf_counter() - started
+    return {
+        "exchange": statistics.mean(agent.exchange_tokens),
+        "follow_up": statistics.mean(agent.follow_up_tokens),
+        "turn_ms": elapsed / len(QUERIES) * 1000
+    }
+
+
+def main(latency: float, prompt_token_delay: float, rounds: int):
+    samples = {"get_weather": get_weather("San Francisco"),
+               "get_weather_batch": get_weather_batch(["San Francisco", "New York", "London", "Tokyo"])}
+    counter = "tiktoken" if tiktoken is not None else "chars/4 estimate"
+    print(f"🧪 Result size per encoding ({counter})")
+    print("-" * 50)
+    for encoding in ENCODINGS:
+        sizes = "  ".join(f"{name} {count_tokens(encode_tool_result(result, encoding)):4d} tokens"
+                          for name, result in samples.items())
+        print(f"{encoding:>16}: {sizes}")
+
+    print(f"\n🧪 {len(QUERIES)} demo queries x{rounds}, {latency * 1000:.0f} ms per LLM call "
+          f"+ {prompt_token_delay * 1000:.2f} ms per prompt token")
+    print("-" * 50)
+    with MockOpenAIServer(latency=latency, prompt_token_delay=prompt_token_delay) as server:
+        results = {}
+        for encoding in ENCODINGS:
+            runs = [run(server, encoding) for _ in range(rounds)]
+            results[encoding] = {key: statistics.mean(r[key] for r in runs) for key in runs[0]}
+    for encoding, r in results.items():
+        print(f"{encoding:>16}: {r['exchange']:6.1f} exchange tokens  follow-up prompt {r['follow_up']:6.1f}  "
+              f"{r['turn_ms']:6.1f} ms/turn")
+    raw = results[RAW_ENCODING]
+    best = min(results, key=lambda encoding: results[encoding]["exchange"])
+    print(f"📉 {best}: {1 - results[best]['exchange'] / raw['exchange']:.0%} fewer tool exchange tokens, "
+          f"{raw['turn_ms'] - results[best]['turn_ms']:.1f} ms faster turns than {RAW_ENCODING}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark tool output encodings")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--prompt-token-delay", type=float, default=0.0005)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    main(args.latency, args.prompt_token_delay, args.rounds)
@@ -0,0 +1,64 @@
+"""
+Speculative prefetch benchmark: turn latency with slow tools, with and without prefetch.
+
+The demo weather tool answers instantly, so the agent's tool calls are slowed
+down by --tool-latency to stand in for a real weather API. Without prefetch the
+tool time is added after the planning call; with prefetch, guessed calls run
+while the planning call is in flight.
+
+Usage:
+    python -m benchmarks.tool_prefetch --latency 0.2 --tool-latency 0.15
+"""
+
+import argparse
+import time
+
+from openai import OpenAI
+
+from benchmarks.fast_path import QUERIES
+from benchmarks.mock_openai_server import MockOpenAIServer
+from llm_agent import LLMAgent
+from tool_prefetch import SpeculativePrefetcher
+
+
+class SlowToolAgent(LLMAgent):
+    """Agent whose tool calls take a fixed extra delay."""
+
+    tool_latency = 0.0
+
+    def _execute_tool_call(self, tool_call) -> str:
+        time.sleep(self.tool_latency)
+        return super()._execute_tool_call(tool_call)
+
+
+def run(server: MockOpenAIServer, prefetcher, tool_latency: float) -> float:
+    client = OpenAI(api_key="mock", base_url=server.base_url, max_retries=0)
+    agent = SlowToolAgent(client=client, verbose=False, prefetcher=prefetcher)
+    agent.tool_latency = tool_latency
+    started = time.perf_counter()
+    for query in QUERIES:
+        agent.reset_conversation()
+        agent.chat(query)
+    return (time.perf_counter() - started) / len(QUERIES) * 1000
+
+
+def main(latency: float, tool_latency: float):
+    with MockOpenAIServer(latency=latency) as server:
+        print(f"🧪 {latency * 1000:.0f} ms per LLM call, {tool_latency * 1000:.0f} ms per tool call, "
+              f"{len(QUERIES)} queries")
+        print("-" * 50)
+        prefetcher = SpeculativePrefetcher()
+        for label, p in (("no prefetch", None), ("prefetch", prefetcher)):
+            print(f"{label:>12}: {run(server, p, tool_latency):6.1f} ms/turn")
+        report = prefetcher.report()
+        print(f"🔮 Hit rate {report['hit_rate']:.0%}, waste rate {report['waste_rate']:.0%} "
+              f"({report['speculated']} speculative calls, {report['wasted']} wasted)")
+        prefetcher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark speculative tool prefetch")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--tool-latency", type=float, default=0.15)
+    args = parser.parse_args()
+    main(args.latency, args.tool_latency)
@@ -0,0 +1,113 @@
+"""
+CPU-bound tool benchmark: I/O-bound tool latency while heavy tools run.
+
+A synthetic forecast-aggregation tool burns pure-Python CPU time. A burst of
+calls to it runs alongside a steady stream of get_weather lookups against the
+stub weather service, all from one event loop as in the async agent. On
+threads, the heavy calls hold the GIL the event loop needs, so the lookups
+queue behind them; in worker processes they only compete for CPU time. Reports
+the lookups' p50/p95/max latency and the wall time of the heavy burst.
+
+Usage:
+    python -m benchmarks.tool_processes --heavy-calls 8 --samples 300000 --workers 2
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from benchmarks.stub_weather_server import StubWeatherServer
+from client_factory import close_shared_clients
+from tool_registry import ToolRegistry
+from tool_runtime import ToolRuntime
+from weather_provider import HTTPWeatherProvider
+from weather_tool import WEATHER_TOOL_TIMEOUT, aget_weather, get_weather, set_weather_provider
+
+
+def aggregate_forecast(location: str, samples: int = 100000) -> str:
+    """
+    Aggregate a synthetic hourly temperature series for a location
+
+    Args:
+        location (str): The city or location
+        samples (int): Number of hourly samples to aggregate
+    """
+    rng = random.Random(location)
+    temperatures = [rng.gauss(18.0, 6.0) for _ in range(samples)]
+    ordered = sorted(temperatures)
+    return json.dumps({
+        "location": location,
+        "mean": round(statistics.fmean(temperatures), 2),
+        "p10": round(ordered[len(ordered) // 10], 2),
+        "p90": round(ordered[len(ordered) * 9 // 10], 2)
+    })
+
+
+registry = ToolRegistry()
+registry.register(aggregate_forecast, cpu_bound=True, timeout=60.0)
+registry.register(get_weather, async_function=aget_weather, timeout=WEATHER_TOOL_TIMEOUT)
+
+
+async def scenario(runtime: ToolRuntime, heavy_calls: int, samples: int, duration: float) -> dict:
+    lookups = []
+
+    async def lookup():
+        started = time.perf_counter()
+        await runtime.aexecute(registry, "get_weather", json.dumps({"location": "Tokyo"}))
+        lookups.append(time.perf_counter() - started)
+
+    async def heavy():
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            runtime.aexecute(registry, "aggregate_forecast",
+                             json.dumps({"location": f"city {i}", "samples": samples}))
+            for i in range(heavy_calls)
+        ))
+        return time.perf_counter() - started
+
+    burst = asyncio.ensure_future(heavy())
+    pending = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline or not burst.done():
+        pending.append(asyncio.ensure_future(lookup()))
+        await asyncio.sleep(0.01)
+    await asyncio.gather(*pending)
+    lookups.sort()
+    return {
+        "p50_ms": statistics.median(lookups) * 1000,
+        "p95_ms": lookups[int(len(lookups) * 0.95)] * 1000,
+        "max_ms": lookups[-1] * 1000,
+        "burst_s": burst.result()
+    }
+
+
+def main(heavy_calls: int, samples: int, workers: int, duration: float):
+    print(f"🧪 {heavy_calls} forecast aggregations of {samples} samples next to get_weather every 10 ms")
+    print("-" * 50)
+    with StubWeatherServer(latency=0.02) as weather:
+        previous = set_weather_provider(HTTPWeatherProvider(weather.base_url))
+        try:
+            for label, process_workers in (("threads", 0), (f"processes x{workers}", workers)):
+                runtime = ToolRuntime(max_workers=workers, process_workers=process_workers)
+                r = asyncio.run(scenario(runtime, heavy_calls, samples, duration))
+                print(f"{label:>13}: get_weather p50 {r['p50_ms']:6.1f} ms  p95 {r['p95_ms']:6.1f} ms  "
+                      f"max {r['max_ms']:6.1f} ms  heavy burst {r['burst_s']:5.2f} s")
+                runtime.shutdown()
+                # The shared async client belongs to the event loop that just closed
+                close_shared_clients()
+        finally:
+            set_weather_provider(previous)
+            close_shared_clients()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark process-pool execution of CPU-bound tools")
+    parser.add_argument("--heavy-calls", type=int, default=8)
+    parser.add_argument("--samples", type=int, default=300000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=1.0)
+    args = parser.parse_args()
+    main(args.heavy_calls, args.samples, args.workers, args.duration)
@@ -0,0 +1,78 @@
+"""
+Tool deadline benchmark: turn latency when the weather service sometimes hangs.
+
+The stub weather service answers a fraction of requests only after a long
+delay (--slow-latency), standing in for a service that accepts the connection
+and stalls. The HTTP provider is given a generous per-attempt timeout, so only
+the tool runtime's deadline bounds those calls. Turns run once under
+get_weather's registered deadline and once under a tight per-tool override;
+the report shows turn latency percentiles, timed-out calls and the runtime's
+per-tool latency histogram.
+
+Usage:
+    python -m benchmarks.tool_runtime --turns 40 --slow-rate 0.1 --deadline 0.5
+"""
+
+import argparse
+import statistics
+import time
+
+from openai import OpenAI
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from benchmarks.stub_weather_server import StubWeatherServer
+from client_factory import close_shared_clients
+from llm_agent import LLMAgent
+from resilience import RetryPolicy
+from tool_runtime import ToolRuntime
+from weather_provider import HTTPWeatherProvider
+from weather_tool import KNOWN_LOCATIONS, WEATHER_TOOL_TIMEOUT, set_weather_provider
+
+
+def run(llm: MockOpenAIServer, runtime: ToolRuntime, turns: int) -> dict:
+    client = OpenAI(api_key="mock", base_url=llm.base_url, max_retries=0)
+    agent = LLMAgent(client=client, verbose=False, tool_runtime=runtime)
+    latencies = []
+    for i in range(turns):
+        agent.reset_conversation()
+        started = time.perf_counter()
+        agent.chat(f"What's the weather in {KNOWN_LOCATIONS[i % len(KNOWN_LOCATIONS)]}?")
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+        "max_ms": latencies[-1] * 1000
+    }
+
+
+def main(turns: int, slow_rate: float, slow_latency: float, deadline: float):
+    print(f"🧪 {turns} turns, {slow_rate:.0%} of weather requests stall for {slow_latency:g} s")
+    print("-" * 50)
+    with MockOpenAIServer(latency=0.02) as llm, \
+            StubWeatherServer(latency=0.02, slow_rate=slow_rate, slow_latency=slow_latency) as weather:
+        retry = RetryPolicy(max_attempts=1, attempt_timeout=slow_latency * 2)
+        previous = set_weather_provider(HTTPWeatherProvider(weather.base_url, retry=retry))
+        try:
+            runtimes = {
+                f"deadline {WEATHER_TOOL_TIMEOUT:g} s": ToolRuntime(),
+                f"deadline {deadline:g} s": ToolRuntime(timeouts={"get_weather": deadline})
+            }
+            for label, runtime in runtimes.items():
+                r = run(llm, runtime, turns)
+                print(f"{label:>14}: p50 {r['p50_ms']:7.1f} ms  p95 {r['p95_ms']:7.1f} ms  "
+                      f"max {r['max_ms']:7.1f} ms  {runtime.stats['timeouts']} timed out")
+            print(runtimes[f"deadline {deadline:g} s"].format_report())
+        finally:
+            set_weather_provider(previous)
+            close_shared_clients()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark tool deadlines")
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--slow-rate", type=float, default=0.1)
+    parser.add_argument("--slow-latency", type=float, default=3.0)
+    parser.add_argument("--deadline", type=float, default=0.5)
+    args = parser.parse_args()
+    main(args.turns, args.slow_rate, args.slow_latency, args.deadline)
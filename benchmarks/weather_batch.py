@@ -0,0 +1,84 @@
+"""
+Batch weather tool benchmark: tool messages and prompt tokens of multi-city turns.
+
+Runs questions about several cities through agents offered only the default
+get_weather (one tool call and tool message per city) and agents that also opt
+in to get_weather_batch, which the mock model answers them with in a single call. Reports, per
+turn, the tool messages added, the tokens of the tool exchange (the assistant's
+tool calls and the tool messages) and the estimated prompt tokens of the
+planning request (which carries the tool schemas) and of the follow-up request.
+
+Usage:
+    python -m benchmarks.weather_batch --latency 0.02
+"""
+
+import argparse
+import statistics
+from typing import List
+
+from openai import OpenAI
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from llm_agent import LLMAgent
+from rate_limiter import DEFAULT_COMPLETION_ESTIMATE, estimate_request_tokens
+from tokens import count_message_tokens
+
+QUERIES = [
+    "Compare the weather between New York and Tokyo",
+    "Is it warmer in London or San Francisco right now?",
+    "What's the weather in Tokyo, London and New York?",
+    "Weather in San Francisco, New York, London and Tokyo please",
+]
+
+
+class RecordingAgent(LLMAgent):
+    """Agent that records the prompt size of its requests and the tool messages it adds."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.planning_tokens, self.follow_up_tokens = [], []
+        self.tool_messages, self.exchange_tokens = [], []
+
+    def _completion_request(self, messages, use_tools, stream=False, route=None):
+        request = super()._completion_request(messages, use_tools, stream, route)
+        tokens = estimate_request_tokens(request) - DEFAULT_COMPLETION_ESTIMATE
+        (self.planning_tokens if use_tools else self.follow_up_tokens).append(tokens)
+        return request
+
+    def _add_tool_results(self, tool_calls, tool_results, messages):
+        before = len(messages)
+        super()._add_tool_results(tool_calls, tool_results, messages)
+        exchange = messages[before - 1:]  # The assistant's tool calls and the tool messages
+        self.tool_messages.append(len(messages) - before)
+        self.exchange_tokens.append(sum(count_message_tokens(m) for m in exchange))
+
+
+def run(server: MockOpenAIServer, opt_in_tools: List[str]) -> RecordingAgent:
+    client = OpenAI(api_key="mock", base_url=server.base_url, max_retries=0)
+    agent = RecordingAgent(client=client, verbose=False, opt_in_tools=opt_in_tools)
+    for query in QUERIES:
+        agent.reset_conversation()
+        agent.chat(query)
+    return agent
+
+
+def main(latency: float):
+    print(f"🧪 {len(QUERIES)} multi-city queries, {latency * 1000:.0f} ms per LLM call")
+    print("-" * 50)
+    with MockOpenAIServer(latency=latency) as server:
+        results = {label: run(server, opt_in_tools)
+                   for label, opt_in_tools in (("get_weather", []), ("batch tool", ["get_weather_batch"]))}
+    for label, agent in results.items():
+        print(f"{label:>12}: {statistics.mean(agent.tool_messages):4.2f} tool messages/turn  "
+              f"{statistics.mean(agent.exchange_tokens):6.1f} exchange tokens  "
+              f"planning prompt {statistics.mean(agent.planning_tokens):6.1f}  "
+              f"follow-up prompt {statistics.mean(agent.follow_up_tokens):6.1f}")
+    before, after = (sum(agent.exchange_tokens) for agent in results.values())
+    print(f"📉 Tool exchange tokens: {1 - after / before:.0%} fewer with get_weather_batch")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the batch weather tool")
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+    main(args.latency)
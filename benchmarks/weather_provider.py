@@ -0,0 +1,94 @@
+"""
+Weather provider load benchmark against the local stub weather service.
+
+Sends the same number of get_weather lookups three ways:
+    - blocking HTTP calls on a 4-thread pool, as the sync agent's tool executor runs them
+    - the async provider, with up to --concurrency lookups in flight on one event loop
+    - the async provider while the stub fails a fraction of requests with 429/503,
+      to show the retries hiding the errors
+Reports throughput, p50/p95 latency per lookup, the connections the shared
+pool opened, and the retries and failed lookups (answered with an error payload).
+The shared pool keeps --concurrency connections alive, so they are reused
+instead of reopened.
+
+Usage:
+    python -m benchmarks.weather_provider --lookups 500 --latency 0.05 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from benchmarks.stub_weather_server import StubWeatherServer
+from client_factory import PoolConfig, close_shared_clients, configure_pool
+from weather_provider import HTTPWeatherProvider
+from weather_tool import KNOWN_LOCATIONS
+
+
+def timed_get(provider: HTTPWeatherProvider, location: str) -> float:
+    started = time.perf_counter()
+    provider.get(location)
+    return time.perf_counter() - started
+
+
+async def timed_aget(provider: HTTPWeatherProvider, location: str, semaphore: asyncio.Semaphore) -> float:
+    async with semaphore:
+        started = time.perf_counter()
+        await provider.aget(location)
+        return time.perf_counter() - started
+
+
+def run_threads(provider: HTTPWeatherProvider, locations: List[str]) -> List[float]:
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        return list(pool.map(lambda location: timed_get(provider, location), locations))
+
+
+async def run_async(provider: HTTPWeatherProvider, locations: List[str], concurrency: int) -> List[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*(timed_aget(provider, location, semaphore) for location in locations))
+
+
+def report(label: str, server: StubWeatherServer, provider: HTTPWeatherProvider, run) -> float:
+    requests, connections = server.request_count, server.connection_count
+    started = time.perf_counter()
+    latencies = sorted(run())
+    elapsed = time.perf_counter() - started
+    print(f"{label:>16}: {len(latencies) / elapsed:7.1f} lookups/s  "
+          f"p50 {statistics.median(latencies) * 1000:6.1f} ms  "
+          f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.1f} ms  "
+          f"{server.request_count - requests:4d} requests  "
+          f"{server.connection_count - connections:3d} new connections  "
+          f"retries {provider.stats['retries']}  failed {provider.stats['failures']}")
+    close_shared_clients()
+    return len(latencies) / elapsed
+
+
+def main(lookups: int, latency: float, concurrency: int, error_rate: float):
+    locations = [KNOWN_LOCATIONS[i % len(KNOWN_LOCATIONS)] for i in range(lookups)]
+    print(f"🌦️  {lookups} lookups, {latency * 1000:.0f} ms per request")
+    print("-" * 50)
+    configure_pool(PoolConfig(max_keepalive_connections=concurrency))
+    with StubWeatherServer(latency=latency) as server:
+        provider = HTTPWeatherProvider(server.base_url)
+        baseline = report("threads x4", server, provider, lambda: run_threads(provider, locations))
+        provider = HTTPWeatherProvider(server.base_url)
+        pooled = report(f"async x{concurrency}", server, provider,
+                        lambda: asyncio.run(run_async(provider, locations, concurrency)))
+    with StubWeatherServer(latency=latency, error_rate=error_rate) as server:
+        provider = HTTPWeatherProvider(server.base_url)
+        report(f"{error_rate:.0%} errors", server, provider,
+               lambda: asyncio.run(run_async(provider, locations, concurrency)))
+    print(f"⚡ Async provider: {pooled / baseline:.1f}x the throughput of blocking calls")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the HTTP weather provider")
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    args = parser.parse_args()
+    main(args.lookups, args.latency, args.concurrency, args.error_rate)
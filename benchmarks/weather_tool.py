@@ -0,0 +1,85 @@
+"""
+get_weather microbenchmark: precomputed payloads vs building and serializing per call.
+
+The legacy implementation below is the original get_weather: it rebuilds the
+weather dict literal and runs json.dumps(..., indent=2) on every call. The
+current one resolves the location through the alias index and returns a
+payload serialized once at import. Reports mean latency per call and the peak
+memory allocated during a single call (tracemalloc).
+
+Usage:
+    python -m benchmarks.weather_tool --calls 200000
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from weather_tool import get_weather
+
+LOCATIONS = ["San Francisco", "new york", "London", "tokyo", "Paris"]
+
+
+def legacy_get_weather(location: str) -> str:
+    """The original implementation, kept for comparison."""
+    weather_data = {
+        "san francisco": {"location": "San Francisco, CA", "temperature": "68°F (20°C)",
+                          "condition": "Partly cloudy", "humidity": "65%", "wind": "12 mph NW",
+                          "forecast": "Mild and pleasant with some clouds"},
+        "new york": {"location": "New York, NY", "temperature": "72°F (22°C)", "condition": "Sunny",
+                     "humidity": "58%", "wind": "8 mph SW", "forecast": "Clear skies and comfortable temperatures"},
+        "london": {"location": "London, UK", "temperature": "59°F (15°C)", "condition": "Light rain",
+                   "humidity": "78%", "wind": "15 mph W", "forecast": "Typical London weather with light showers"},
+        "tokyo": {"location": "Tokyo, Japan", "temperature": "75°F (24°C)", "condition": "Clear",
+                  "humidity": "62%", "wind": "6 mph E", "forecast": "Beautiful clear day with mild temperatures"}
+    }
+    location_key = location.lower().strip()
+    if location_key in weather_data:
+        return json.dumps(weather_data[location_key], indent=2)
+    return json.dumps({
+        "location": location, "temperature": "72°F (22°C)", "condition": "Unknown", "humidity": "60%",
+        "wind": "10 mph", "forecast": f"Weather data not available for {location}, but it's probably nice!"
+    }, indent=2)
+
+
+def latency_us(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for i in range(calls):
+        fn(LOCATIONS[i % len(LOCATIONS)])
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def peak_bytes(fn) -> float:
+    """Mean peak allocation of a single call across the benchmark locations."""
+    for location in LOCATIONS:
+        fn(location)  # warm caches
+    tracemalloc.start()
+    peaks = []
+    for location in LOCATIONS:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        fn(location)
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    return sum(peaks) / len(peaks)
+
+
+def main(calls: int):
+    for location in LOCATIONS:
+        assert get_weather(location) == legacy_get_weather(location), location
+    print(f"🌡️  get_weather over {calls} calls ({', '.join(LOCATIONS)})")
+    print("-" * 50)
+    results = {}
+    for label, fn in (("legacy", legacy_get_weather), ("precomputed", get_weather)):
+        results[label] = (latency_us(fn, calls), peak_bytes(fn))
+        print(f"{label:>12}: {results[label][0]:6.2f} µs/call  {results[label][1]:8.0f} bytes peak per call")
+    speedup = results["legacy"][0] / results["precomputed"][0]
+    print(f"⚡ {speedup:.1f}x faster")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark get_weather")
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+    main(args.calls)
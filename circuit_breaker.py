@@ -0,0 +1,232 @@
+"""
+Circuit breakers and fallback model routing for LLM calls.
+
+Each model gets a CircuitBreaker that watches a sliding window of recent calls.
+When too many of them failed or were slower than the latency threshold, the
+breaker opens and ModelRouter sends requests to the configured fallback model
+instead of waiting on the struggling one. After a cool-down the breaker goes
+half-open and lets a probe request through to the primary model; a successful
+probe closes it again.
+
+State transitions are counted in ``stats``, exported as an OpenTelemetry counter
+and recorded as events on the current span when OpenTelemetry is installed.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from resilience import is_retryable
+
+try:
+    from opentelemetry import metrics, trace
+except ImportError:  # OpenTelemetry is optional
+    metrics = trace = None
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_transition_counter = None
+if metrics is not None:
+    _transition_counter = metrics.get_meter("llm_agent.circuit_breaker").create_counter(
+        "llm.circuit_breaker.transitions",
+        description="Circuit breaker state transitions"
+    )
+
+
+class CircuitBreaker:
+    """
+    Error-rate and latency circuit breaker for one model or endpoint.
+
+    Usage:
+        breaker = CircuitBreaker("gpt-4o", latency_threshold=10.0)
+        if breaker.allow_request():
+            with breaker.track():
+                ...
+    """
+
+    def __init__(self, name: str, failure_rate_threshold: float = 0.5,
+                 latency_threshold: Optional[float] = None, window: int = 20,
+                 min_calls: int = 5, open_seconds: float = 30.0, half_open_max_calls: int = 1):
+        """
+        Args:
+            name (str): Model or endpoint the breaker protects
+            failure_rate_threshold (float): Share of failed or slow calls in the window that opens the breaker
+            latency_threshold (float, optional): Calls slower than this many seconds count as failures
+            window (int): Number of recent calls considered
+            min_calls (int): Calls needed in the window before the breaker can open
+            open_seconds (float): How long the breaker stays open before probing the model again
+            half_open_max_calls (int): Concurrent probe requests allowed while half-open
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.latency_threshold = latency_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)  # True for a failed or slow call
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "failures": 0, "slow_calls": 0, "rejected": 0,
+                      "opened": 0, "half_opened": 0, "closed": 0}
+
+    def _transition(self, state: str):
+        previous, self.state = self.state, state
+        self.stats[{OPEN: "opened", HALF_OPEN: "half_opened", CLOSED: "closed"}[state]] += 1
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state != HALF_OPEN:
+            self._probes = 0
+        if state == CLOSED:
+            self._outcomes.clear()
+
+        attributes = {"breaker": self.name, "from_state": previous, "to_state": state}
+        if _transition_counter is not None:
+            _transition_counter.add(1, attributes)
+        if trace is not None:
+            trace.get_current_span().add_event("circuit_breaker.state_change", attributes)
+
+    def allow_request(self) -> bool:
+        """
+        Whether a request may be sent to this model now.
+
+        An open breaker turns half-open once its cool-down has passed; a half-open
+        breaker admits a limited number of probe requests.
+        """
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self._transition(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def record(self, latency: float, failed: bool = False):
+        """
+        Record the outcome of a call.
+
+        Args:
+            latency (float): Seconds the call took
+            failed (bool): The call raised a transient error
+        """
+        with self._lock:
+            slow = self.latency_threshold is not None and latency > self.latency_threshold
+            self.stats["calls"] += 1
+            self.stats["failures"] += failed
+            self.stats["slow_calls"] += slow and not failed
+            bad = failed or slow
+
+            if self.state == HALF_OPEN:
+                self._transition(OPEN if bad else CLOSED)
+                return
+            if self.state == OPEN:
+                # A request sent while open (no fallback left) says nothing new
+                return
+            self._outcomes.append(bad)
+            if (len(self._outcomes) >= self.min_calls
+                    and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate_threshold):
+                self._transition(OPEN)
+
+    def release(self, answered: bool = False):
+        """
+        Settle a call that has no outcome for the window, giving back its probe slot.
+
+        Args:
+            answered (bool): The model responded (e.g. a 400 or 401), which completes a
+                half-open probe and closes the breaker; otherwise (cancelled, e.g. a losing
+                hedge) the slot is freed for another probe
+        """
+        with self._lock:
+            if self.state != HALF_OPEN:
+                return
+            if answered:
+                self._transition(CLOSED)
+            elif self._probes:
+                self._probes -= 1
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """
+        Time the enclosed call and record it; only transient errors count as failures.
+
+        Every exit settles the call, so a half-open probe that ends in a non-transient
+        error or is cancelled can't leave the breaker half-open with no probe slot.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as exc:
+            if is_retryable(exc):
+                self.record(time.perf_counter() - started, failed=True)
+            else:
+                self.release(answered=True)
+            raise
+        except BaseException:
+            # asyncio.CancelledError, KeyboardInterrupt: no outcome to record
+            self.release()
+            raise
+        self.record(time.perf_counter() - started)
+
+
+class ModelRouter:
+    """
+    Routes each request to the first model in its fallback chain whose breaker allows it.
+
+    Usage:
+        router = ModelRouter({"gpt-4o": "gpt-4o-mini"}, latency_threshold=10.0)
+        agent = LLMAgent(router=router)
+    """
+
+    def __init__(self, fallbacks: Optional[Dict[str, str]] = None, **breaker_options):
+        """
+        Args:
+            fallbacks (Dict[str, str], optional): Model -> model to use while its breaker is open.
+                Chains are followed, e.g. {"gpt-4o": "gpt-4o-mini", "gpt-4o-mini": "gpt-3.5-turbo"}.
+            **breaker_options: Settings passed to every CircuitBreaker
+        """
+        self.fallbacks = fallbacks or {}
+        self.breaker_options = breaker_options
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self.stats = {"routed": 0, "fallbacks": 0}
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        """The breaker for a model, created on first use."""
+        with self._lock:
+            if model not in self._breakers:
+                self._breakers[model] = CircuitBreaker(model, **self.breaker_options)
+            return self._breakers[model]
+
+    def route(self, model: str) -> str:
+        """
+        Pick the model to send a request for `model` to.
+
+        Returns:
+            str: `model` if its breaker allows the call, otherwise the first fallback
+                that does (or the end of the chain when every breaker is open)
+        """
+        self.stats["routed"] += 1
+        chosen, seen = model, {model}
+        while not self.breaker(chosen).allow_request():
+            fallback = self.fallbacks.get(chosen)
+            if fallback is None or fallback in seen:
+                break
+            chosen = fallback
+            seen.add(chosen)
+        if chosen != model:
+            self.stats["fallbacks"] += 1
+        return chosen
+
+    def report(self) -> Dict[str, Dict]:
+        """Breaker state and counters per model."""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {b.name: {"state": b.state, **b.stats} for b in breakers}
@@ -0,0 +1,179 @@
+"""
+Process-wide OpenAI client factory with a shared HTTP connection pool.
+
+Building a new OpenAI client per agent means a new connection pool per agent,
+so every agent pays its own TCP/TLS handshakes. The factory hands out clients
+that share one tunable httpx pool, keeping warm connections alive between
+agents, demo runs and sessions.
+
+Pool settings can be tuned in code with PoolConfig or through environment
+variables:
+    LLM_POOL_MAX_CONNECTIONS   (default 100)
+    LLM_POOL_MAX_KEEPALIVE     (default 20)
+    LLM_POOL_KEEPALIVE_EXPIRY  (seconds, default 30)
+    LLM_HTTP2                  ("1" to enable, requires the h2 package)
+"""
+
+import os
+import threading
+import warnings
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Connection pool and timeout settings shared by all clients."""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    timeout: float = 60.0
+    connect_timeout: float = 5.0
+
+    @classmethod
+    def from_env(cls) -> "PoolConfig":
+        """Build a config from LLM_POOL_* / LLM_HTTP2 environment variables."""
+        return cls(
+            max_connections=int(os.getenv("LLM_POOL_MAX_CONNECTIONS", cls.max_connections)),
+            max_keepalive_connections=int(os.getenv("LLM_POOL_MAX_KEEPALIVE", cls.max_keepalive_connections)),
+            keepalive_expiry=float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", cls.keepalive_expiry)),
+            http2=os.getenv("LLM_HTTP2", "0").lower() in ("1", "true", "yes")
+        )
+
+    def httpx_options(self) -> dict:
+        """Keyword arguments for httpx.Client / httpx.AsyncClient."""
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                warnings.warn("LLM_HTTP2 requested but the h2 package is not installed; using HTTP/1.1")
+                http2 = False
+        return {
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry
+            ),
+            "timeout": httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            "http2": http2
+        }
+
+
+_lock = threading.Lock()
+_config: Optional[PoolConfig] = None
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+_clients: Dict[Tuple[str, Optional[str], Optional[str]], object] = {}
+
+
+def configure_pool(config: PoolConfig):
+    """
+    Set the pool configuration used for clients created from now on.
+
+    Existing shared clients are closed so the next request builds a fresh pool.
+    """
+    global _config
+    close_shared_clients()
+    with _lock:
+        _config = config
+
+
+def pool_config() -> PoolConfig:
+    """The active pool configuration."""
+    global _config
+    with _lock:
+        if _config is None:
+            _config = PoolConfig.from_env()
+        return _config
+
+
+def get_http_client() -> httpx.Client:
+    """The process-wide synchronous httpx client."""
+    global _http_client
+    config = pool_config()
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(**config.httpx_options())
+        return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    The process-wide asynchronous httpx client.
+
+    Async connections belong to the event loop that opened them, so use the shared
+    async client from one long-lived loop (or call close_shared_clients() between loops).
+    """
+    global _async_http_client
+    config = pool_config()
+    with _lock:
+        if _async_http_client is None:
+            _async_http_client = httpx.AsyncClient(**config.httpx_options())
+        return _async_http_client
+
+
+def get_openai_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> OpenAI:
+    """
+    Get an OpenAI client that shares the process-wide connection pool.
+
+    Args:
+        api_key (str, optional): OpenAI API key. If not provided, will use OPENAI_API_KEY env var.
+        base_url (str, optional): Alternative API endpoint
+
+    Returns:
+        OpenAI: A client cached per (api_key, base_url)
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    key = ("sync", api_key, base_url)
+    http_client = get_http_client()
+    with _lock:
+        if key not in _clients:
+            # Retries are handled by the agent's ResilientCaller, not the SDK
+            _clients[key] = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0)
+        return _clients[key]
+
+
+def get_async_openai_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> AsyncOpenAI:
+    """
+    Get an AsyncOpenAI client that shares the process-wide async connection pool.
+
+    Args:
+        api_key (str, optional): OpenAI API key. If not provided, will use OPENAI_API_KEY env var.
+        base_url (str, optional): Alternative API endpoint
+
+    Returns:
+        AsyncOpenAI: A client cached per (api_key, base_url)
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    key = ("async", api_key, base_url)
+    http_client = get_async_http_client()
+    with _lock:
+        if key not in _clients:
+            _clients[key] = AsyncOpenAI(
+                api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0
+            )
+        return _clients[key]
+
+
+def close_shared_clients():
+    """
+    Close the shared pools and forget the cached clients.
+
+    Agents built without a client re-acquire one on their next request; clients
+    handed out earlier and held elsewhere are closed with the pool.
+    """
+    global _http_client, _async_http_client
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+        # AsyncClient.aclose() needs the loop that owns its connections; dropping the
+        # reference lets them be garbage collected instead.
+        _http_client = None
+        _async_http_client = None
+        _clients.clear()
@@ -0,0 +1,145 @@
+"""
+Token-budgeted conversation history.
+
+Each message's token count is computed once when it is added and kept next to
+it, so the running total is always known and trimming only has to pop the
+oldest turns off the front of a deque. Evicted turns can optionally be folded
+into a rolling summary that is sent ahead of the remaining history.
+"""
+
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from tokens import count_message_tokens, count_tokens
+
+# Summarizer signature: (previous_summary, evicted_messages) -> new_summary
+Summarizer = Callable[[str, List[Dict[str, Any]]], str]
+
+SUMMARY_PREFIX = "Summary of earlier conversation:\n"
+
+
+def _first_sentence(text: str, max_chars: int = 160) -> str:
+    sentence = text.strip().split("\n")[0].split(". ")[0]
+    return sentence if len(sentence) <= max_chars else sentence[:max_chars - 3] + "..."
+
+
+def extractive_summarizer(previous_summary: str, evicted: List[Dict[str, Any]]) -> str:
+    """
+    Local summarizer that keeps one line per evicted turn.
+
+    Args:
+        previous_summary (str): The summary so far
+        evicted (List[Dict[str, Any]]): Messages that just left the history
+
+    Returns:
+        str: The summary with a line appended for each evicted user/assistant pair
+    """
+    lines = [previous_summary] if previous_summary else []
+    question = None
+    for message in evicted:
+        if message["role"] == "user":
+            question = _first_sentence(message.get("content") or "")
+        elif message["role"] == "assistant" and message.get("content"):
+            answer = _first_sentence(message["content"])
+            lines.append(f"- User asked: {question}; assistant answered: {answer}" if question
+                         else f"- Assistant said: {answer}")
+            question = None
+    return "\n".join(lines)
+
+
+class ConversationHistory:
+    """
+    Conversation history trimmed to a token budget instead of a message count.
+
+    Usage:
+        history = ConversationHistory(max_tokens=2000, summarize=True)
+        history.append({"role": "user", "content": "Hi"})
+        messages = history.messages()
+    """
+
+    def __init__(self, max_tokens: int = 2000, summarize: bool = False,
+                 summarizer: Optional[Summarizer] = None, summary_max_tokens: int = 300,
+                 model: str = "gpt-4o"):
+        """
+        Args:
+            max_tokens (int): Token budget for history plus summary
+            summarize (bool): Fold evicted turns into a rolling summary instead of dropping them
+            summarizer (Summarizer, optional): Custom summarizer, defaults to extractive_summarizer
+            summary_max_tokens (int): Oldest summary lines are dropped beyond this size
+            model (str): Model whose tokenizer is used for counting
+        """
+        self.max_tokens = max_tokens
+        self.summarize = summarize
+        self.summarizer = summarizer or extractive_summarizer
+        self.summary_max_tokens = summary_max_tokens
+        self.model = model
+        self.summary = ""
+        self._summary_tokens = 0
+        self._entries = deque()  # (message, token_count)
+        self._total_tokens = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_tokens(self) -> int:
+        """Tokens currently held by the history and the summary."""
+        return self._total_tokens + self._summary_tokens
+
+    def append(self, message: Dict[str, Any]):
+        """
+        Add a message and trim the oldest turns if the budget is exceeded.
+
+        Args:
+            message (Dict[str, Any]): A chat message dict
+        """
+        tokens = count_message_tokens(message, self.model)
+        self._entries.append((message, tokens))
+        self._total_tokens += tokens
+        self._trim()
+
+    def extend(self, messages: List[Dict[str, Any]]):
+        for message in messages:
+            self.append(message)
+
+    def _pop_turn(self) -> List[Dict[str, Any]]:
+        """Remove the oldest message plus any non-user messages that belong to its turn."""
+        evicted = []
+        while self._entries:
+            message, tokens = self._entries[0]
+            if evicted and message["role"] == "user":
+                break
+            self._entries.popleft()
+            self._total_tokens -= tokens
+            evicted.append(message)
+        return evicted
+
+    def _trim(self):
+        # Always keep the most recent turn, even if it alone exceeds the budget
+        while self.total_tokens > self.max_tokens and len(self._entries) > 2:
+            turn = self._pop_turn()
+            if self.summarize:
+                # The summary counts against the budget, so re-check after folding each turn in
+                self._set_summary(self.summarizer(self.summary, turn))
+
+    def _set_summary(self, summary: str):
+        lines = summary.split("\n")
+        while len(lines) > 1 and count_tokens("\n".join(lines), self.model) > self.summary_max_tokens:
+            lines.pop(0)
+        self.summary = "\n".join(lines)
+        self._summary_tokens = count_message_tokens(
+            {"role": "system", "content": SUMMARY_PREFIX + self.summary}, self.model
+        )
+
+    def messages(self) -> List[Dict[str, Any]]:
+        """The messages to send, with the rolling summary first when there is one."""
+        messages = [message for message, _ in self._entries]
+        if self.summary:
+            messages.insert(0, {"role": "system", "content": SUMMARY_PREFIX + self.summary})
+        return messages
+
+    def clear(self):
+        self._entries.clear()
+        self._total_tokens = 0
+        self.summary = ""
+        self._summary_tokens = 0
@@ -0,0 +1,199 @@
+"""
+Deterministic pre-planner for obvious weather queries.
+
+For "What's the weather like in San Francisco?" the first LLM round trip only
+decides to call get_weather("san francisco"). IntentPlanner makes that decision
+locally: when the query clearly asks about the weather and every place it names
+is in the weather tool's location index (names and aliases such as "NYC"), it returns the tool calls the model
+would have made. The agent runs them up front and only needs the final LLM call.
+Anything less certain returns no plan and takes the normal two-call path.
+When the agent offers get_weather_batch (an opt-in tool), queries about
+several places are planned as one get_weather_batch call instead of one
+get_weather call per place.
+"""
+
+import json
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from query_router import LOCATION_PATTERN as _LOCATION_PATTERN, WEATHER_PATTERN
+from weather_tool import match_location, resolve_location
+
+# The tool only knows current conditions
+_PAST_PATTERN = re.compile(
+    r"\b(yesterday|last (week|month|year|night)|ago|historical|history|record|average)\b", re.IGNORECASE
+)
+_FUTURE_PATTERN = re.compile(
+    r"\b(tomorrow|tonight|later|forecasts?|upcoming|weekend|next (week|month|year|few days|\w+day)"
+    r"|(on|this|coming) (mon|tues|wednes|thurs|fri|satur|sun)day|in \d+ (days|hours|weeks))\b",
+    re.IGNORECASE
+)
+# Capitalized words that are not place names
+_NOT_PLACES = {
+    "I", "I'm", "I'll", "I'd", "It", "It's", "My", "Me", "We", "Hi", "Hey", "Please", "Also", "And", "Or", "The",
+    "What", "What's", "How", "How's", "Which", "When", "Where", "Why", "Who", "If", "In", "On", "At", "For",
+    "Is", "Are", "Was", "Were", "Will", "Would", "Should", "Could", "Can", "Do", "Does", "Did", "Any",
+    "Compare", "Tell", "Give", "Show", "Check", "Get", "Weather", "Temperature", "Forecast",
+    "Today", "Tomorrow", "Tonight",
+}
+_CAPITALIZED_PATTERN = re.compile(r"\b[A-Z][\w']*")
+# Place slots written in any case: "in paris", "london and paris", "paris vs london"
+_SLOT_PATTERN = re.compile(
+    r"\b(?:in|at|near|around|for|from|to|and|or|between|vs\.?|versus)\s+([a-z][\w'-]*)"
+    r"|\b([a-z][\w'-]*)\s+(?:vs\.?|versus)\b",
+    re.IGNORECASE
+)
+# Words that fill a slot without being a place ("in the morning", "to wear")
+_NOT_PLACE_WORDS = {word.lower() for word in _NOT_PLACES} | {
+    "a", "an", "my", "your", "our", "this", "that", "these", "those", "there", "here", "it", "them",
+    "me", "us", "you", "general", "now", "right", "tomorrow", "today", "tonight", "morning", "afternoon",
+    "evening", "night", "week", "weekend", "later", "next", "last", "go", "be", "wear", "bring", "pack",
+    "take", "know", "see", "get", "check", "compare", "expect", "plan", "travel", "visit", "both", "either",
+    "how", "what", "which", "each", "every", "some", "trip", "work", "school", "home", "outside", "inside",
+}
+# Runs of capitalized words ("Buenos Aires")
+_CAPITALIZED_RUN_PATTERN = re.compile(r"\b[A-Z][\w']*(?:\s+[A-Z][\w']*)*")
+
+
+def extract_locations(query: str) -> List[str]:
+    """
+    Find the known locations mentioned in a query.
+
+    Args:
+        query (str): The user's query
+
+    Returns:
+        List[str]: Weather table keys in order of first mention, without duplicates
+    """
+    return list(dict.fromkeys(resolve_location(match) for match in _LOCATION_PATTERN.findall(query)))
+
+
+def mentioned_places(query: str) -> FrozenSet[str]:
+    """
+    Every place a query may be about, known or not.
+
+    Known locations are folded to their table keys ("NYC" and "New York" are both
+    "new york"). Other capitalized words, and words in a place slot in any case
+    ("weather in paris"), are fuzzy-matched against the index ("San Fransisco")
+    and otherwise kept as they are, lowercased. Used to tell apart queries that
+    differ only in the place they name.
+
+    Args:
+        query (str): The user's query
+
+    Returns:
+        FrozenSet[str]: Table keys and lowercased unknown names
+    """
+    places = set(extract_locations(query))
+    remainder = _LOCATION_PATTERN.sub(" , ", query)
+    for run in _CAPITALIZED_RUN_PATTERN.findall(remainder):
+        words = [word for word in run.split() if word not in _NOT_PLACES]
+        if not words:
+            continue
+        match = match_location(" ".join(words))
+        places.add(match.key if match is not None else " ".join(words).lower())
+    for word in _slot_words(remainder):
+        match = match_location(word)
+        places.add(match.key if match is not None else word)
+    return frozenset(places)
+
+
+def _slot_words(remainder: str) -> List[str]:
+    """Words filling a place slot, in any case, in a query with its known locations removed."""
+    words = ((match.group(1) or match.group(2)).lower() for match in _SLOT_PATTERN.finditer(remainder))
+    return [word for word in words
+            if word not in _NOT_PLACE_WORDS and not WEATHER_PATTERN.fullmatch(word) and not word.isdigit()]
+
+
+@dataclass(frozen=True)
+class ToolPlan:
+    """Tool calls planned without the LLM and how sure the planner is about them."""
+
+    tool_calls: List[Dict[str, Any]]
+    locations: List[str]
+    confidence: float
+
+
+class IntentPlanner:
+    """
+    Plans get_weather calls for queries that obviously need them.
+
+    Usage:
+        planner = IntentPlanner()
+        agent = LLMAgent(intent_planner=planner)
+    """
+
+    def __init__(self, min_confidence: float = 0.9):
+        """
+        Args:
+            min_confidence (float): Plans below this confidence are discarded
+        """
+        self.min_confidence = min_confidence
+        self._lock = threading.Lock()
+        self.stats = {"planned": 0, "fallbacks": 0}
+
+    def confidence(self, query: str, locations: List[str]) -> float:
+        """
+        Score how safe it is to skip the planning call.
+
+        Args:
+            query (str): The user's query
+            locations (List[str]): Known locations found in the query
+
+        Returns:
+            float: 1.0 for a clear current-weather question about known places only,
+                lower when the query may name other places or asks about the past or a later date
+        """
+        if not locations or not WEATHER_PATTERN.search(query):
+            return 0.0
+        score = 1.0
+        remainder = _LOCATION_PATTERN.sub(" , ", query)
+        if (any(word not in _NOT_PLACES for word in _CAPITALIZED_PATTERN.findall(remainder))
+                or _slot_words(remainder)):
+            # Possibly a place the index does not know; let the model decide
+            score -= 0.5
+        if _PAST_PATTERN.search(query) or _FUTURE_PATTERN.search(query):
+            score -= 0.5
+        return max(score, 0.0)
+
+    def plan(self, query: str, batch: bool = False) -> Optional[ToolPlan]:
+        """
+        Plan the tool calls for a query.
+
+        Args:
+            query (str): The user's query
+            batch (bool): Plan one get_weather_batch call for queries about several
+                locations; only when the model is offered that tool
+
+        Returns:
+            Optional[ToolPlan]: One get_weather call per known location in the order
+                they are mentioned (one get_weather_batch call for all of them in batch
+                mode), or None when the planner is not confident enough
+        """
+        locations = extract_locations(query)
+        confidence = self.confidence(query, locations)
+        with self._lock:
+            if confidence < self.min_confidence:
+                self.stats["fallbacks"] += 1
+                return None
+            self.stats["planned"] += 1
+
+        # Deterministic ids keep identical turns byte-identical for caching and coalescing
+        if batch and len(locations) > 1:
+            tool_calls = [{
+                "id": "call_local_0",
+                "type": "function",
+                "function": {"name": "get_weather_batch", "arguments": json.dumps({"locations": locations})}
+            }]
+            return ToolPlan(tool_calls, locations, confidence)
+        tool_calls = [
+            {
+                "id": f"call_local_{i}",
+                "type": "function",
+                "function": {"name": "get_weather", "arguments": json.dumps({"location": location})}
+            }
+            for i, location in enumerate(locations)
+        ]
+        return ToolPlan(tool_calls, locations, confidence)
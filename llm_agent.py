@@ -2,12 +2,36 @@
 LLM Agent demonstration using OpenAI's reasoning model with tool usage.
 """
 
-import os
+import asyncio
 import json
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
-from weather_tool import get_weather, WEATHER_TOOL_DEFINITION
-from prompt_templates import SYSTEM_PROMPT_TEMPLATE, format_prompt
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future
+from typing import List, Dict, Any, Optional, Iterator, AsyncIterator, Callable, Union
+import openai
+from openai import OpenAI, AsyncOpenAI
+from openai.types.chat import ChatCompletionMessage
+import weather_tool  # noqa: F401  (registers get_weather)
+from tool_registry import ToolRegistry, default_registry
+from tool_cache import ToolResultCache
+from tool_runtime import ToolRuntime, default_runtime
+from tool_output import ENCODINGS, RAW_ENCODING, encode_tool_result
+from prompt_templates import SYSTEM_PROMPT_TEMPLATE, LEGACY_LAYOUT, CACHE_FRIENDLY_LAYOUT, build_messages
+from streaming import StreamAccumulator
+from tool_executor import ToolExecutor
+from response_cache import ResponseCache, make_cache_key
+from semantic_cache import SemanticCache
+from conversation_history import ConversationHistory
+from client_factory import get_openai_client, get_async_openai_client
+from resilience import ResilientCaller
+from rate_limiter import RateLimiter, estimate_request_tokens, shared_rate_limiter
+from circuit_breaker import ModelRouter
+from query_router import QueryRouter, Route, DEFAULT
+from intent_planner import IntentPlanner
+from tool_prefetch import Prefetch, SpeculativePrefetcher
+from single_flight import SingleFlight
+from usage_accounting import UsageAccountant
 
 """
 OpenInference Semantic Conventions for LLM Tracing
@@ -97,17 +121,136 @@ class LLMAgent:
     A simple LLM agent that uses OpenAI's reasoning model and has access to weather tools.
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, client: Optional[OpenAI] = None,
+                 verbose: bool = True, max_parallel_tools: int = 4,
+                 response_cache: Optional[ResponseCache] = None,
+                 semantic_cache: Optional[SemanticCache] = None,
+                 prompt_layout: str = LEGACY_LAYOUT,
+                 history_token_budget: int = 2000, summarize_history: bool = False,
+                 resilience: Optional[ResilientCaller] = None,
+                 rate_limiter: Optional[Union[RateLimiter, Callable[[str], RateLimiter]]] = None,
+                 router: Optional[ModelRouter] = None,
+                 query_router: Optional[QueryRouter] = None,
+                 intent_planner: Optional[IntentPlanner] = None,
+                 prefetcher: Optional[SpeculativePrefetcher] = None,
+                 coalescer: Optional[SingleFlight] = None,
+                 accountant: Optional[UsageAccountant] = None,
+                 tool_registry: Optional[ToolRegistry] = None,
+                 tool_cache: Optional[ToolResultCache] = None,
+                 tool_runtime: Optional[ToolRuntime] = None,
+                 tool_output: Optional[str] = None,
+                 opt_in_tools: Optional[List[str]] = None):
         """
         Initialize the LLM agent.
         
         Args:
             api_key (str, optional): OpenAI API key. If not provided, will use OPENAI_API_KEY env var.
+            client (OpenAI, optional): Pre-built client. Defaults to a client on the shared connection pool.
+            verbose (bool): Whether to print progress messages while chatting.
+            max_parallel_tools (int): Maximum number of tool calls from one turn run at the same time.
+            response_cache (ResponseCache, optional): Cache consulted before every non-streamed LLM call.
+            semantic_cache (SemanticCache, optional): Cache of answers to similar earlier queries.
+            prompt_layout (str): LEGACY_LAYOUT puts the query in the system prompt; CACHE_FRIENDLY_LAYOUT
+                keeps the system prompt and tools byte-stable so provider prefix caching can hit.
+            history_token_budget (int): Maximum tokens of conversation history sent with each request.
+            summarize_history (bool): Fold turns evicted from the history into a rolling summary.
+            resilience (ResilientCaller, optional): Retry/hedging layer for LLM calls. Defaults to
+                retries with backoff and no hedging; share one instance to share latency statistics.
+            rate_limiter (RateLimiter or Callable, optional): Client-side RPM/TPM limiting. Either
+                a model -> RateLimiter factory such as shared_rate_limiter, giving every model
+                its own budget shared by the whole process, or one RateLimiter for this agent's
+                model (other models routed to then use shared_rate_limiter).
+            router (ModelRouter, optional): Circuit breakers that route calls to a fallback
+                model while the primary one is failing or slow.
+            query_router (QueryRouter, optional): Picks the model, prompt template and whether
+                to attach tools for each turn. Without one every turn uses gpt-4o with tools.
+            intent_planner (IntentPlanner, optional): Plans get_weather calls locally for
+                obvious weather queries so they skip the first LLM round trip.
+            prefetcher (SpeculativePrefetcher, optional): Runs likely tool calls while the
+                planning LLM request is in flight and reuses the results that match.
+            coalescer (SingleFlight, optional): Share one instance between agents so identical
+                concurrent requests share a single in-flight completion.
+            accountant (UsageAccountant, optional): Records tokens and cost of every LLM call.
+                Defaults to a private one; share one instance for process-wide totals.
+            tool_registry (ToolRegistry, optional): Tools offered to the model, defaults to
+                every tool registered with @tool (get_weather).
+            tool_cache (ToolResultCache, optional): Reuses results of tools that registered a
+                cache policy (get_weather); share one instance between agents and sessions.
+            tool_runtime (ToolRuntime, optional): Runs tool calls against per-tool deadlines and
+                records their latency, and runs CPU-bound tools in worker processes when given
+                process_workers. Defaults to the process-wide runtime (30 s default deadline, threads only).
+            tool_output (str, optional): Encoding of every tool result in tool messages (see
+                tool_output.ENCODINGS). Defaults to each tool's own (@tool(output=...)).
+            opt_in_tools (List[str], optional): Opt-in tools to offer as well, e.g.
+                ["get_weather_batch"] for models that batch multi-city lookups. Without them
+                the requests carry only the default tools' schemas.
         """
-        self.client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+        # Without a pre-built client the shared one is looked up on every request, so the
+        # agent moves to the fresh pool after close_shared_clients() or configure_pool()
+        self._client = client
+        self._api_key = api_key
+        self.client  # fail fast on a missing API key
         self.model = "gpt-4o"  # Using OpenAI's reasoning model
-        self.tools = [WEATHER_TOOL_DEFINITION]
-        self.conversation_history = []
+        self.temperature = 0.7
+        self.tool_registry = tool_registry or default_registry
+        self.tool_cache = tool_cache
+        self.tool_runtime = tool_runtime or default_runtime
+        unknown = [name for name in opt_in_tools or () if name not in self.tool_registry]
+        if unknown:
+            raise ValueError(f"Unknown opt-in tools: {unknown}")
+        self.opt_in_tools = tuple(opt_in_tools or ())
+        if tool_output is not None and tool_output not in ENCODINGS:
+            raise ValueError(f"Unknown tool output encoding {tool_output!r}, expected one of {list(ENCODINGS)}")
+        self.tool_output = tool_output
+        self.history = ConversationHistory(
+            max_tokens=history_token_budget, summarize=summarize_history, model=self.model
+        )
+        self.verbose = verbose
+        self.stream_stats = deque(maxlen=100)  # Timing of recent streamed LLM calls
+        self.tool_executor = ToolExecutor(max_parallel=max_parallel_tools)
+        self.response_cache = response_cache
+        self.semantic_cache = semantic_cache
+        self.prompt_layout = prompt_layout
+        self.resilience = resilience or ResilientCaller()
+        self.rate_limiter = rate_limiter
+        self.router = router
+        self.query_router = query_router
+        self.intent_planner = intent_planner
+        self.prefetcher = prefetcher
+        self.coalescer = coalescer
+        self.accountant = accountant or UsageAccountant()
+        self.session_id = uuid.uuid4().hex[:12]
+        self.turn = 0
+        self.prompt_cache_log = deque(maxlen=100)  # (prompt_tokens, cached_tokens) of recent LLM calls
+    
+    @property
+    def client(self) -> OpenAI:
+        """The pre-built client, or the current client on the shared connection pool."""
+        return self._client or self._shared_client()
+    
+    def _shared_client(self) -> OpenAI:
+        return get_openai_client(self._api_key)
+    
+    @property
+    def tools(self) -> List[Dict[str, Any]]:
+        """Schemas of the offered tools (the defaults plus opt_in_tools), generated once and shared."""
+        if self.opt_in_tools:
+            return self.tool_registry.definitions_with(self.opt_in_tools)
+        return self.tool_registry.definitions
+    
+    def _offers_tool(self, name: str) -> bool:
+        """Whether the model is offered the tool, so local plans and guesses may call it."""
+        return any(schema["function"]["name"] == name for schema in self.tools)
+    
+    @property
+    def conversation_history(self) -> List[Dict[str, Any]]:
+        """The history messages sent with the next request."""
+        return self.history.messages()
+    
+    def _log(self, message: str):
+        """Print a progress message when running in verbose mode."""
+        if self.verbose:
+            print(message)
     
     def _execute_tool_call(self, tool_call) -> str:
         """
@@ -122,13 +265,454 @@ class LLMAgent:
 
         #TODO - add tool call instrumentation here
 
-        function_name = tool_call.function.name
-        function_args = json.loads(tool_call.function.arguments)
+        name, arguments = tool_call.function.name, tool_call.function.arguments
         
-        if function_name == "get_weather":
-            return get_weather(function_args["location"])
-        else:
-            return f"Unknown function: {function_name}"
+        def execute() -> str:
+            return self.tool_runtime.execute(self.tool_registry, name, arguments)
+        if self.tool_cache is None:
+            return execute()
+        return self.tool_cache.call(name, arguments, execute, self._cache_policy(name))
+    
+    def _cache_policy(self, name: str):
+        """The cache policy a tool registered with, if any."""
+        registered = self.tool_registry.get(name)
+        return registered.cache if registered is not None else None
+    
+    def _output_encoding(self, name: str) -> str:
+        """The encoding a tool's results are sent in: the agent's override, else the tool's own."""
+        if self.tool_output is not None:
+            return self.tool_output
+        registered = self.tool_registry.get(name)
+        return registered.output if registered is not None else RAW_ENCODING
+    
+    def _begin_turn(self, user_input: str) -> Route:
+        """
+        Start a chat turn: count it for usage accounting and pick its route.
+        
+        Args:
+            user_input (str): The user's query
+            
+        Returns:
+            Route: The route for this turn
+        """
+        self.turn += 1
+        self._log(f"🤖 Processing: '{user_input}'")
+        return self._select_route(user_input)
+    
+    def _select_route(self, user_input: str) -> Route:
+        """
+        Decide which model, prompt template and tools serve this turn.
+        
+        Args:
+            user_input (str): The user's query
+            
+        Returns:
+            Route: The query router's choice, or gpt-4o with tools when there is no router
+        """
+        if self.query_router is None:
+            return Route(DEFAULT, self.model, SYSTEM_PROMPT_TEMPLATE, True)
+        route = self.query_router.route(user_input, self.conversation_history)
+        self._log(f"🧭 Routed as {route.category}: {route.model}, tools {'on' if route.use_tools else 'off'}")
+        return route
+    
+    def _plan_locally(self, user_input: str, route: Route) -> Optional[ChatCompletionMessage]:
+        """
+        Plan the turn's tool calls without the LLM when the intent planner is confident.
+        
+        Args:
+            user_input (str): The user's query
+            route (Route): The turn's route; no plan is made when it disables tools
+            
+        Returns:
+            Optional[ChatCompletionMessage]: A synthetic assistant message with the tool
+                calls, or None to ask the model as usual
+        """
+        if self.intent_planner is None or not route.use_tools:
+            return None
+        batch = self._offers_tool("get_weather_batch")
+        plan = self.intent_planner.plan(user_input, batch=batch)
+        if plan is None:
+            return None
+        self._log(f"⚡ Fast path: planned {[tc['function']['name'] for tc in plan.tool_calls]} "
+                  f"for {plan.locations} locally")
+        return ChatCompletionMessage.model_validate(
+            {"role": "assistant", "content": None, "tool_calls": plan.tool_calls}
+        )
+    
+    def _start_prefetch(self, user_input: str, route: Route) -> Optional[Prefetch]:
+        """Start speculative tool calls for the turn, if a prefetcher is configured and tools are on."""
+        if self.prefetcher is None or not route.use_tools:
+            return None
+        batch = self._offers_tool("get_weather_batch")
+        return self.prefetcher.start(user_input, self._execute_tool_call, batch=batch)
+    
+    def _resolve_prefetch(self, prefetch: Optional[Prefetch], assistant_message) -> Dict[str, Future]:
+        """
+        Match the model's tool calls against the speculative ones.
+        
+        Called from a finally block around the planning request: when that request
+        fails there is no assistant message, and every speculative call is
+        cancelled and counted as waste.
+        
+        Args:
+            prefetch (Prefetch, optional): The turn's speculative calls
+            assistant_message: The assistant message returned by the planning request,
+                or None if the request failed
+            
+        Returns:
+            Dict[str, Future]: Prefetched results keyed by tool_call id
+        """
+        if prefetch is None:
+            return {}
+        prefetched = prefetch.resolve(assistant_message.tool_calls if assistant_message is not None else None)
+        if prefetched:
+            self._log(f"🔮 Reusing {len(prefetched)} prefetched tool result(s)")
+        return prefetched
+    
+    def _build_messages(self, user_input: str, template: str = SYSTEM_PROMPT_TEMPLATE) -> List[Dict[str, Any]]:
+        """
+        Build the message list for a new turn.
+        
+        Args:
+            user_input (str): The user's query
+            template (str): System prompt template for this turn
+            
+        Returns:
+            List[Dict[str, Any]]: System prompt, conversation history and the user message
+        """
+        return build_messages(template, user_input, self.conversation_history, layout=self.prompt_layout)
+    
+    def _add_assistant_tool_calls(self, assistant_message, messages: List[Dict[str, Any]]):
+        """Append the assistant message that requested tools to the conversation."""
+        self._log(f"🔧 Using tools: {[tc.function.name for tc in assistant_message.tool_calls]}")
+        
+        messages.append({
+            "role": "assistant",
+            "content": assistant_message.content,
+            "tool_calls": assistant_message.tool_calls
+        })
+    
+    def _add_tool_results(self, tool_calls, tool_results: List[str], messages: List[Dict[str, Any]]):
+        """Append one tool message per tool call, in the order the model issued them."""
+        for tool_call, tool_result in zip(tool_calls, tool_results):
+            name = tool_call.function.name
+            self._log(f"🌡️  Tool result for {name}: {self._result_locations(tool_result)}")
+            
+            messages.append({
+                "role": "tool",
+                "tool_call_id": tool_call.id,
+                "content": encode_tool_result(tool_result, self._output_encoding(name))
+            })
+    
+    @staticmethod
+    def _result_locations(tool_result: Any) -> str:
+        """The location(s) a weather tool result is about, or its error, for the progress log."""
+        try:
+            payload = json.loads(tool_result) if isinstance(tool_result, str) else tool_result
+        except json.JSONDecodeError:
+            return tool_result[:80]
+        if not isinstance(payload, dict):
+            return str(tool_result)[:80]
+        if isinstance(payload.get("results"), list):
+            return ", ".join(str(row.get("location")) for row in payload["results"] if isinstance(row, dict))
+        return str(payload.get("location") or payload.get("error", ""))
+    
+    def _tool_runner(self, prefetched: Optional[Dict[str, Future]] = None):
+        """Function that runs one tool call, taking the result from the prefetch when there is one."""
+        if not prefetched:
+            return self._execute_tool_call
+        
+        def execute(tool_call) -> str:
+            future = prefetched.get(tool_call.id)
+            return future.result() if future is not None else self._execute_tool_call(tool_call)
+        return execute
+    
+    def _run_tool_calls(self, assistant_message, messages: List[Dict[str, Any]],
+                        prefetched: Optional[Dict[str, Future]] = None):
+        """
+        Execute the tool calls requested by the model and append the results to the conversation.
+        
+        Tool calls from the same turn run concurrently on the tool executor.
+        
+        Args:
+            assistant_message: The assistant message containing tool calls
+            messages (List[Dict[str, Any]]): The conversation to extend in place
+            prefetched (Dict[str, Future], optional): Speculative results keyed by tool_call id
+        """
+        self._add_assistant_tool_calls(assistant_message, messages)
+        tool_results = self.tool_executor.run(self._tool_runner(prefetched), assistant_message.tool_calls)
+        self._add_tool_results(assistant_message.tool_calls, tool_results, messages)
+    
+    def _completion_request(self, messages: List[Dict[str, Any]], use_tools: bool,
+                            stream: bool = False, route: Optional[Route] = None) -> Dict[str, Any]:
+        """
+        Build the keyword arguments for a chat completion request.
+        
+        Args:
+            messages (List[Dict[str, Any]]): The conversation so far
+            use_tools (bool): Whether to offer the tools to the model
+            stream (bool): Whether to request a streamed response
+            route (Route, optional): The turn's route; tools are never sent when it disables them
+            
+        Returns:
+            Dict[str, Any]: Arguments for client.chat.completions.create
+        """
+        request = {
+            "model": route.model if route else self.model,
+            "messages": messages,
+            "temperature": self.temperature
+        }
+        tools_allowed = route is None or route.use_tools
+        if use_tools and tools_allowed:
+            request.update(tools=self.tools, tool_choice="auto")
+        elif tools_allowed and self.prompt_layout == CACHE_FRIENDLY_LAYOUT:
+            # Tools are part of the cached prefix, so keep sending them and just disable calls
+            request.update(tools=self.tools, tool_choice="none")
+        if stream:
+            request.update(stream=True, stream_options={"include_usage": True})
+        return request
+    
+    def _record_usage(self, model: str, usage, turn: Optional[int] = None):
+        """
+        Account the tokens and cost of an LLM call and keep its prompt-cache figures.
+        
+        Args:
+            model (str): Model the request was sent to
+            usage: The usage object of a completion or of the final stream chunk
+            turn (int, optional): Turn the call belongs to, defaults to the current one
+        """
+        call = self.accountant.record(self.session_id, self.turn if turn is None else turn, model, usage)
+        if call is not None:
+            self._log(f"💵 {model}: {call.prompt_tokens} prompt + {call.completion_tokens} completion "
+                      f"tokens, ${call.cost:.5f}")
+        self._record_prompt_cache(usage)
+    
+    def turn_usage(self) -> Dict[str, Any]:
+        """Tokens and cost of the current (or last finished) chat turn."""
+        return self.accountant.totals("turn", self.session_id).get(
+            (self.session_id, self.turn), {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                                           "cached_tokens": 0, "cost": 0.0}
+        )
+    
+    def usage_report(self) -> str:
+        """Human-readable token and cost report for this agent's session."""
+        return self.accountant.format_report(self.session_id)
+    
+    def _record_prompt_cache(self, usage):
+        """
+        Keep the provider prompt-cache figures reported for an LLM call.
+        
+        Args:
+            usage: The usage object of a completion or of the final stream chunk
+        """
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None) or 0
+        self.prompt_cache_log.append((usage.prompt_tokens, cached_tokens))
+        self._log(f"🗄️  Prompt cache: {cached_tokens}/{usage.prompt_tokens} prompt tokens cached")
+    
+    def prompt_cache_summary(self) -> Dict[str, Any]:
+        """
+        Summarize provider prompt caching over the recent LLM calls.
+        
+        Returns:
+            Dict[str, Any]: Call count, prompt and cached token totals and the cached ratio
+        """
+        prompt_tokens = sum(prompt for prompt, _ in self.prompt_cache_log)
+        cached_tokens = sum(cached for _, cached in self.prompt_cache_log)
+        return {
+            "calls": len(self.prompt_cache_log),
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "cached_ratio": round(cached_tokens / prompt_tokens, 3) if prompt_tokens else 0.0
+        }
+    
+    def _send(self, request: Dict[str, Any], timeout: Optional[float],
+              routed: Optional[List[str]] = None):
+        """
+        Make one attempt at a chat completion request.
+        
+        With a router, the request goes to the model its circuit breakers pick
+        and the outcome is recorded. With a rate limiter, the request then waits
+        for RPM/TPM capacity on that model's limiter and feeds the x-ratelimit-*
+        response headers back into it. Only the HTTP call is timed, so waiting for
+        rate-limit capacity doesn't make the model look slow.
+        
+        Args:
+            request (Dict[str, Any]): Arguments for client.chat.completions.create
+            timeout (float, optional): Timeout for this attempt
+            routed (List[str], optional): Collects the model each routed attempt was sent to
+            
+        Returns:
+            ChatCompletion or Stream: The parsed response
+        """
+        if self.router is not None:
+            request = self._route(request)
+            if routed is not None:
+                routed.append(request["model"])
+        limiter = self._rate_limiter_for(request["model"])
+        estimate = None
+        if limiter is not None:
+            estimate = estimate_request_tokens(request)
+            try:
+                limiter.acquire(estimate)
+            except BaseException:
+                # Cancelled while queued: give back a half-open probe slot taken by _route
+                if self.router is not None:
+                    self.router.breaker(request["model"]).release()
+                raise
+        if self.router is None:
+            return self._send_limited(request, timeout, limiter, estimate)
+        with self.router.breaker(request["model"]).track():
+            return self._send_limited(request, timeout, limiter, estimate)
+    
+    def _rate_limiter_for(self, model: str) -> Optional[RateLimiter]:
+        """
+        The limiter metering requests to `model`, or None without rate limiting.
+        
+        OpenAI applies limits per model and each limiter learns its budgets from
+        the x-ratelimit-* headers of the responses it sees, so requests the query
+        router or the circuit breakers send to another model must not share a
+        limiter with the agent's own model.
+        """
+        if self.rate_limiter is None:
+            return None
+        if not isinstance(self.rate_limiter, RateLimiter):
+            return self.rate_limiter(model)
+        return self.rate_limiter if model == self.model else shared_rate_limiter(model)
+    
+    def _route(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Point a request at the model chosen by the circuit breakers."""
+        model = self.router.route(request["model"])
+        if model == request["model"]:
+            return request
+        self._log(f"🔀 Circuit open for {request['model']}, falling back to {model}")
+        return dict(request, model=model)
+    
+    def _send_limited(self, request: Dict[str, Any], timeout: Optional[float],
+                      limiter: Optional[RateLimiter] = None, estimate: Optional[int] = None):
+        """
+        Send one request; with a rate limiter, feed the response headers and real usage back.
+        
+        Args:
+            request (Dict[str, Any]): Arguments for client.chat.completions.create
+            timeout (float, optional): Timeout for this attempt
+            limiter (RateLimiter, optional): The limiter of the model the request is sent to
+            estimate (int, optional): Tokens _send acquired from the limiter for this request
+        """
+        if limiter is None:
+            return self.client.chat.completions.create(**request, timeout=timeout)
+        
+        try:
+            raw = self.client.chat.completions.with_raw_response.create(**request, timeout=timeout)
+        except openai.APIStatusError as e:
+            limiter.observe(e.response.headers)
+            raise
+        limiter.observe(raw.headers)
+        response = raw.parse()
+        if estimate is not None and not request.get("stream") and response.usage is not None:
+            limiter.settle(estimate, response.usage.total_tokens)
+        return response
+    
+    def _create_completion(self, request: Dict[str, Any]):
+        """
+        Send a chat completion request, serving it from the response cache when possible.
+        
+        With a coalescer, a request identical to one already in flight waits for
+        that call's response instead of sending its own.
+        
+        Args:
+            request (Dict[str, Any]): Arguments for client.chat.completions.create
+            
+        Returns:
+            ChatCompletion: The model's response
+        """
+        if self.response_cache is not None:
+            cached = self.response_cache.get(request)
+            if cached is not None:
+                self._log("💾 Response cache hit")
+                return cached
+        
+        if self.coalescer is None:
+            return self._fetch_completion(request)
+        return self.coalescer.do(make_cache_key(request), lambda: self._fetch_completion(request))
+    
+    def _fetch_completion(self, request: Dict[str, Any]):
+        """Send a request through the resilience layer and record/cache the response."""
+        routed: List[str] = []
+        response = self.resilience.call(
+            lambda timeout: self._send(request, timeout, routed), key=request["model"],
+            discarded=self._discarded_hedge(request)
+        )
+        # The model that answered: a fallback when the router rerouted the call
+        self._record_usage(response.model or request["model"], response.usage)
+        
+        if self.response_cache is not None and self._cacheable_route(request, routed):
+            self.response_cache.set(request, response)
+        return response
+    
+    def _discarded_hedge(self, request: Dict[str, Any]):
+        """Callback accounting a losing hedged request, which is billed even though its answer is unused."""
+        turn = self.turn
+        
+        def record(response):
+            self._record_usage(response.model or request["model"], response.usage, turn)
+        return record
+    
+    def _cacheable_route(self, request: Dict[str, Any], routed: List[str]) -> bool:
+        """
+        Whether a response may be cached under its request's key.
+        
+        The key names the requested model, so an answer from a fallback model (the
+        breaker was open for any attempt) is not cached: it would otherwise be
+        served as the requested model's answer for the whole cache TTL.
+        """
+        if any(model != request["model"] for model in routed):
+            self._log(f"💾 Not caching a fallback answer for {request['model']}")
+            return False
+        return True
+    
+    def _semantic_lookup(self, user_input: str) -> Optional[str]:
+        """
+        Answer the turn from the semantic cache if a similar query was answered before.
+        
+        Only turns without conversation history use the cache: a follow-up such as
+        "And tomorrow?" means something different in every conversation.
+        
+        Args:
+            user_input (str): The user's query
+            
+        Returns:
+            Optional[str]: The cached answer, or None if the LLM must be called
+        """
+        if self.semantic_cache is None or self.history.messages():
+            return None
+        hit = self.semantic_cache.lookup(user_input)
+        if hit is None:
+            return None
+        self._log(f"🧠 Semantic cache hit ({hit.similarity:.2f}): '{hit.matched_query}'")
+        self._remember(user_input, hit.answer)
+        return hit.answer
+    
+    def _semantic_store(self, user_input: str, final_message: str, started: float):
+        """Store a freshly generated answer in the semantic cache (before the turn enters the history)."""
+        if self.semantic_cache is not None and final_message and not self.history.messages():
+            self.semantic_cache.store(user_input, final_message, time.perf_counter() - started)
+    
+    def _remember(self, user_input: str, final_message: str):
+        """
+        Record a completed turn in the conversation history.
+        
+        Args:
+            user_input (str): The user's query
+            final_message (str): The agent's final response
+        """
+        # Update conversation history (trimmed to the token budget)
+        self.history.extend([
+            {"role": "user", "content": user_input},
+            {"role": "assistant", "content": final_message}
+        ])
     
     def chat(self, user_input: str, use_reasoning: bool = True) -> str:
         """
@@ -143,98 +727,432 @@ class LLMAgent:
         """
         #TODO - add agent chat instrumentation here
         
-        # Format the system prompt with the user query
-        system_prompt = format_prompt(SYSTEM_PROMPT_TEMPLATE, user_input)
+        route = self._begin_turn(user_input)
+        messages = self._build_messages(user_input, route.template)
         
-        # Build the conversation
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_input}
-        ]
-        
-        # Add conversation history if it exists
-        if self.conversation_history:
-            messages = [messages[0]] + self.conversation_history + [messages[1]]
-        
-        print(f"🤖 Processing: '{user_input}'")
+        cached_answer = self._semantic_lookup(user_input)
+        if cached_answer is not None:
+            return cached_answer
+        started = time.perf_counter()
         
         try:
             #TODO - add initial llm request instrumentation here
-            # Make the initial request with tools
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                tools=self.tools,
-                tool_choice="auto",
-                temperature=0.7
-            )
-            
-            assistant_message = response.choices[0].message
+            # Make the initial request with tools, unless the tool calls are obvious
+            assistant_message = self._plan_locally(user_input, route)
+            prefetched = {}
+            if assistant_message is None:
+                prefetch = self._start_prefetch(user_input, route)
+                try:
+                    response = self._create_completion(
+                        self._completion_request(messages, use_tools=True, route=route)
+                    )
+                    assistant_message = response.choices[0].message
+                finally:
+                    prefetched = self._resolve_prefetch(prefetch, assistant_message)
             
             # Check if the model wants to use tools
             if assistant_message.tool_calls:
-                print(f"🔧 Using tools: {[tc.function.name for tc in assistant_message.tool_calls]}")
-                
-                # Add the assistant's message to the conversation
-                messages.append({
-                    "role": "assistant",
-                    "content": assistant_message.content,
-                    "tool_calls": assistant_message.tool_calls
-                })
-                
-                # Execute each tool call
-                for tool_call in assistant_message.tool_calls:
-                    tool_result = self._execute_tool_call(tool_call)
-                    print(f"🌡️  Tool result for {tool_call.function.name}: {json.loads(tool_result)['location']}")
-                    
-                    # Add the tool result to the conversation
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": tool_result
-                    })
+                self._run_tool_calls(assistant_message, messages, prefetched)
 
                 #TODO - add final llm request instrumentation here
                 
                 # Get the final response after tool execution
-                final_response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=0.7
+                final_response = self._create_completion(
+                    self._completion_request(messages, use_tools=False, route=route)
                 )
                 
                 final_message = final_response.choices[0].message.content
             else:
                 final_message = assistant_message.content
             
-            # Update conversation history (keep last 6 messages to avoid token limits)
-            self.conversation_history.extend([
-                {"role": "user", "content": user_input},
-                {"role": "assistant", "content": final_message}
-            ])
-            if len(self.conversation_history) > 6:
-                self.conversation_history = self.conversation_history[-6:]
+            self._semantic_store(user_input, final_message, started)
+            self._remember(user_input, final_message)
             
             return final_message
             
         except Exception as e:
             return f"Sorry, I encountered an error: {str(e)}"
     
+    def _record_stream(self, accumulator: StreamAccumulator):
+        """Close out a streamed call and keep its timing."""
+        self.stream_stats.append(accumulator.finish())
+        self._record_usage(accumulator.stats.model, accumulator.usage)
+    
+    def _stream_completion(self, messages: List[Dict[str, Any]], accumulator: StreamAccumulator,
+                           use_tools: bool = False, route: Optional[Route] = None) -> Iterator[str]:
+        """Stream one completion, yielding content tokens and filling the accumulator."""
+        request = self._completion_request(messages, use_tools, stream=True, route=route)
+        # Only opening the stream is retried; hedging a stream would duplicate every token
+        stream = self.resilience.call(
+            lambda timeout: self._send(request, timeout), key=request["model"], hedge=False
+        )
+        for chunk in stream:
+            token = accumulator.add(chunk)
+            if token:
+                yield token
+        self._record_stream(accumulator)
+    
+    def chat_stream(self, user_input: str) -> Iterator[str]:
+        """
+        Process a user input and yield the agent's response token by token.
+        
+        Tool calls requested by the model are reassembled from the stream and run
+        before the final answer is streamed.
+        
+        Args:
+            user_input (str): The user's query
+            
+        Yields:
+            str: Pieces of the agent's response as they arrive
+        """
+        route = self._begin_turn(user_input)
+        messages = self._build_messages(user_input, route.template)
+        
+        cached_answer = self._semantic_lookup(user_input)
+        if cached_answer is not None:
+            yield cached_answer
+            return
+        started = time.perf_counter()
+        
+        try:
+            assistant_message = self._plan_locally(user_input, route)
+            prefetched = {}
+            if assistant_message is None:
+                prefetch = self._start_prefetch(user_input, route)
+                try:
+                    accumulator = StreamAccumulator(route.model)
+                    yield from self._stream_completion(messages, accumulator, use_tools=True, route=route)
+                    assistant_message = accumulator.message()
+                finally:
+                    prefetched = self._resolve_prefetch(prefetch, assistant_message)
+            
+            if assistant_message.tool_calls:
+                self._run_tool_calls(assistant_message, messages, prefetched)
+                accumulator = StreamAccumulator(route.model)
+                yield from self._stream_completion(messages, accumulator, route=route)
+                final_message = accumulator.message().content
+            else:
+                final_message = assistant_message.content
+            
+            self._semantic_store(user_input, final_message, started)
+            self._remember(user_input, final_message)
+            
+        except Exception as e:
+            yield f"Sorry, I encountered an error: {str(e)}"
+    
     def reset_conversation(self):
-        """Reset the conversation history."""
-        self.conversation_history = []
-        print("🔄 Conversation history cleared")
+        """Reset the conversation history and start a new usage session."""
+        self.history.clear()
+        self.session_id = uuid.uuid4().hex[:12]
+        self.turn = 0
+        self._log("🔄 Conversation history cleared")
+
+
+class AsyncLLMAgent(LLMAgent):
+    """
+    Asyncio variant of LLMAgent built on AsyncOpenAI.
+    
+    Each instance holds one conversation. Many instances can share a single
+    AsyncOpenAI client so one event loop can serve hundreds of sessions at once.
+    """
+    
+    def __init__(self, api_key: Optional[str] = None, client: Optional[AsyncOpenAI] = None, **kwargs):
+        """
+        Initialize the async LLM agent.
+        
+        Args:
+            api_key (str, optional): OpenAI API key. If not provided, will use OPENAI_API_KEY env var.
+            client (AsyncOpenAI, optional): Pre-built async client. Defaults to a client on the
+                shared async connection pool.
+            **kwargs: Any other LLMAgent option (verbose, max_parallel_tools, caches, ...).
+        """
+        super().__init__(api_key=api_key, client=client, **kwargs)
+
+    def _shared_client(self) -> AsyncOpenAI:
+        return get_async_openai_client(self._api_key)
+    
+    async def _send(self, request: Dict[str, Any], timeout: Optional[float],
+                    routed: Optional[List[str]] = None):
+        """
+        Make one attempt at a chat completion request without blocking the event loop.
+        
+        Args:
+            request (Dict[str, Any]): Arguments for client.chat.completions.create
+            timeout (float, optional): Timeout for this attempt
+            routed (List[str], optional): Collects the model each routed attempt was sent to
+            
+        Returns:
+            ChatCompletion or AsyncStream: The parsed response
+        """
+        if self.router is not None:
+            request = self._route(request)
+            if routed is not None:
+                routed.append(request["model"])
+        limiter = self._rate_limiter_for(request["model"])
+        estimate = None
+        if limiter is not None:
+            estimate = estimate_request_tokens(request)
+            try:
+                await limiter.aacquire(estimate)
+            except BaseException:
+                # Cancelled while queued: give back a half-open probe slot taken by _route
+                if self.router is not None:
+                    self.router.breaker(request["model"]).release()
+                raise
+        if self.router is None:
+            return await self._send_limited(request, timeout, limiter, estimate)
+        with self.router.breaker(request["model"]).track():
+            return await self._send_limited(request, timeout, limiter, estimate)
+    
+    async def _send_limited(self, request: Dict[str, Any], timeout: Optional[float],
+                            limiter: Optional[RateLimiter] = None, estimate: Optional[int] = None):
+        """Send one request; with a rate limiter, feed the response headers and real usage back."""
+        if limiter is None:
+            return await self.client.chat.completions.create(**request, timeout=timeout)
+        
+        try:
+            raw = await self.client.chat.completions.with_raw_response.create(**request, timeout=timeout)
+        except openai.APIStatusError as e:
+            limiter.observe(e.response.headers)
+            raise
+        limiter.observe(raw.headers)
+        response = raw.parse()
+        if estimate is not None and not request.get("stream") and response.usage is not None:
+            limiter.settle(estimate, response.usage.total_tokens)
+        return response
+    
+    async def _create_completion(self, request: Dict[str, Any]):
+        """
+        Send a chat completion request, serving it from the response cache when possible.
+        
+        Args:
+            request (Dict[str, Any]): Arguments for client.chat.completions.create
+            
+        Returns:
+            ChatCompletion: The model's response
+        """
+        if self.response_cache is not None:
+            cached = await self.response_cache.aget(request)
+            if cached is not None:
+                self._log("💾 Response cache hit")
+                return cached
+        
+        if self.coalescer is None:
+            return await self._fetch_completion(request)
+        return await self.coalescer.ado(make_cache_key(request), lambda: self._fetch_completion(request))
+    
+    async def _fetch_completion(self, request: Dict[str, Any]):
+        """Send a request through the resilience layer and record/cache the response."""
+        routed: List[str] = []
+        response = await self.resilience.acall(
+            lambda timeout: self._send(request, timeout, routed), key=request["model"],
+            discarded=self._discarded_hedge(request)
+        )
+        # The model that answered: a fallback when the router rerouted the call
+        self._record_usage(response.model or request["model"], response.usage)
+        
+        if self.response_cache is not None and self._cacheable_route(request, routed):
+            await self.response_cache.aset(request, response)
+        return response
+    
+    async def _aexecute_tool_call(self, tool_call) -> str:
+        """
+        Execute a tool call from the event loop.
+        
+        Tools with an async implementation (get_weather's HTTP provider) are awaited
+        and cancelled if they overrun their deadline; sync tools run on the tool
+        runtime's worker threads.
+        
+        Args:
+            tool_call: The tool call object from OpenAI
+            
+        Returns:
+            str: The result of the tool execution
+        """
+        name, arguments = tool_call.function.name, tool_call.function.arguments
+        
+        def execute():
+            return self.tool_runtime.aexecute(self.tool_registry, name, arguments)
+        if self.tool_cache is None:
+            return await execute()
+        return await self.tool_cache.acall(name, arguments, execute, self._cache_policy(name))
+    
+    def _tool_runner(self, prefetched: Optional[Dict[str, Future]] = None):
+        """Coroutine function that runs one tool call, awaiting the prefetched result when there is one."""
+        async def execute(tool_call) -> str:
+            future = prefetched.get(tool_call.id) if prefetched else None
+            if future is not None:
+                return await asyncio.wrap_future(future)
+            return await self._aexecute_tool_call(tool_call)
+        return execute
+    
+    async def _run_tool_calls(self, assistant_message, messages: List[Dict[str, Any]],
+                              prefetched: Optional[Dict[str, Future]] = None):
+        """
+        Execute the tool calls requested by the model without blocking the event loop.
+        
+        Args:
+            assistant_message: The assistant message containing tool calls
+            messages (List[Dict[str, Any]]): The conversation to extend in place
+            prefetched (Dict[str, Future], optional): Speculative results keyed by tool_call id
+        """
+        self._add_assistant_tool_calls(assistant_message, messages)
+        tool_results = await self.tool_executor.arun(self._tool_runner(prefetched), assistant_message.tool_calls)
+        self._add_tool_results(assistant_message.tool_calls, tool_results, messages)
+    
+    async def chat(self, user_input: str, use_reasoning: bool = True) -> str:
+        """
+        Process a user input and return the agent's response.
+        
+        Args:
+            user_input (str): The user's query
+            use_reasoning (bool): Whether to use reasoning in the response
+            
+        Returns:
+            str: The agent's response
+        """
+        route = self._begin_turn(user_input)
+        messages = self._build_messages(user_input, route.template)
+        
+        cached_answer = self._semantic_lookup(user_input)
+        if cached_answer is not None:
+            return cached_answer
+        started = time.perf_counter()
+        
+        try:
+            # Make the initial request with tools, unless the tool calls are obvious
+            assistant_message = self._plan_locally(user_input, route)
+            prefetched = {}
+            if assistant_message is None:
+                prefetch = self._start_prefetch(user_input, route)
+                try:
+                    response = await self._create_completion(
+                        self._completion_request(messages, use_tools=True, route=route)
+                    )
+                    assistant_message = response.choices[0].message
+                finally:
+                    prefetched = self._resolve_prefetch(prefetch, assistant_message)
+            
+            # Check if the model wants to use tools
+            if assistant_message.tool_calls:
+                await self._run_tool_calls(assistant_message, messages, prefetched)
+                
+                # Get the final response after tool execution
+                final_response = await self._create_completion(
+                    self._completion_request(messages, use_tools=False, route=route)
+                )
+                
+                final_message = final_response.choices[0].message.content
+            else:
+                final_message = assistant_message.content
+            
+            self._semantic_store(user_input, final_message, started)
+            self._remember(user_input, final_message)
+            
+            return final_message
+            
+        except Exception as e:
+            return f"Sorry, I encountered an error: {str(e)}"
+    
+    async def _stream_completion(self, messages: List[Dict[str, Any]], accumulator: StreamAccumulator,
+                                 use_tools: bool = False, route: Optional[Route] = None) -> AsyncIterator[str]:
+        """Stream one completion, yielding content tokens and filling the accumulator."""
+        request = self._completion_request(messages, use_tools, stream=True, route=route)
+        stream = await self.resilience.acall(
+            lambda timeout: self._send(request, timeout), key=request["model"], hedge=False
+        )
+        async for chunk in stream:
+            token = accumulator.add(chunk)
+            if token:
+                yield token
+        self._record_stream(accumulator)
+    
+    async def chat_stream(self, user_input: str) -> AsyncIterator[str]:
+        """
+        Process a user input and yield the agent's response token by token.
+        
+        Args:
+            user_input (str): The user's query
+            
+        Yields:
+            str: Pieces of the agent's response as they arrive
+        """
+        route = self._begin_turn(user_input)
+        messages = self._build_messages(user_input, route.template)
+        
+        cached_answer = self._semantic_lookup(user_input)
+        if cached_answer is not None:
+            yield cached_answer
+            return
+        started = time.perf_counter()
+        
+        try:
+            assistant_message = self._plan_locally(user_input, route)
+            prefetched = {}
+            if assistant_message is None:
+                prefetch = self._start_prefetch(user_input, route)
+                try:
+                    accumulator = StreamAccumulator(route.model)
+                    async for token in self._stream_completion(messages, accumulator, use_tools=True, route=route):
+                        yield token
+                    assistant_message = accumulator.message()
+                finally:
+                    prefetched = self._resolve_prefetch(prefetch, assistant_message)
+            
+            if assistant_message.tool_calls:
+                await self._run_tool_calls(assistant_message, messages, prefetched)
+                accumulator = StreamAccumulator(route.model)
+                async for token in self._stream_completion(messages, accumulator, route=route):
+                    yield token
+                final_message = accumulator.message().content
+            else:
+                final_message = assistant_message.content
+            
+            self._semantic_store(user_input, final_message, started)
+            self._remember(user_input, final_message)
+            
+        except Exception as e:
+            yield f"Sorry, I encountered an error: {str(e)}"
 
 
-def demonstrate_agent():
+def print_stream(tokens: Iterator[str]) -> str:
+    """
+    Print a token stream as it arrives.
+    
+    Args:
+        tokens (Iterator[str]): Tokens from LLMAgent.chat_stream
+        
+    Returns:
+        str: The full response text
+    """
+    parts = []
+    for token in tokens:
+        if not parts:
+            print("🤖 Assistant: ", end="", flush=True)
+        print(token, end="", flush=True)
+        parts.append(token)
+    print()
+    return "".join(parts)
+
+
+def demonstrate_agent(stream: bool = False, response_cache: Optional[ResponseCache] = None,
+                      semantic_cache: Optional[SemanticCache] = None,
+                      prompt_layout: str = LEGACY_LAYOUT):
     """
     Demonstrate the LLM agent with various queries.
+    
+    Args:
+        stream (bool): Render responses token by token as they are generated
+        response_cache (ResponseCache, optional): Cache for repeated demo runs
+        semantic_cache (SemanticCache, optional): Cache of answers to similar queries
+        prompt_layout (str): LEGACY_LAYOUT or CACHE_FRIENDLY_LAYOUT
     """
     print("=" * 60)
     print("🚀 LLM Agent Demo - OpenAI with Weather Tools")
     print("=" * 60)
     
-    agent = LLMAgent()
+    agent = LLMAgent(response_cache=response_cache, semantic_cache=semantic_cache,
+                     prompt_layout=prompt_layout)
 
     #TODO - add agent instrumentation here
     
@@ -249,10 +1167,22 @@ def demonstrate_agent():
     
     for query in demo_queries:
         print(f"\n💬 User: {query}")
-        response = agent.chat(query)
-        print(f"🤖 Assistant: {response}")
+        if stream:
+            print_stream(agent.chat_stream(query))
+            if agent.stream_stats:
+                print(f"⏱️  {agent.stream_stats[-1].summary()}")
+        else:
+            response = agent.chat(query)
+            print(f"🤖 Assistant: {response}")
         print("-" * 50)
     
+    print(f"\n🗄️  Prompt cache ({prompt_layout} layout): {agent.prompt_cache_summary()}")
+    if response_cache is not None:
+        print(f"💾 Response cache: {response_cache.stats()}")
+    if semantic_cache is not None:
+        print(f"🧠 Semantic cache: {semantic_cache.report()}")
+    print(agent.usage_report())
+    
     print("\n✅ Demo completed!")
 
 
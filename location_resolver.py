@@ -0,0 +1,169 @@
+"""
+Fuzzy location resolution with a trigram index and bounded edit distance.
+
+Misspelled or slightly different names ("San Fransisco", "Tokio") are matched
+in two steps. A trigram inverted index narrows tens of thousands of names down
+to a handful of candidates that share the most character trigrams with the
+query, reading the rarest trigrams' posting lists first. The candidates are then
+ranked by edit distance, computed with an early cut-off, and the best one
+is returned with a confidence score between 0 and 1.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class LocationMatch:
+    """Best match for a query."""
+
+    key: str          # Value the matched name maps to (e.g. the weather table key)
+    name: str         # The indexed name that matched
+    confidence: float  # 1 - edit distance / length of the longer string
+
+
+def normalize(name: str) -> str:
+    """Lowercase a name and reduce punctuation and whitespace to single spaces."""
+    return " ".join(re.sub(r"[^\w\s]", " ", name.lower()).split())
+
+
+def trigrams(text: str) -> List[str]:
+    """Character trigrams of a name padded with spaces, so short names still have some."""
+    padded = f"  {text} "
+    return list({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Edit distance between two strings, giving up early.
+
+    Insertions, deletions, substitutions and swaps of adjacent characters
+    ("yrok" -> "york") each count as one edit (optimal string alignment). Only
+    cells within max_distance of the diagonal are computed.
+
+    Returns:
+        int: The distance, or max_distance + 1 once it is certain to exceed max_distance
+    """
+    limit = max_distance + 1
+    if abs(len(a) - len(b)) >= limit:
+        return limit
+    before, previous, previous_char = None, [min(j, limit) for j in range(len(b) + 1)], None
+    for i, char in enumerate(a, 1):
+        current = [limit] * (len(b) + 1)
+        if i < limit:
+            current[0] = i
+        start = max(1, i - max_distance)
+        left = row_min = current[start - 1]
+        for j in range(start, min(len(b), i + max_distance) + 1):
+            other = b[j - 1]
+            cost = previous[j - 1]
+            if char != other:
+                if previous[j] < cost:
+                    cost = previous[j]
+                if left < cost:
+                    cost = left
+                cost += 1
+                if j > 1 and char == b[j - 2] and previous_char == other and before[j - 2] + 1 < cost:
+                    cost = before[j - 2] + 1
+            current[j] = left = cost
+            if cost < row_min:
+                row_min = cost
+        if row_min >= limit:
+            return limit
+        before, previous, previous_char = previous, current, char
+    return min(previous[-1], limit)
+
+
+class LocationResolver:
+    """
+    Trigram + edit-distance index over place names.
+
+    Posting lists are kept sorted by name length, so a lookup only reads the
+    slice of names whose length is within max_distance of the query. A name
+    within k edits shares all but at most 3k of the query's trigrams, which
+    prunes candidates before any edit distance is computed.
+
+    Usage:
+        resolver = LocationResolver({"san francisco": "san francisco", "sf": "san francisco"})
+        match = resolver.resolve("San Fransisco")
+        if match and match.confidence >= 0.8:
+            ...
+    """
+
+    def __init__(self, names: Mapping[str, str], candidates: int = 8, max_postings: int = 6):
+        """
+        Args:
+            names (Mapping[str, str]): Indexed name -> key it resolves to
+            candidates (int): Best trigram candidates checked with edit distance
+            max_postings (int): Rarest query trigrams whose posting lists are read
+        """
+        self.candidates = candidates
+        self.max_postings = max_postings
+        self._names: List[str] = []
+        self._keys: List[str] = []
+        for name, key in names.items():
+            self._names.append(normalize(name))
+            self._keys.append(key)
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for index in sorted(range(len(self._names)), key=lambda i: len(self._names[i])):
+            for gram in trigrams(self._names[index]):
+                postings[gram].append(index)
+        # gram -> (name lengths, name indices), both in ascending length order
+        self._postings: Dict[str, Tuple[List[int], List[int]]] = {
+            gram: ([len(self._names[i]) for i in indices], indices) for gram, indices in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def resolve(self, query: str, max_distance: Optional[int] = None) -> Optional[LocationMatch]:
+        """
+        Find the indexed name closest to a query.
+
+        Args:
+            query (str): Location as written by the user or the model
+            max_distance (int, optional): Largest edit distance accepted, defaults to a
+                quarter of the query length (at least 1)
+
+        Returns:
+            Optional[LocationMatch]: The best match, or None when nothing is close enough
+        """
+        text = normalize(query)
+        if not text:
+            return None
+        if max_distance is None:
+            max_distance = max(1, len(text) // 4)
+
+        # Slice every posting list to names of a compatible length, then read the rarest ones
+        shortest, longest = len(text) - max_distance, len(text) + max_distance
+        slices = []
+        for gram in trigrams(text):
+            if gram in self._postings:
+                lengths, indices = self._postings[gram]
+                slices.append(indices[bisect_left(lengths, shortest):bisect_right(lengths, longest)])
+        slices.sort(key=len)
+        slices = slices[:self.max_postings]
+
+        shared = Counter()
+        for indices in slices:
+            shared.update(indices)
+        # Each edit touches at most three trigrams
+        min_shared = max(1, len(slices) - 3 * max_distance)
+        best = [index for index, count in shared.most_common(self.candidates) if count >= min_shared]
+
+        match, match_distance = None, max_distance + 1
+        for index in best:
+            distance = edit_distance(text, self._names[index], min(max_distance, match_distance))
+            if distance < match_distance:
+                match, match_distance = index, distance
+                if distance == 0:
+                    break
+        if match is None:
+            return None
+        name = self._names[match]
+        confidence = 1 - match_distance / max(len(text), len(name))
+        return LocationMatch(self._keys[match], name, round(confidence, 3))
@@ -5,7 +5,16 @@ Main entry point for the LLM Agent demonstration.
 import os
 import sys
 from dotenv import load_dotenv
-from llm_agent import LLMAgent, demonstrate_agent
+from intent_planner import mentioned_places
+from llm_agent import LLMAgent, demonstrate_agent, print_stream
+from response_cache import ResponseCache, DiskCacheBackend
+from semantic_cache import SemanticCache
+from prompt_templates import LEGACY_LAYOUT, CACHE_FRIENDLY_LAYOUT
+from weather_provider import HTTPWeatherProvider
+from weather_tool import WEATHER_CACHE_POLICY, set_weather_provider
+
+# Saved answers quote the weather, so they expire with the weather tool's cached results
+SEMANTIC_CACHE_TTL = WEATHER_CACHE_POLICY.ttl
 
 
 def setup_environment():
@@ -34,37 +43,61 @@ def setup_environment():
     return True
 
 # Going to ignore interactive mode for the demo and focus on instrumenting demonstrate_agent()
-def interactive_mode():
-    """Run the agent in interactive mode."""
+def interactive_mode(stream: bool = False, response_cache: ResponseCache = None,
+                     semantic_cache: SemanticCache = None, prompt_layout: str = LEGACY_LAYOUT):
+    """
+    Run the agent in interactive mode.
+    
+    Args:
+        stream (bool): Render responses token by token as they are generated
+        response_cache (ResponseCache, optional): Cache for repeated queries
+        semantic_cache (SemanticCache, optional): Cache of answers to similar queries
+        prompt_layout (str): LEGACY_LAYOUT or CACHE_FRIENDLY_LAYOUT
+    """
     print("\n🎯 Interactive Mode - Chat with the AI Agent")
     print("Type 'quit', 'exit', or 'q' to stop")
     print("Type 'demo' to run the automated demonstration")
     print("Type 'reset' to clear conversation history")
+    print("Type 'usage' to show token usage and cost so far")
+    print("Type 'tools' to show tool call latency and timeouts")
     print("-" * 50)
     
-    agent = LLMAgent()
+    agent = LLMAgent(response_cache=response_cache, semantic_cache=semantic_cache,
+                     prompt_layout=prompt_layout)
     
     while True:
         try:
             user_input = input("\n💬 You: ").strip()
             
             if user_input.lower() in ['quit', 'exit', 'q']:
+                print(agent.accountant.format_report())
                 print("👋 Goodbye!")
                 break
             elif user_input.lower() == 'demo':
-                demonstrate_agent()
+                demonstrate_agent(stream=stream, response_cache=response_cache,
+                                  semantic_cache=semantic_cache, prompt_layout=prompt_layout)
                 continue
             elif user_input.lower() == 'reset':
                 agent.reset_conversation()
                 continue
+            elif user_input.lower() == 'usage':
+                print(agent.accountant.format_report())
+                continue
+            elif user_input.lower() == 'tools':
+                print(agent.tool_runtime.format_report())
+                continue
             elif not user_input:
                 continue
             
-            response = agent.chat(user_input)
-            print(f"🤖 Assistant: {response}")
+            if stream:
+                print_stream(agent.chat_stream(user_input))
+            else:
+                response = agent.chat(user_input)
+                print(f"🤖 Assistant: {response}")
             
         except KeyboardInterrupt:
-            print("\n\n👋 Goodbye!")
+            print("\n\n" + agent.accountant.format_report())
+            print("👋 Goodbye!")
             break
         except Exception as e:
             print(f"❌ Error: {e}")
@@ -80,23 +113,49 @@ def main():
         sys.exit(1)
     
     # Check command line arguments
-    if len(sys.argv) > 1:
-        if sys.argv[1] in ['--demo', '-d']:
-            demonstrate_agent()
-        elif sys.argv[1] in ['--interactive', '-i']:
-            interactive_mode()
-        elif sys.argv[1] in ['--help', '-h']:
+    flags = {'--stream', '-s', '--cache', '-c', '--semantic-cache', '--cache-friendly-prompt'}
+    args = [arg for arg in sys.argv[1:] if arg not in flags]
+    stream = any(arg in ['--stream', '-s'] for arg in sys.argv[1:])
+    response_cache = None
+    if any(arg in ['--cache', '-c'] for arg in sys.argv[1:]):
+        response_cache = ResponseCache(DiskCacheBackend())
+    semantic_cache = None
+    if '--semantic-cache' in sys.argv[1:]:
+        semantic_cache = SemanticCache(mentioned_places, path=".semantic_cache.npz", ttl=SEMANTIC_CACHE_TTL)
+    prompt_layout = LEGACY_LAYOUT
+    if '--cache-friendly-prompt' in sys.argv[1:]:
+        prompt_layout = CACHE_FRIENDLY_LAYOUT
+    options = dict(stream=stream, response_cache=response_cache, semantic_cache=semantic_cache,
+                   prompt_layout=prompt_layout)
+    
+    # Real weather data from an HTTP service instead of the demo table
+    if os.getenv("WEATHER_API_URL"):
+        set_weather_provider(HTTPWeatherProvider(os.getenv("WEATHER_API_URL"), api_key=os.getenv("WEATHER_API_KEY")))
+    
+    if args:
+        if args[0] in ['--demo', '-d']:
+            demonstrate_agent(**options)
+        elif args[0] in ['--interactive', '-i']:
+            interactive_mode(**options)
+        elif args[0] in ['--help', '-h']:
             print("\nUsage:")
             print("  python main.py              # Interactive mode (default)")
             print("  python main.py --demo       # Run automated demonstration")
             print("  python main.py --interactive # Interactive chat mode")
+            print("  python main.py --stream     # Stream responses token by token (combine with any mode)")
+            print("  python main.py --cache      # Cache LLM responses on disk (combine with any mode)")
+            print("  python main.py --semantic-cache # Reuse answers to similar queries (combine with any mode)")
+            print("  python main.py --cache-friendly-prompt # Keep the prompt prefix stable for provider caching")
             print("  python main.py --help       # Show this help")
         else:
-            print(f"Unknown argument: {sys.argv[1]}")
+            print(f"Unknown argument: {args[0]}")
             print("Use --help for usage information")
     else:
         # Default to interactive mode
-        interactive_mode()
+        interactive_mode(**options)
+    
+    if semantic_cache is not None:
+        semantic_cache.save()
 
 
 if __name__ == "__main__":
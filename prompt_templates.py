@@ -2,6 +2,16 @@
 Prompt templates for the LLM agent demonstration.
 """
 
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+# Prompt layouts: "legacy" formats the user query into the system prompt;
+# "cache_friendly" keeps the system prompt byte-identical across requests and
+# sends per-request variables only at the end, so provider prefix caching can hit.
+LEGACY_LAYOUT = "legacy"
+CACHE_FRIENDLY_LAYOUT = "cache_friendly"
+PROMPT_LAYOUTS = (LEGACY_LAYOUT, CACHE_FRIENDLY_LAYOUT)
+
 SYSTEM_PROMPT_TEMPLATE = """You are a helpful AI assistant with access to weather information tools. 
 
 Your role:
@@ -37,4 +47,57 @@ def format_prompt(template: str, user_query: str) -> str:
     Returns:
         str: The formatted prompt
     """
-    return template.format(user_query=user_query) 
\ No newline at end of file
+    return template.format(user_query=user_query)
+
+
+@lru_cache(maxsize=None)
+def static_prompt(template: str) -> str:
+    """
+    Strip the per-request lines from a prompt template.
+    
+    Lines containing the {user_query} placeholder are removed so the result is the
+    same for every request and can be served from the provider's prompt cache.
+    
+    Args:
+        template (str): The prompt template with {user_query} placeholder
+        
+    Returns:
+        str: The template without per-request content
+    """
+    lines = [line for line in template.splitlines() if "{user_query}" not in line]
+    
+    # Collapse the blank lines left behind by removed placeholders
+    collapsed = []
+    for line in lines:
+        if not line.strip() and collapsed and not collapsed[-1].strip():
+            continue
+        collapsed.append(line)
+    return "\n".join(collapsed).strip()
+
+
+def build_messages(template: str, user_query: str, history: Optional[List[Dict[str, Any]]] = None,
+                   layout: str = LEGACY_LAYOUT) -> List[Dict[str, Any]]:
+    """
+    Assemble the messages for a request.
+    
+    Args:
+        template (str): The prompt template with {user_query} placeholder
+        user_query (str): The user's input query
+        history (List[Dict[str, Any]], optional): Earlier turns of the conversation
+        layout (str): LEGACY_LAYOUT or CACHE_FRIENDLY_LAYOUT
+        
+    Returns:
+        List[Dict[str, Any]]: System prompt, history and the user message, in that order
+    """
+    if layout == CACHE_FRIENDLY_LAYOUT:
+        system_prompt = static_prompt(template)
+    elif layout == LEGACY_LAYOUT:
+        system_prompt = format_prompt(template, user_query)
+    else:
+        raise ValueError(f"Unknown prompt layout: {layout}")
+    
+    return [
+        {"role": "system", "content": system_prompt},
+        *(history or []),
+        {"role": "user", "content": user_query}
+    ]
@@ -0,0 +1,134 @@
+"""
+Local query router that picks the model, prompt and tools for each turn.
+
+Every turn used to go to gpt-4o with the weather tool attached, even "What's
+2 + 2?". QueryRouter classifies the query with keyword and pattern heuristics
+(microseconds, no API call) into one of three categories and maps each to a
+Route:
+
+    weather  - needs the weather tool: main model, weather prompt, tools attached
+    general  - open-ended question: cheaper model, general prompt, no tools
+    trivial  - greetings, thanks, arithmetic: cheaper model, general prompt, no tools
+
+Queries the heuristics cannot place confidently (e.g. travel or outfit questions
+that may depend on the weather, or anything naming a place the weather tool
+knows, such as "How is it in London right now?") fall back to the agent's
+original setup, which keeps the tools.
+"""
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from prompt_templates import GENERAL_ASSISTANT_PROMPT, SYSTEM_PROMPT_TEMPLATE, WEATHER_ASSISTANT_PROMPT
+from weather_tool import LOCATION_INDEX
+
+WEATHER = "weather"
+GENERAL = "general"
+TRIVIAL = "trivial"
+DEFAULT = "default"
+
+WEATHER_PATTERN = re.compile(
+    r"\b(weather|temperature|forecast|rain\w*|snow\w*|sunny|cloud\w*|humid\w*|wind\w*|"
+    r"storm\w*|degrees|celsius|fahrenheit|umbrella|hot|cold|warm|chilly|freezing)\b",
+    re.IGNORECASE
+)
+# Words that suggest the answer may depend on current conditions
+_MAYBE_WEATHER_PATTERN = re.compile(
+    r"\b(outside|outdoors?|today|tomorrow|tonight|weekend|trip|travel\w*|pack\w*|wear|jacket|coat|"
+    r"picnic|hike|hiking|beach|conditions|nice out|out there|"
+    r"how(?:'s| is) it (?:in|at|out|over)|what(?:'s| is) it like (?:in|at|out|over))\b",
+    re.IGNORECASE
+)
+# Every name and alias in the weather tool's location index, in any case, longest first so
+# "new york city" wins over "new york"
+LOCATION_PATTERN = re.compile(
+    r"\b(" + "|".join(
+        r"[\s,.]+".join(re.escape(word) for word in alias.split())
+        for alias in sorted(LOCATION_INDEX, key=len, reverse=True)
+    ) + r")\b",
+    re.IGNORECASE
+)
+_ARITHMETIC_PATTERN = re.compile(r"^[\s\d.+\-*/x×÷^()%=?]+$|\bwhat'?s\s+[\d.]+\s*[-+*/x×÷^]\s*[\d.]+", re.IGNORECASE)
+_SMALL_TALK_PATTERN = re.compile(
+    r"^(hi|hello|hey|thanks|thank you|thx|ok|okay|cool|great|bye|goodbye|good (morning|evening|night)|"
+    r"yes|no|sure|nice)\b[\s!.?]*$",
+    re.IGNORECASE
+)
+_FOLLOW_UP_PATTERN = re.compile(r"^(and|what about|how about|also)\b", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class Route:
+    """How to serve one turn."""
+
+    category: str
+    model: str
+    template: str
+    use_tools: bool
+
+
+class QueryRouter:
+    """
+    Heuristic per-turn router.
+
+    Usage:
+        router = QueryRouter(cheap_model="gpt-4o-mini")
+        agent = LLMAgent(query_router=router)
+    """
+
+    def __init__(self, model: str = "gpt-4o", cheap_model: str = "gpt-4o-mini",
+                 routes: Optional[Dict[str, Route]] = None):
+        """
+        Args:
+            model (str): Model for weather and unclassified turns
+            cheap_model (str): Model for general and trivial turns
+            routes (Dict[str, Route], optional): Overrides for individual categories
+        """
+        self.routes = {
+            WEATHER: Route(WEATHER, model, WEATHER_ASSISTANT_PROMPT, True),
+            GENERAL: Route(GENERAL, cheap_model, GENERAL_ASSISTANT_PROMPT, False),
+            TRIVIAL: Route(TRIVIAL, cheap_model, GENERAL_ASSISTANT_PROMPT, False),
+            DEFAULT: Route(DEFAULT, model, SYSTEM_PROMPT_TEMPLATE, True),
+            **(routes or {})
+        }
+        self._lock = threading.Lock()
+        self.stats = {category: 0 for category in self.routes}
+        self.stats["classify_seconds_total"] = 0.0
+
+    def classify(self, query: str, history: Optional[List[Dict[str, Any]]] = None) -> str:
+        """
+        Classify a query.
+
+        Args:
+            query (str): The user's query
+            history (List[Dict[str, Any]], optional): Earlier turns, used to spot
+                short follow-ups such as "And in London?" to a weather question
+
+        Returns:
+            str: WEATHER, GENERAL, TRIVIAL or DEFAULT
+        """
+        text = query.strip()
+        if WEATHER_PATTERN.search(text):
+            return WEATHER
+        if history and len(text.split()) <= 6 and (_FOLLOW_UP_PATTERN.search(text) or text.endswith("?")):
+            previous = next((m.get("content") or "" for m in reversed(history) if m["role"] == "user"), "")
+            if WEATHER_PATTERN.search(previous):
+                return WEATHER
+        if _SMALL_TALK_PATTERN.search(text) or _ARITHMETIC_PATTERN.search(text):
+            return TRIVIAL
+        if _MAYBE_WEATHER_PATTERN.search(text) or LOCATION_PATTERN.search(text):
+            # Possibly about the weather: keep the tools rather than answer without them
+            return DEFAULT
+        return GENERAL
+
+    def route(self, query: str, history: Optional[List[Dict[str, Any]]] = None) -> Route:
+        """Classify a query and return the route for its category."""
+        started = time.perf_counter()
+        category = self.classify(query, history)
+        with self._lock:
+            self.stats[category] += 1
+            self.stats["classify_seconds_total"] += time.perf_counter() - started
+        return self.routes[category]
@@ -0,0 +1,168 @@
+"""
+Client-side rate limiting for requests/minute and tokens/minute.
+
+RateLimiter meters both limits with token buckets. Callers reserve capacity up
+front: each reservation is taken in arrival order under a lock and returns how
+long that caller has to wait, so waiters are served first-come first-served
+and the same limiter works from threads and from asyncio. Limits start from
+configured values and are corrected from the ``x-ratelimit-*`` headers of every
+response, including 429 errors.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+
+from tokens import count_message_tokens, count_tokens
+
+# Completion tokens assumed when a request does not set max_tokens
+DEFAULT_COMPLETION_ESTIMATE = 256
+
+
+def estimate_request_tokens(request: Dict[str, Any]) -> int:
+    """
+    Estimate the tokens a chat completion request will count against the TPM limit.
+
+    Args:
+        request (Dict[str, Any]): Arguments for client.chat.completions.create
+
+    Returns:
+        int: Prompt tokens (messages and tool schemas) plus the expected completion
+    """
+    model = request.get("model", "gpt-4o")
+    tokens = sum(count_message_tokens(m if isinstance(m, dict) else m.model_dump(), model)
+                 for m in request.get("messages", []))
+    if request.get("tools"):
+        tokens += count_tokens(json.dumps(request["tools"]), model)
+    return tokens + (request.get("max_tokens") or DEFAULT_COMPLETION_ESTIMATE)
+
+
+class TokenBucket:
+    """A bucket refilled continuously at limit/60 units per second, holding at most `limit`."""
+
+    def __init__(self, limit_per_minute: float):
+        self.limit = float(limit_per_minute)
+        self.level = self.limit
+        self.updated = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        return self.limit / 60.0
+
+    def refill(self, now: float):
+        self.level = min(self.limit, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take `amount` (the level may go negative) and return the seconds until it is covered."""
+        self.refill(now)
+        self.level -= min(amount, self.limit)
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+
+class RateLimiter:
+    """
+    Shared requests/minute and tokens/minute limiter.
+
+    Usage:
+        limiter = shared_rate_limiter("gpt-4o")
+        agent = LLMAgent(rate_limiter=limiter)
+    """
+
+    def __init__(self, requests_per_minute: float = 500, tokens_per_minute: float = 30000):
+        """
+        Args:
+            requests_per_minute (float): Initial RPM limit, replaced by x-ratelimit-limit-requests
+            tokens_per_minute (float): Initial TPM limit, replaced by x-ratelimit-limit-tokens
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._lock = threading.Lock()
+        self.stats = {"acquired": 0, "waited": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+
+    def _reserve(self, tokens: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self.requests.reserve(1, now), self.tokens.reserve(tokens, now))
+            self.stats["acquired"] += 1
+            if wait > 0:
+                self.stats["waited"] += 1
+                self.stats["wait_seconds_total"] += wait
+                self.stats["wait_seconds_max"] = max(self.stats["wait_seconds_max"], wait)
+            return wait
+
+    def acquire(self, tokens: int) -> float:
+        """
+        Block until capacity for one request of `tokens` tokens is available.
+
+        Returns:
+            float: Seconds spent queued
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self, tokens: int) -> float:
+        """Async variant of acquire() that sleeps without blocking the event loop."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def settle(self, estimated: int, actual: int):
+        """Return (or charge) the difference between the estimated and the real token usage."""
+        with self._lock:
+            self.tokens.level = min(self.tokens.limit, self.tokens.level + estimated - actual)
+
+    def observe(self, headers: Optional[Mapping[str, str]]):
+        """
+        Learn limits and remaining capacity from x-ratelimit-* response headers.
+
+        Remaining capacity reported by the server also reflects other clients
+        sharing the same key, so the local level is lowered to match it.
+        """
+        if not headers:
+            return
+        with self._lock:
+            now = time.monotonic()
+            for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+                limit = headers.get(f"x-ratelimit-limit-{kind}")
+                if limit:
+                    bucket.refill(now)
+                    bucket.limit = float(limit)
+                remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+                if remaining:
+                    bucket.refill(now)
+                    bucket.level = min(bucket.level, float(remaining))
+
+    def report(self) -> Dict[str, Any]:
+        """Current limits and queue-wait metrics."""
+        acquired = self.stats["acquired"]
+        return {
+            "rpm_limit": self.requests.limit,
+            "tpm_limit": self.tokens.limit,
+            **self.stats,
+            "wait_seconds_avg": self.stats["wait_seconds_total"] / acquired if acquired else 0.0
+        }
+
+
+_shared: Dict[str, RateLimiter] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_rate_limiter(model: str, requests_per_minute: float = 500,
+                        tokens_per_minute: float = 30000) -> RateLimiter:
+    """
+    Get the process-wide limiter for a model, creating it on first use.
+
+    OpenAI applies limits per model, so every agent calling the same model
+    should share one limiter. The initial limits only matter until the first
+    response headers arrive.
+    """
+    with _shared_lock:
+        if model not in _shared:
+            _shared[model] = RateLimiter(requests_per_minute, tokens_per_minute)
+        return _shared[model]
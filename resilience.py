@@ -0,0 +1,288 @@
+"""
+Retries, backoff and hedged requests for LLM calls.
+
+ResilientCaller wraps a single LLM request. Transient failures (timeouts,
+connection errors, 408/409/429 and 5xx responses) are retried with exponential
+backoff and full jitter, honouring any Retry-After header the server sends. Each
+attempt gets its own timeout. Optionally, a hedged duplicate request is fired
+when the first one runs longer than the recent p95 latency, and whichever
+answers first wins. The losing request is still billed, so it is left to finish
+and its response is handed to the caller's ``discarded`` callback for usage
+accounting.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import openai
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether an exception from the OpenAI client is worth retrying."""
+    if isinstance(exc, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code in RETRYABLE_STATUS_CODES or exc.status_code >= 500
+    return False
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """
+    Read the server's requested wait from an error response.
+
+    Supports ``retry-after-ms`` (sent by OpenAI), and ``retry-after`` given either
+    in seconds or as an HTTP date.
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if the server gave no hint
+    """
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """How many times and how long to wait between attempts."""
+
+    max_attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+    attempt_timeout: Optional[float] = 60.0
+
+    def delay(self, attempt: int, exc: Optional[BaseException] = None) -> float:
+        """
+        Seconds to wait before the next attempt.
+
+        Args:
+            attempt (int): Zero-based number of the attempt that just failed
+            exc (BaseException, optional): The failure, checked for a Retry-After hint
+
+        Returns:
+            float: Retry-After when the server sent one, otherwise full-jitter backoff; never
+                more than max_delay
+        """
+        if exc is not None:
+            retry_after = retry_after_seconds(exc)
+            if retry_after is not None:
+                return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def gives_up(self, exc: BaseException) -> bool:
+        """
+        Whether the server asked for a longer wait than max_delay (``retry-after: 3600``).
+
+        Retrying sooner than asked would most likely fail again, so the error is
+        raised instead of sleeping for the server's full wait.
+        """
+        retry_after = retry_after_seconds(exc)
+        return retry_after is not None and retry_after > self.max_delay
+
+
+@dataclass
+class HedgePolicy:
+    """When to fire a duplicate request for a slow call."""
+
+    percentile: float = 95.0
+    min_samples: int = 20
+    default_delay: float = 2.0
+    min_delay: float = 0.05
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class ResilientCaller:
+    """
+    Runs LLM requests with retries and optional hedging.
+
+    The wrapped function receives the per-attempt timeout and must perform one
+    request, e.g. ``lambda timeout: client.chat.completions.create(**request, timeout=timeout)``.
+    Share one caller between agents to share the latency statistics used for hedging.
+    """
+
+    def __init__(self, retry: Optional[RetryPolicy] = None, hedge: Optional[HedgePolicy] = None):
+        """
+        Args:
+            retry (RetryPolicy, optional): Retry settings, defaults to RetryPolicy()
+            hedge (HedgePolicy, optional): Enables hedged requests when set
+        """
+        self.retry = retry or RetryPolicy()
+        self.hedge = hedge
+        self._latency: Dict[str, LatencyTracker] = {}
+        self._pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge") if hedge else None
+        self.stats = {"attempts": 0, "retries": 0, "hedges_fired": 0, "hedges_won": 0, "hedges_discarded": 0}
+
+    def _tracker(self, key: str) -> LatencyTracker:
+        tracker = self._latency.get(key)
+        if tracker is None:
+            tracker = self._latency.setdefault(key, LatencyTracker())
+        return tracker
+
+    def hedge_delay(self, key: str) -> float:
+        """Seconds to wait for the primary request before firing the hedge."""
+        tracker = self._tracker(key)
+        if len(tracker) < self.hedge.min_samples:
+            return self.hedge.default_delay
+        return max(self.hedge.min_delay, tracker.percentile(self.hedge.percentile))
+
+    def _timed(self, fn: Callable[[Optional[float]], Any], key: str) -> Any:
+        started = time.perf_counter()
+        result = fn(self.retry.attempt_timeout)
+        self._tracker(key).record(time.perf_counter() - started)
+        return result
+
+    async def _atimed(self, fn: Callable[[Optional[float]], Awaitable[Any]], key: str) -> Any:
+        started = time.perf_counter()
+        result = await fn(self.retry.attempt_timeout)
+        self._tracker(key).record(time.perf_counter() - started)
+        return result
+
+    def _discard(self, attempt, discarded: Optional[Callable[[Any], None]]):
+        """Hand a losing attempt's response, once it arrives, to `discarded`: the API bills it all the same."""
+        if attempt.cancelled() or attempt.exception() is not None:
+            return
+        self.stats["hedges_discarded"] += 1
+        if discarded is not None:
+            discarded(attempt.result())
+
+    def _hedged(self, fn: Callable[[Optional[float]], Any], key: str,
+                discarded: Optional[Callable[[Any], None]] = None) -> Any:
+        primary = self._pool.submit(self._timed, fn, key)
+        done, _ = wait([primary], timeout=self.hedge_delay(key))
+        if done:
+            return primary.result()
+
+        self.stats["hedges_fired"] += 1
+        hedge = self._pool.submit(self._timed, fn, key)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self.stats["hedges_won"] += 1
+                    # The slower request cannot be cancelled once sent; its response is discarded
+                    loser = hedge if future is primary else primary
+                    loser.add_done_callback(lambda attempt: self._discard(attempt, discarded))
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def _ahedged(self, fn: Callable[[Optional[float]], Awaitable[Any]], key: str,
+                       discarded: Optional[Callable[[Any], None]] = None) -> Any:
+        primary = asyncio.ensure_future(self._atimed(fn, key))
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay(key))
+        if done:
+            return primary.result()
+
+        self.stats["hedges_fired"] += 1
+        hedge = asyncio.ensure_future(self._atimed(fn, key))
+        pending = {primary, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.stats["hedges_won"] += 1
+                        # Cancelling the slower request wouldn't un-bill it: let it finish and discard it
+                        loser = hedge if task is primary else primary
+                        loser.add_done_callback(lambda attempt: self._discard(attempt, discarded))
+                        pending = set()
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def call(self, fn: Callable[[Optional[float]], Any], key: str = "default", hedge: bool = True,
+             discarded: Optional[Callable[[Any], None]] = None) -> Any:
+        """
+        Run a request with retries (and hedging if enabled).
+
+        Args:
+            fn (Callable): Performs one request given the per-attempt timeout
+            key (str): Latency bucket for hedging, usually the model name
+            hedge (bool): Allow hedging for this call (disable for streams)
+            discarded (Callable, optional): Receives the response of a losing hedged attempt
+                when it arrives after the winner, e.g. to account its usage
+
+        Returns:
+            Any: The first successful result
+
+        Raises:
+            Exception: The last error once retries are exhausted, a non-retryable error, or a
+                rate limit whose Retry-After exceeds the retry policy's max_delay
+        """
+        for attempt in range(self.retry.max_attempts):
+            self.stats["attempts"] += 1
+            try:
+                if self.hedge is not None and hedge:
+                    return self._hedged(fn, key, discarded)
+                return self._timed(fn, key)
+            except Exception as exc:
+                if not is_retryable(exc) or attempt == self.retry.max_attempts - 1 or self.retry.gives_up(exc):
+                    raise
+                self.stats["retries"] += 1
+                time.sleep(self.retry.delay(attempt, exc))
+
+    async def acall(self, fn: Callable[[Optional[float]], Awaitable[Any]], key: str = "default",
+                    hedge: bool = True, discarded: Optional[Callable[[Any], None]] = None) -> Any:
+        """Async variant of call(); fn must return an awaitable."""
+        for attempt in range(self.retry.max_attempts):
+            self.stats["attempts"] += 1
+            try:
+                if self.hedge is not None and hedge:
+                    return await self._ahedged(fn, key, discarded)
+                return await self._atimed(fn, key)
+            except Exception as exc:
+                if not is_retryable(exc) or attempt == self.retry.max_attempts - 1 or self.retry.gives_up(exc):
+                    raise
+                self.stats["retries"] += 1
+                await asyncio.sleep(self.retry.delay(attempt, exc))
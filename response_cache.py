@@ -0,0 +1,247 @@
+"""
+Exact-match cache for chat completion responses.
+
+Requests are keyed on a canonical hash of the fields that determine the answer
+(model, messages, tools, tool choice and temperature). Two backends are
+provided: an in-memory LRU for a single process and a SQLite file that survives
+restarts and can be shared by several processes on one machine. The async
+agent reads and writes a SQLite cache through aget()/aset(), which run the disk
+I/O on a worker thread so the event loop keeps serving other sessions.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from openai.types.chat import ChatCompletion
+
+# Request fields that change the model's answer
+KEY_FIELDS = ("model", "messages", "tools", "tool_choice", "temperature")
+
+
+def _to_jsonable(value: Any) -> Any:
+    """Convert SDK objects (e.g. tool calls echoed back in messages) into plain JSON data."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(exclude_none=True)
+    if isinstance(value, dict):
+        return {k: _to_jsonable(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(v) for v in value]
+    return value
+
+
+def make_cache_key(request: Dict[str, Any]) -> str:
+    """
+    Build a canonical hash for a chat completion request.
+
+    Args:
+        request (Dict[str, Any]): Keyword arguments for chat.completions.create
+
+    Returns:
+        str: Hex SHA-256 digest that is stable across processes
+    """
+    canonical = {field: _to_jsonable(request.get(field)) for field in KEY_FIELDS}
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class MemoryCacheBackend:
+    """In-process LRU store of serialized responses."""
+
+    # Lookups never wait on I/O, so the event loop may call them directly
+    blocking = False
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Args:
+            max_entries (int): Entries kept before the least recently used are evicted
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, expires_at: Optional[float]):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCacheBackend:
+    """SQLite-backed store of serialized responses with LRU eviction."""
+
+    blocking = True
+
+    def __init__(self, path: str = ".llm_response_cache.sqlite3", max_entries: int = 10000):
+        """
+        Args:
+            path (str): Database file, created if missing
+            max_entries (int): Entries kept before the least recently used are evicted
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return value
+
+    def set(self, key: str, value: str, expires_at: Optional[float]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, time.time())
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class ResponseCache:
+    """
+    Cache layer placed in front of client.chat.completions.create.
+
+    Usage:
+        cache = ResponseCache(DiskCacheBackend(), ttl=3600)
+        agent = LLMAgent(response_cache=cache)
+    """
+
+    def __init__(self, backend=None, ttl: Optional[float] = 3600, deterministic_only: bool = False):
+        """
+        Args:
+            backend: MemoryCacheBackend (default) or DiskCacheBackend
+            ttl (float, optional): Seconds an entry stays valid, None for no expiry
+            deterministic_only (bool): Only cache calls made with temperature 0
+        """
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.ttl = ttl
+        self.deterministic_only = deterministic_only
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+
+    def is_cacheable(self, request: Dict[str, Any]) -> bool:
+        """Whether a request may be served from or stored in the cache."""
+        if request.get("stream"):
+            return False
+        if self.deterministic_only and request.get("temperature", 1) != 0:
+            return False
+        return True
+
+    def get(self, request: Dict[str, Any]) -> Optional[ChatCompletion]:
+        """
+        Look up the response for a request.
+
+        Args:
+            request (Dict[str, Any]): Keyword arguments for chat.completions.create
+
+        Returns:
+            Optional[ChatCompletion]: The cached response, or None on a miss
+        """
+        if not self.is_cacheable(request):
+            self.skipped += 1
+            return None
+        value = self.backend.get(make_cache_key(request))
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return ChatCompletion.model_validate_json(value)
+
+    def set(self, request: Dict[str, Any], response: ChatCompletion):
+        """Store the response for a request."""
+        if not self.is_cacheable(request):
+            return
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        self.backend.set(make_cache_key(request), response.model_dump_json(), expires_at)
+
+    def _blocks(self) -> bool:
+        # Backends that don't say are assumed to do I/O
+        return getattr(self.backend, "blocking", True)
+
+    async def aget(self, request: Dict[str, Any]) -> Optional[ChatCompletion]:
+        """Async get(); a blocking backend (SQLite) is read on a worker thread."""
+        if not self._blocks():
+            return self.get(request)
+        return await asyncio.to_thread(self.get, request)
+
+    async def aset(self, request: Dict[str, Any], response: ChatCompletion):
+        """Async set(); a blocking backend (SQLite) is written on a worker thread."""
+        if not self._blocks():
+            self.set(request, response)
+            return
+        await asyncio.to_thread(self.set, request, response)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for reporting."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "skipped": self.skipped,
+            "hit_rate": round(self.hit_rate, 3),
+            "entries": len(self.backend)
+        }
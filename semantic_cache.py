@@ -0,0 +1,304 @@
+"""
+Semantic response cache for LLMAgent.chat.
+
+User queries are embedded and compared against the queries of previously
+answered turns. When a stored query is similar enough, its answer is returned
+without any LLM round trip, so "How's the weather in SF?" can reuse the answer to
+"What's the weather like in San Francisco?".
+
+Similar wording isn't enough on its own: "Compare the weather between New York
+and London" embeds close to the same question about New York and Tokyo. A hit
+therefore also requires the two queries to name the same entities, as found by
+the extractor the cache is built with (any function from a query to a set of
+strings; the weather demo passes intent_planner.mentioned_places).
+
+The default HashingEmbedder runs locally with no network access; any object with
+an ``embed(texts) -> np.ndarray`` method and a ``dim`` attribute can replace it.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# Common abbreviations folded into their full names before embedding
+DEFAULT_ALIASES = {
+    "sf": "san francisco",
+    "nyc": "new york",
+    "ny": "new york",
+    "la": "los angeles",
+    "uk": "united kingdom",
+    "temp": "temperature",
+}
+
+STOPWORDS = frozenset(
+    "a an the is are was be what what's whats how how's hows like in at on for of to "
+    "me my i i'm im you your it it's its please can could would will do does today "
+    "current currently right now tell about there".split()
+)
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+class HashingEmbedder:
+    """
+    Local bag-of-features embedder using the hashing trick.
+
+    Each query is reduced to its content words (after folding aliases and dropping
+    stopwords) plus their character trigrams, so small spelling differences still
+    overlap. Features are hashed with CRC32 into a fixed number of signed buckets,
+    which keeps the embedding stable across processes.
+    """
+
+    def __init__(self, dim: int = 512, aliases: Optional[Dict[str, str]] = None,
+                 trigram_weight: float = 0.5):
+        """
+        Args:
+            dim (int): Number of hash buckets (embedding size)
+            aliases (Dict[str, str], optional): Abbreviation to full-form mapping
+            trigram_weight (float): Weight of character trigrams relative to whole words
+        """
+        self.dim = dim
+        self.aliases = DEFAULT_ALIASES if aliases is None else aliases
+        self.trigram_weight = trigram_weight
+
+    def _features(self, text: str) -> List[tuple]:
+        words = []
+        for word in _WORD_RE.findall(text.lower()):
+            words.extend(self.aliases.get(word, word).split())
+        words = [w for w in words if w not in STOPWORDS]
+
+        features = [(w, 1.0) for w in words]
+        for w in words:
+            padded = f"#{w}#"
+            features.extend((padded[i:i + 3], self.trigram_weight) for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts (Sequence[str]): Texts to embed
+
+        Returns:
+            np.ndarray: L2-normalized float32 array of shape (len(texts), dim)
+        """
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += weight if (h >> 31) & 1 else -weight
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class OpenAIEmbedder:
+    """Embedder backed by the OpenAI embeddings endpoint."""
+
+    def __init__(self, client, model: str = "text-embedding-3-small", dim: int = 1536):
+        """
+        Args:
+            client (OpenAI): Client used for embedding requests
+            model (str): Embedding model name
+            dim (int): Size of the vectors returned by the model
+        """
+        self.client = client
+        self.model = model
+        self.dim = dim
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        response = self.client.embeddings.create(model=self.model, input=list(texts))
+        vectors = np.array([item.embedding for item in response.data], dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@dataclass
+class SemanticHit:
+    """A cached answer returned for a similar query."""
+
+    answer: str
+    similarity: float
+    matched_query: str
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache of (query, answer) pairs backed by a NumPy matrix.
+
+    Lookups are a single matrix-vector product over the stored query vectors.
+    When the cache is full the least recently used entry is overwritten.
+    """
+
+    def __init__(self, entities: Callable[[str], Iterable[str]], embedder=None, threshold: float = 0.8,
+                 max_entries: int = 1000, ttl: Optional[float] = None, path: Optional[str] = None):
+        """
+        Args:
+            entities (Callable): Entities of a query that a hit must share exactly, e.g. the
+                places it names (intent_planner.mentioned_places)
+            embedder: Object with embed(texts) and dim; defaults to HashingEmbedder
+            threshold (float): Minimum cosine similarity for a hit
+            max_entries (int): Capacity of the index
+            ttl (float, optional): Seconds an entry stays valid, None for no expiry
+            path (str, optional): File (ending in .npz) to load from and save to
+        """
+        self.embedder = embedder or HashingEmbedder()
+        self.entities = entities
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+
+        self._vectors = np.zeros((max_entries, self.embedder.dim), dtype=np.float32)
+        self._queries: List[Optional[str]] = [None] * max_entries
+        self._answers: List[Optional[str]] = [None] * max_entries
+        self._entities: List[Optional[FrozenSet[str]]] = [None] * max_entries
+        self._created = np.zeros(max_entries, dtype=np.float64)
+        self._last_used = np.full(max_entries, -np.inf, dtype=np.float64)
+        self._slots: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self._lookup_seconds = deque(maxlen=10000)
+        self._miss_turn_seconds = deque(maxlen=10000)
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def lookup(self, query: str) -> Optional[SemanticHit]:
+        """
+        Find the cached answer for the most similar stored query.
+
+        Args:
+            query (str): The user's query
+
+        Returns:
+            Optional[SemanticHit]: The most similar entry above the threshold that names
+                the same entities as the query, or None
+        """
+        started = time.perf_counter()
+        vector = self.embedder.embed([query])[0]
+        entities = frozenset(self.entities(query))
+        with self._lock:
+            now = time.time()
+            scores = self._vectors @ vector
+            scores[np.isneginf(self._last_used)] = -np.inf
+            if self.ttl is not None:
+                scores[self._created < now - self.ttl] = -np.inf
+            candidates = np.flatnonzero(scores >= self.threshold)
+            hit = None
+            for slot in candidates[np.argsort(-scores[candidates])]:
+                if self._entities[slot] == entities:
+                    self._last_used[slot] = now
+                    hit = SemanticHit(self._answers[slot], float(scores[slot]), self._queries[slot])
+                    break
+            if hit is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self._lookup_seconds.append(time.perf_counter() - started)
+        return hit
+
+    def store(self, query: str, answer: str, turn_seconds: Optional[float] = None):
+        """
+        Add a (query, answer) pair, evicting the least recently used entry if full.
+
+        Args:
+            query (str): The user's query
+            answer (str): The agent's final answer
+            turn_seconds (float, optional): How long the uncached turn took, for reporting
+        """
+        vector = self.embedder.embed([query])[0]
+        entities = frozenset(self.entities(query))
+        with self._lock:
+            slot = self._slots.get(query)
+            if slot is None:
+                slot = int(np.argmin(self._last_used))
+                self._slots.pop(self._queries[slot], None)
+                self._slots[query] = slot
+            now = time.time()
+            self._vectors[slot] = vector
+            self._queries[slot] = query
+            self._answers[slot] = answer
+            self._entities[slot] = entities
+            self._created[slot] = now
+            self._last_used[slot] = now
+            if turn_seconds is not None:
+                self._miss_turn_seconds.append(turn_seconds)
+
+    def clear(self):
+        with self._lock:
+            self._vectors[:] = 0
+            self._queries = [None] * self.max_entries
+            self._answers = [None] * self.max_entries
+            self._entities = [None] * self.max_entries
+            self._last_used[:] = -np.inf
+            self._slots.clear()
+
+    def save(self, path: Optional[str] = None):
+        """Write the index to an .npz file."""
+        path = path or self.path
+        with self._lock:
+            used = np.flatnonzero(~np.isneginf(self._last_used))
+            meta = {
+                "dim": self.embedder.dim,
+                "queries": [self._queries[i] for i in used],
+                "answers": [self._answers[i] for i in used],
+            }
+            np.savez_compressed(
+                path,
+                vectors=self._vectors[used],
+                created=self._created[used],
+                last_used=self._last_used[used],
+                meta=np.array(json.dumps(meta))
+            )
+
+    def load(self, path: Optional[str] = None):
+        """Load an index written by save(); entries beyond max_entries are dropped."""
+        path = path or self.path
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta["dim"] != self.embedder.dim:
+                return
+            order = np.argsort(-data["last_used"])[:self.max_entries]
+            with self._lock:
+                for slot, i in enumerate(order):
+                    self._vectors[slot] = data["vectors"][i]
+                    self._created[slot] = data["created"][i]
+                    self._last_used[slot] = data["last_used"][i]
+                    self._queries[slot] = meta["queries"][i]
+                    self._answers[slot] = meta["answers"][i]
+                    # Entities aren't saved; recomputing them applies a changed extractor to old entries
+                    self._entities[slot] = frozenset(self.entities(meta["queries"][i]))
+                    self._slots[meta["queries"][i]] = slot
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self) -> Dict[str, float]:
+        """Hit rate, lookup latency and the average latency of turns that missed."""
+        lookups_ms = np.array(self._lookup_seconds or [0.0]) * 1000
+        turns_ms = np.array(self._miss_turn_seconds or [0.0]) * 1000
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 3),
+            "lookup_ms_p50": round(float(np.percentile(lookups_ms, 50)), 3),
+            "lookup_ms_p95": round(float(np.percentile(lookups_ms, 95)), 3),
+            "uncached_turn_ms_avg": round(float(turns_ms.mean()), 1),
+        }
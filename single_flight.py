@@ -0,0 +1,109 @@
+"""
+Single-flight coalescing of identical concurrent LLM requests.
+
+When many users send the same query at the same moment, each identical request
+would otherwise pay for its own completion. SingleFlight lets the first caller
+for a key (the leader) make the call while later callers with the same key
+(followers) wait for the leader's result instead. The key is the canonical
+request hash from response_cache.make_cache_key, so requests only coalesce when
+model, messages, tools, tool choice and temperature all match.
+
+Leaders and followers can be threads, coroutines or a mix: every in-flight call
+is tracked with a concurrent.futures.Future, which coroutines await through
+asyncio.wrap_future. A follower that is cancelled (a timeout, a client
+disconnect) stops waiting without cancelling the shared future under the
+others.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class SingleFlight:
+    """
+    Shares one in-flight call between concurrent callers with the same key.
+
+    Usage:
+        coalescer = SingleFlight()
+        agents = [LLMAgent(coalescer=coalescer) for _ in range(10)]
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"leaders": 0, "coalesced": 0}
+
+    @property
+    def in_flight(self) -> int:
+        """Number of keys with a call currently running."""
+        return len(self._calls)
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """Return the future for `key` and whether the caller became its leader."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self.stats["leaders"] += 1
+            return future, True
+
+    def _finish(self, key: str):
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def _settle(self, key: str, future: Future, result: Any = None, exception: Optional[BaseException] = None):
+        """
+        Settle the shared future, then retire the key.
+
+        The key is retired only after the future is settled, so a caller arriving
+        in between joins the finished call instead of starting a second one.
+        """
+        if not future.cancelled():
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+        self._finish(key)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run `fn` unless an identical call is already in flight, in which case wait for it.
+
+        Args:
+            key (str): Identity of the call, e.g. make_cache_key(request)
+            fn (Callable): Performs the call
+
+        Returns:
+            Any: The leader's result (followers receive the same object)
+
+        Raises:
+            Exception: Whatever the leader's call raised, re-raised in every follower
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as exc:
+            self._settle(key, future, exception=exc)
+            raise
+        self._settle(key, future, result)
+        return result
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async variant of do(); fn must return an awaitable."""
+        future, leader = self._join(key)
+        if not leader:
+            # Shielded: cancelling this follower must not cancel the future the others share
+            return await asyncio.shield(asyncio.wrap_future(future))
+        try:
+            result = await fn()
+        except BaseException as exc:
+            self._settle(key, future, exception=exc)
+            raise
+        self._settle(key, future, result)
+        return result
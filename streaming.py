@@ -0,0 +1,134 @@
+"""
+Helpers for consuming streamed chat completions.
+
+A streamed completion arrives as a series of chunks whose deltas carry pieces of
+the assistant's content and of its tool calls. StreamAccumulator stitches those
+pieces back into a regular assistant message and times the stream as it goes.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from openai.types.chat import ChatCompletionMessage
+
+
+@dataclass
+class StreamStats:
+    """Timing for a single streamed LLM call."""
+
+    model: str
+    started_at: float = field(default_factory=time.perf_counter)
+    first_token_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    chunk_count: int = 0
+    completion_tokens: Optional[int] = None
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        """Seconds from sending the request to the first content or tool-call delta."""
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    @property
+    def tokens(self) -> int:
+        """Completion tokens, from the usage chunk when available, otherwise one per delta."""
+        return self.completion_tokens if self.completion_tokens is not None else self.chunk_count
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Generation rate measured from the first token to the end of the stream."""
+        if self.first_token_at is None or self.finished_at is None:
+            return None
+        elapsed = self.finished_at - self.first_token_at
+        return self.tokens / elapsed if elapsed > 0 else None
+
+    def summary(self) -> str:
+        """Human readable one-line summary."""
+        ttft = self.time_to_first_token
+        rate = self.tokens_per_second
+        ttft_text = f"{ttft * 1000:.0f} ms" if ttft is not None else "n/a"
+        rate_text = f"{rate:.1f} tokens/s" if rate is not None else "n/a"
+        return f"TTFT {ttft_text}, {self.tokens} tokens, {rate_text}"
+
+
+class StreamAccumulator:
+    """
+    Rebuilds an assistant message from streamed chunks.
+
+    Tool call deltas are keyed by their ``index``: the first delta for an index
+    carries the call id and function name, later ones append argument fragments.
+    """
+
+    def __init__(self, model: str):
+        self.stats = StreamStats(model=model)
+        self.usage = None
+        self._content: List[str] = []
+        self._tool_calls: Dict[int, Dict[str, str]] = {}
+
+    def add(self, chunk) -> Optional[str]:
+        """
+        Fold one chunk into the message.
+
+        Args:
+            chunk: A ChatCompletionChunk from a streamed request
+
+        Returns:
+            Optional[str]: The content text carried by this chunk, if any
+        """
+        if getattr(chunk, "model", None):
+            # The model serving the stream, which a router may have swapped for a fallback
+            self.stats.model = chunk.model
+        if getattr(chunk, "usage", None) is not None:
+            self.usage = chunk.usage
+            self.stats.completion_tokens = chunk.usage.completion_tokens
+        if not chunk.choices:
+            return None
+
+        delta = chunk.choices[0].delta
+        if not delta.content and not delta.tool_calls:
+            return None
+
+        if self.stats.first_token_at is None:
+            self.stats.first_token_at = time.perf_counter()
+        self.stats.chunk_count += 1
+
+        for tool_call_delta in delta.tool_calls or []:
+            entry = self._tool_calls.setdefault(
+                tool_call_delta.index, {"id": "", "name": "", "arguments": ""}
+            )
+            if tool_call_delta.id:
+                entry["id"] = tool_call_delta.id
+            function = tool_call_delta.function
+            if function is not None:
+                if function.name:
+                    entry["name"] += function.name
+                if function.arguments:
+                    entry["arguments"] += function.arguments
+
+        if delta.content:
+            self._content.append(delta.content)
+            return delta.content
+        return None
+
+    def finish(self) -> StreamStats:
+        """Mark the end of the stream and return its stats."""
+        self.stats.finished_at = time.perf_counter()
+        return self.stats
+
+    def message(self) -> ChatCompletionMessage:
+        """The assistant message assembled so far."""
+        tool_calls = [
+            {
+                "id": entry["id"],
+                "type": "function",
+                "function": {"name": entry["name"], "arguments": entry["arguments"]}
+            }
+            for _, entry in sorted(self._tool_calls.items())
+        ]
+        return ChatCompletionMessage.model_validate({
+            "role": "assistant",
+            "content": "".join(self._content) or None,
+            "tool_calls": tool_calls or None
+        })
@@ -0,0 +1,137 @@
+import asyncio
+import time
+import unittest
+
+import httpx
+import openai
+from openai import OpenAI
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, ModelRouter
+from llm_agent import LLMAgent
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+
+
+def _status_error(status: int) -> openai.APIStatusError:
+    response = httpx.Response(status, request=httpx.Request("POST", "http://mock/v1/chat/completions"))
+    error_class = openai.BadRequestError if status == 400 else openai.InternalServerError
+    return error_class("mock error", response=response, body=None)
+
+
+class TrackTest(unittest.TestCase):
+
+    def setUp(self):
+        self.breaker = CircuitBreaker("gpt-4o", min_calls=1, open_seconds=0.0)
+        self.breaker.record(0.1, failed=True)
+        self.assertTrue(self.breaker.allow_request())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+
+    def test_probe_slot_held_until_the_call_settles(self):
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_release_frees_the_probe_slot(self):
+        self.breaker.release()
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_answered_release_closes(self):
+        self.breaker.release(answered=True)
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_release_outside_half_open_is_a_no_op(self):
+        breaker = CircuitBreaker("gpt-4o")
+        breaker.release(answered=True)
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(breaker.stats["closed"], 0)
+
+    def test_track_records_success(self):
+        with self.breaker.track():
+            pass
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.stats["calls"], 2)
+
+    def test_track_settles_non_transient_errors_and_cancellation(self):
+        with self.assertRaises(asyncio.CancelledError):
+            with self.breaker.track():
+                raise asyncio.CancelledError()
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+        with self.assertRaises(openai.BadRequestError):
+            with self.breaker.track():
+                raise _status_error(400)
+        self.assertEqual(self.breaker.state, CLOSED)
+        # Neither exit counts as a call in the window
+        self.assertEqual(self.breaker.stats["calls"], 1)
+
+
+class HalfOpenProbeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.router = ModelRouter({"gpt-4o": "gpt-4o-mini"}, min_calls=1, open_seconds=0.0)
+        self.breaker = self.router.breaker("gpt-4o")
+        self.breaker.record(0.1, failed=True)
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def probe(self, error: BaseException):
+        self.assertEqual(self.router.route("gpt-4o"), "gpt-4o")
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        with self.assertRaises(type(error)):
+            with self.breaker.track():
+                raise error
+
+    def test_non_transient_error_completes_probe(self):
+        self.probe(_status_error(400))
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.router.route("gpt-4o"), "gpt-4o")
+
+    def test_cancelled_probe_frees_its_slot(self):
+        self.probe(asyncio.CancelledError())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertEqual(self.router.route("gpt-4o"), "gpt-4o")
+
+    def test_transient_error_reopens(self):
+        self.probe(_status_error(500))
+        self.assertEqual(self.breaker.state, OPEN)
+
+
+class BreakerLatencyTest(unittest.TestCase):
+
+    def test_rate_limiter_wait_is_not_model_latency(self):
+        router = ModelRouter({"gpt-4o": "gpt-4o-mini"}, latency_threshold=0.3, min_calls=1)
+        with MockOpenAIServer(latency=0.0) as server:
+            client = OpenAI(api_key="mock", base_url=server.base_url, max_retries=0)
+            # 120 RPM: the second request waits ~0.5 s for capacity
+            agent = LLMAgent(client=client, verbose=False, router=router,
+                             rate_limiter=RateLimiter(requests_per_minute=120))
+            agent.rate_limiter.requests.level = 1.0
+            started = time.perf_counter()
+            agent.chat("What's 2 + 2?")
+            agent.chat("What's 3 + 3?")
+            self.assertGreater(time.perf_counter() - started, 0.3)
+        breaker = router.breaker("gpt-4o")
+        self.assertEqual(breaker.stats["slow_calls"], 0)
+        self.assertEqual(breaker.state, CLOSED)
+
+
+class FallbackCacheTest(unittest.TestCase):
+
+    def test_fallback_answers_are_not_cached_under_the_requested_model(self):
+        router = ModelRouter({"gpt-4o": "gpt-4o-mini"}, min_calls=1, open_seconds=60.0)
+        router.breaker("gpt-4o").record(0.1, failed=True)
+        cache = ResponseCache()
+        with MockOpenAIServer(latency=0.0) as server:
+            client = OpenAI(api_key="mock", base_url=server.base_url, max_retries=0)
+            agent = LLMAgent(client=client, verbose=False, router=router, response_cache=cache)
+            agent.chat("What's 2 + 2?")
+            self.assertEqual(len(cache.backend), 0)
+            # Once the primary recovers its own answers are cached again
+            router.breaker("gpt-4o")._transition(CLOSED)
+            agent.reset_conversation()
+            agent.chat("What's 2 + 2?")
+        self.assertEqual(len(cache.backend), 1)
+        self.assertEqual(cache.hits, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from client_factory import close_shared_clients
+from llm_agent import AsyncLLMAgent, LLMAgent
+
+QUERY = "Hello there"
+
+
+class CloseSharedClientsTest(unittest.TestCase):
+    """Agents on the shared pool keep working after it is closed."""
+
+    def setUp(self):
+        self.server = MockOpenAIServer(latency=0.0).start()
+        self.addCleanup(self.server.stop)
+        environment = mock.patch.dict(os.environ, {"OPENAI_API_KEY": "mock", "OPENAI_BASE_URL": self.server.base_url})
+        environment.start()
+        self.addCleanup(environment.stop)
+        close_shared_clients()
+        self.addCleanup(close_shared_clients)
+
+    def test_chat_after_close(self):
+        agent = LLMAgent(verbose=False)
+        self.assertFalse(agent.chat(QUERY).startswith("Sorry"))
+        close_shared_clients()
+        self.assertFalse(agent.chat(QUERY).startswith("Sorry"))
+
+    def test_async_chat_after_close(self):
+        async def chat():
+            agent = AsyncLLMAgent(verbose=False)
+            first = await agent.chat(QUERY)
+            close_shared_clients()
+            return first, await agent.chat(QUERY)
+        for answer in asyncio.run(chat()):
+            self.assertFalse(answer.startswith("Sorry"))
+
+
+if __name__ == "__main__":
+    unittest.main()
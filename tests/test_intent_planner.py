@@ -0,0 +1,44 @@
+import unittest
+
+from intent_planner import IntentPlanner
+
+
+class UnknownPlaceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.planner = IntentPlanner()
+
+    def test_lowercase_unknown_place_falls_back(self):
+        for query in ("whats the weather in paris and london?", "weather in london vs paris",
+                      "paris vs london weather", "london and berlin weather please"):
+            with self.subTest(query=query):
+                self.assertIsNone(self.planner.plan(query))
+
+    def test_known_places_are_planned(self):
+        for query in ("What's the weather in London right now?", "weather for sf and nyc",
+                      "weather in tokyo in the morning", "Is it going to rain in Tokyo?"):
+            with self.subTest(query=query):
+                self.assertIsNotNone(self.planner.plan(query))
+
+
+class DateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.planner = IntentPlanner()
+
+    def test_past_and_future_dates_fall_back(self):
+        for query in ("will it rain in London tomorrow", "What was the weather in Tokyo yesterday?",
+                      "What's the forecast for New York?", "Weather in Tokyo next week",
+                      "Is it going to be sunny in London this weekend?", "Weather in London on Friday",
+                      "weather in sf in 3 days", "What's the weather in London tonight?"):
+            with self.subTest(query=query):
+                self.assertIsNone(self.planner.plan(query))
+
+    def test_current_weather_is_planned(self):
+        for query in ("What's the weather in London today?", "How's the weather in Tokyo now?"):
+            with self.subTest(query=query):
+                self.assertIsNotNone(self.planner.plan(query))
+
+
+if __name__ == "__main__":
+    unittest.main()
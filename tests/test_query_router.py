@@ -0,0 +1,26 @@
+import unittest
+
+from query_router import DEFAULT, GENERAL, QueryRouter
+
+
+class LocationRoutingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.router = QueryRouter()
+
+    def test_place_questions_keep_the_tools(self):
+        for query in ("What are the conditions like in NYC?", "How is it in London right now?",
+                      "Is it nice out in Paris?", "what's tokyo like at the moment?"):
+            with self.subTest(query=query):
+                route = self.router.route(query)
+                self.assertEqual(route.category, DEFAULT)
+                self.assertTrue(route.use_tools)
+
+    def test_general_questions_stay_general(self):
+        for query in ("How do I reverse a list in Python?", "What is the capital of Australia?"):
+            with self.subTest(query=query):
+                self.assertEqual(self.router.classify(query), GENERAL)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from openai import OpenAI
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from circuit_breaker import ModelRouter
+from llm_agent import LLMAgent
+from rate_limiter import RateLimiter, shared_rate_limiter
+
+
+class PerModelLimiterTest(unittest.TestCase):
+
+    def chat_with_fallback(self, rate_limiter):
+        """One turn while gpt-4o's breaker is open, so the call goes to gpt-4o-mini."""
+        router = ModelRouter({"gpt-4o": "gpt-4o-mini"}, min_calls=1, open_seconds=60.0)
+        router.breaker("gpt-4o").record(0.1, failed=True)
+        with MockOpenAIServer(latency=0.0) as server:
+            client = OpenAI(api_key="mock", base_url=server.base_url, max_retries=0)
+            agent = LLMAgent(client=client, verbose=False, router=router, rate_limiter=rate_limiter)
+            agent.chat("What's 2 + 2?")
+
+    def test_factory_meters_the_routed_model(self):
+        limiters = {"gpt-4o": RateLimiter(), "gpt-4o-mini": RateLimiter()}
+        self.chat_with_fallback(limiters.__getitem__)
+        self.assertEqual(limiters["gpt-4o"].stats["acquired"], 0)
+        self.assertEqual(limiters["gpt-4o-mini"].stats["acquired"], 1)
+
+    def test_agent_limiter_only_meters_the_agent_model(self):
+        limiter = RateLimiter()
+        fallback = shared_rate_limiter("gpt-4o-mini")
+        acquired = fallback.stats["acquired"]
+        self.chat_with_fallback(limiter)
+        self.assertEqual(limiter.stats["acquired"], 0)
+        self.assertEqual(fallback.stats["acquired"], acquired + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+import unittest
+from email.utils import formatdate
+
+import httpx
+import openai
+
+from resilience import HedgePolicy, ResilientCaller, RetryPolicy
+
+
+def _rate_limited(retry_after: str) -> openai.RateLimitError:
+    response = httpx.Response(429, headers={"retry-after": retry_after},
+                              request=httpx.Request("POST", "http://mock/v1/chat/completions"))
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+class RetryAfterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = RetryPolicy(max_delay=2.0)
+
+    def test_delay_never_exceeds_max_delay(self):
+        self.assertEqual(self.policy.delay(0, _rate_limited("3600")), 2.0)
+        self.assertEqual(self.policy.delay(0, _rate_limited("1")), 1.0)
+
+    def test_long_waits_give_up(self):
+        self.assertTrue(self.policy.gives_up(_rate_limited("3600")))
+        self.assertTrue(self.policy.gives_up(_rate_limited(formatdate(time.time() + 3600, usegmt=True))))
+        self.assertFalse(self.policy.gives_up(_rate_limited("1")))
+
+    def test_call_raises_instead_of_sleeping(self):
+        caller = ResilientCaller(self.policy)
+        attempts = []
+
+        def request(timeout):
+            attempts.append(timeout)
+            raise _rate_limited("3600")
+        started = time.perf_counter()
+        with self.assertRaises(openai.RateLimitError):
+            caller.call(request)
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertEqual(len(attempts), 1)
+
+
+class DiscardedHedgeTest(unittest.TestCase):
+    """The losing hedged request is billed too, so its response still reaches the caller."""
+
+    def setUp(self):
+        self.caller = ResilientCaller(hedge=HedgePolicy(default_delay=0.05))
+        self.discarded = []
+        self.arrived = threading.Event()
+
+    def discard(self, response):
+        self.discarded.append(response)
+        self.arrived.set()
+
+    def assert_loser_discarded(self, result):
+        self.assertEqual(result, "fast")
+        self.assertTrue(self.arrived.wait(2.0))
+        self.assertEqual(self.discarded, ["slow"])
+        self.assertEqual(self.caller.stats["hedges_discarded"], 1)
+
+    def test_call(self):
+        attempts = []
+
+        def request(timeout):
+            attempts.append(timeout)
+            if len(attempts) == 1:
+                time.sleep(0.3)
+                return "slow"
+            return "fast"
+        self.assert_loser_discarded(self.caller.call(request, discarded=self.discard))
+
+    def test_acall(self):
+        attempts = []
+
+        async def request(timeout):
+            attempts.append(timeout)
+            if len(attempts) == 1:
+                await asyncio.sleep(0.3)
+                return "slow"
+            return "fast"
+
+        async def run():
+            result = await self.caller.acall(request, discarded=self.discard)
+            # The loser finishes on the event loop after the winner returned
+            await asyncio.sleep(0.5)
+            return result
+        self.assert_loser_discarded(asyncio.run(run()))
+
+
+if __name__ == "__main__":
+    unittest.main()
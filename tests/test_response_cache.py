@@ -0,0 +1,57 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+
+from openai import AsyncOpenAI
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from llm_agent import AsyncLLMAgent
+from response_cache import DiskCacheBackend, MemoryCacheBackend, ResponseCache
+
+
+class RecordingDiskBackend(DiskCacheBackend):
+    """Notes the thread every lookup and write runs on."""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.current_thread())
+        return super().get(key)
+
+    def set(self, key, value, expires_at):
+        self.threads.append(threading.current_thread())
+        super().set(key, value, expires_at)
+
+
+class AsyncDiskCacheTest(unittest.TestCase):
+
+    def test_disk_io_runs_off_the_event_loop(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        backend = RecordingDiskBackend(os.path.join(directory.name, "cache.sqlite3"))
+        self.addCleanup(backend._conn.close)
+
+        async def chat():
+            client = AsyncOpenAI(api_key="mock", base_url=server.base_url, max_retries=0)
+            agent = AsyncLLMAgent(client=client, verbose=False, response_cache=ResponseCache(backend))
+            await agent.chat("What's 2 + 2?")
+            agent.reset_conversation()
+            return await agent.chat("What's 2 + 2?"), threading.current_thread()
+
+        with MockOpenAIServer(latency=0.0) as server:
+            answer, loop_thread = asyncio.run(chat())
+            self.assertEqual(server.request_count, 1)
+        self.assertTrue(answer)
+        self.assertEqual(len(backend.threads), 3)
+        self.assertNotIn(loop_thread, backend.threads)
+
+    def test_memory_backend_is_not_offloaded(self):
+        self.assertFalse(ResponseCache(MemoryCacheBackend())._blocks())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from openai import OpenAI
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from intent_planner import mentioned_places
+from llm_agent import LLMAgent
+from semantic_cache import SemanticCache
+
+
+class EntityGuardTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = SemanticCache(mentioned_places)
+        self.cache.store("Compare the weather between New York and Tokyo", "New York vs Tokyo")
+
+    def test_city_swap_misses(self):
+        self.assertIsNone(self.cache.lookup("Compare the weather between New York and London"))
+
+    def test_same_places_still_hit(self):
+        hit = self.cache.lookup("Compare the weather between NYC and Tokyo")
+        self.assertIsNotNone(hit)
+        self.assertEqual(hit.answer, "New York vs Tokyo")
+
+    def test_unknown_place_swap_misses(self):
+        self.cache.store("What's the weather in Paris right now?", "Paris")
+        self.assertIsNone(self.cache.lookup("What's the weather in Berlin right now?"))
+
+    def test_custom_entity_extractor(self):
+        cache = SemanticCache(lambda query: {word for word in query.split() if word.isupper()})
+        cache.store("What's the status of ticket ABC?", "ABC is open")
+        self.assertIsNone(cache.lookup("What's the status of ticket XYZ?"))
+        self.assertEqual(cache.lookup("What is the status of ticket ABC?").answer, "ABC is open")
+
+    def test_expired_entries_miss(self):
+        cache = SemanticCache(mentioned_places, ttl=0.0)
+        cache.store("What's the weather in London?", "London")
+        self.assertIsNone(cache.lookup("What's the weather in London?"))
+
+
+class AgentContextTest(unittest.TestCase):
+
+    def test_only_turns_without_history_use_the_cache(self):
+        cache = SemanticCache(mentioned_places)
+        with MockOpenAIServer(latency=0.0) as server:
+            client = OpenAI(api_key="mock", base_url=server.base_url, max_retries=0)
+            agent = LLMAgent(client=client, verbose=False, semantic_cache=cache)
+            agent.chat("What's 2 + 2?")
+            agent.chat("What's 3 + 3?")  # A follow-up: neither looked up nor stored
+            self.assertEqual(len(cache), 1)
+            agent.reset_conversation()
+            calls = server.request_count
+            agent.chat("What's 2 + 2?")
+            self.assertEqual(server.request_count, calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import asyncio
+import unittest
+
+from single_flight import SingleFlight
+
+
+class CancelledFollowerTest(unittest.TestCase):
+
+    def test_other_followers_still_get_the_result(self):
+        async def scenario():
+            flight = SingleFlight()
+            release = asyncio.Event()
+
+            async def call():
+                await release.wait()
+                return "answer"
+
+            leader = asyncio.create_task(flight.ado("key", call))
+            await asyncio.sleep(0)
+            followers = [asyncio.create_task(flight.ado("key", call)) for _ in range(3)]
+            await asyncio.sleep(0)
+            followers[0].cancel()
+            await asyncio.sleep(0)
+            release.set()
+            results = await asyncio.gather(leader, *followers, return_exceptions=True)
+            return flight, results
+
+        flight, results = asyncio.run(scenario())
+        self.assertEqual(results[0], "answer")
+        self.assertIsInstance(results[1], asyncio.CancelledError)
+        self.assertEqual(results[2:], ["answer", "answer"])
+        self.assertEqual(flight.in_flight, 0)
+
+
+class SettleBeforeFinishTest(unittest.TestCase):
+
+    def test_late_arrival_joins_the_settled_call(self):
+        flight = SingleFlight()
+        joined = []
+        finish = flight._finish
+
+        def late_finish(key):
+            # A caller arriving while the leader retires its key joins the finished call
+            future, leader = flight._join(key)
+            joined.append((leader, future.done()))
+            finish(key)
+
+        flight._finish = late_finish
+        self.assertEqual(flight.do("key", lambda: "first"), "first")
+        self.assertEqual(joined, [(False, True)])
+
+
+if __name__ == "__main__":
+    unittest.main()
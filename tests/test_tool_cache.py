@@ -0,0 +1,49 @@
+import asyncio
+import unittest
+
+from tool_cache import ToolResultCache
+from tool_registry import ToolCachePolicy
+
+ARGUMENTS = '{"location": "Tokyo"}'
+
+
+class CancelledWaiterTest(unittest.TestCase):
+
+    def run_burst(self, cancel: int):
+        """Start a burst of identical lookups, cancel one of them and return every outcome."""
+        cache = ToolResultCache(policies={"get_weather": ToolCachePolicy(ttl=60)})
+        calls = []
+
+        async def scenario():
+            release = asyncio.Event()
+
+            async def execute():
+                calls.append(1)
+                await release.wait()
+                return "sunny"
+
+            lookups = [asyncio.create_task(cache.acall("get_weather", ARGUMENTS, execute)) for _ in range(4)]
+            await asyncio.sleep(0.01)
+            lookups[cancel].cancel()
+            await asyncio.sleep(0)
+            release.set()
+            return await asyncio.gather(*lookups, return_exceptions=True)
+
+        return cache, calls, asyncio.run(scenario())
+
+    def assert_others_served(self, cancel: int):
+        cache, calls, results = self.run_burst(cancel)
+        self.assertIsInstance(results[cancel], asyncio.CancelledError)
+        self.assertEqual([r for i, r in enumerate(results) if i != cancel], ["sunny"] * 3)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.call("get_weather", ARGUMENTS, lambda: "not cached"), "sunny")
+
+    def test_cancelled_follower(self):
+        self.assert_others_served(cancel=2)
+
+    def test_cancelled_leader(self):
+        self.assert_others_served(cancel=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import json
+import unittest
+
+from llm_agent import LLMAgent
+from tool_output import ENCODINGS, encode_tool_result
+
+ROW = {"location": "Tokyo, Japan", "temperature": "22°C", "forecast": ["sun", "rain"]}
+
+
+class NonStringResultTest(unittest.TestCase):
+    """Tools that return dicts or lists are encoded like their JSON strings."""
+
+    def test_every_encoding_accepts_a_dict(self):
+        for encoding in ENCODINGS:
+            with self.subTest(encoding=encoding):
+                encoded = encode_tool_result(ROW, encoding)
+                self.assertIsInstance(encoded, str)
+                if encoding != "raw":
+                    self.assertEqual(encoded, encode_tool_result(json.dumps(ROW), encoding))
+        self.assertEqual(json.loads(encode_tool_result(ROW)), ROW)
+
+    def test_lists_and_rows_of_dicts(self):
+        batch = {"results": [ROW, dict(ROW, location="London, UK")]}
+        self.assertEqual(encode_tool_result(batch, "lines"), encode_tool_result(json.dumps(batch), "lines"))
+        self.assertEqual(encode_tool_result([1, 2], "compact_json"), "[1,2]")
+
+    def test_progress_log_reads_a_dict(self):
+        self.assertEqual(LLMAgent._result_locations(ROW), "Tokyo, Japan")
+        self.assertEqual(LLMAgent._result_locations([ROW]), str([ROW])[:80])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import asyncio
+import unittest
+
+from openai import AsyncOpenAI, OpenAI
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from llm_agent import AsyncLLMAgent, LLMAgent
+from resilience import ResilientCaller, RetryPolicy
+from tool_prefetch import SpeculativePrefetcher
+
+QUERY = "Compare the weather between London and Tokyo"
+
+
+class FailedPlanningTest(unittest.TestCase):
+    """A planning call that raises still settles the turn's speculative calls."""
+
+    def setUp(self):
+        self.prefetcher = SpeculativePrefetcher()
+        self.addCleanup(self.prefetcher.shutdown)
+        self.server = MockOpenAIServer(latency=0.0, error_rate=1.0).start()
+        self.addCleanup(self.server.stop)
+        self.options = dict(verbose=False, prefetcher=self.prefetcher,
+                            resilience=ResilientCaller(RetryPolicy(max_attempts=1)))
+
+    def assert_all_wasted(self, answer: str):
+        self.assertTrue(answer.startswith("Sorry"))
+        self.assertEqual(self.prefetcher.stats["speculated"], 2)
+        self.assertEqual(self.prefetcher.stats["wasted"], 2)
+
+    def test_chat(self):
+        client = OpenAI(api_key="mock", base_url=self.server.base_url, max_retries=0)
+        self.assert_all_wasted(LLMAgent(client=client, **self.options).chat(QUERY))
+
+    def test_chat_stream(self):
+        client = OpenAI(api_key="mock", base_url=self.server.base_url, max_retries=0)
+        self.assert_all_wasted("".join(LLMAgent(client=client, **self.options).chat_stream(QUERY)))
+
+    def test_async_chat(self):
+        async def chat():
+            client = AsyncOpenAI(api_key="mock", base_url=self.server.base_url, max_retries=0)
+            return await AsyncLLMAgent(client=client, **self.options).chat(QUERY)
+        self.assert_all_wasted(asyncio.run(chat()))
+
+    def test_async_chat_stream(self):
+        async def chat():
+            client = AsyncOpenAI(api_key="mock", base_url=self.server.base_url, max_retries=0)
+            return "".join([token async for token in AsyncLLMAgent(client=client, **self.options).chat_stream(QUERY)])
+        self.assert_all_wasted(asyncio.run(chat()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+from intent_planner import IntentPlanner
+from llm_agent import LLMAgent
+from tool_prefetch import SpeculativePrefetcher
+from tool_registry import ToolRegistry
+from weather_tool import get_weather_provider
+
+
+def _names(definitions):
+    return [d["function"]["name"] for d in definitions]
+
+
+class OptInToolsTest(unittest.TestCase):
+
+    def test_default_agent_offers_only_get_weather(self):
+        agent = LLMAgent(client=object(), verbose=False)
+        self.assertEqual(_names(agent.tools), ["get_weather"])
+
+    def test_opt_in_adds_the_batch_tool(self):
+        agent = LLMAgent(client=object(), verbose=False, opt_in_tools=["get_weather_batch"])
+        self.assertEqual(_names(agent.tools), ["get_weather", "get_weather_batch"])
+
+    def test_unknown_opt_in_tool(self):
+        with self.assertRaises(ValueError):
+            LLMAgent(client=object(), verbose=False, opt_in_tools=["get_wether_batch"])
+
+    def test_selection_rebuilt_after_register(self):
+        registry = ToolRegistry()
+
+        def first(x: str) -> str:
+            """First"""
+            return x
+
+        def second(x: str) -> str:
+            """Second"""
+            return x
+        registry.register(first)
+        registry.register(second, opt_in=True)
+        self.assertEqual(_names(registry.definitions), ["first"])
+        self.assertIs(registry.definitions_with(["second"]), registry.definitions_with(["second"]))
+        registry.register(second, name="third", opt_in=True)
+        self.assertEqual(_names(registry.definitions_with(["second", "third"])), ["first", "second", "third"])
+
+
+class BatchOnlyWhenOfferedTest(unittest.TestCase):
+    """Local plans and speculative guesses only call get_weather_batch when the model is offered it."""
+
+    QUERY = "Compare the weather between New York and Tokyo"
+
+    def planned_and_guessed(self, **options):
+        prefetcher = SpeculativePrefetcher()
+        self.addCleanup(prefetcher.shutdown)
+        agent = LLMAgent(client=object(), verbose=False, intent_planner=IntentPlanner(),
+                         prefetcher=prefetcher, **options)
+        route = agent._select_route(self.QUERY)
+        planned = [tc.function.name for tc in agent._plan_locally(self.QUERY, route).tool_calls]
+        prefetch = agent._start_prefetch(self.QUERY, route)
+        guessed = sorted({name for name, _ in prefetch._futures})
+        prefetch.resolve(None)
+        return planned, guessed
+
+    def test_default_agent_never_calls_the_batch_tool(self):
+        self.assertEqual(self.planned_and_guessed(), (["get_weather", "get_weather"], ["get_weather"]))
+
+    def test_opted_in_agent_batches(self):
+        self.assertEqual(self.planned_and_guessed(opt_in_tools=["get_weather_batch"]),
+                         (["get_weather_batch"], ["get_weather_batch"]))
+
+
+class BatchRowsTest(unittest.TestCase):
+
+    def test_batch_rows_are_copies_of_the_table(self):
+        provider = get_weather_provider()
+        row, = provider.get_batch(["Tokyo"])
+        row["temperature"] = "-40°F"
+        self.assertNotEqual(provider.get_batch(["Tokyo"])[0]["temperature"], "-40°F")
+
+
+if __name__ == "__main__":
+    unittest.main()
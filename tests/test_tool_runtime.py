@@ -0,0 +1,109 @@
+import json
+import signal
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from tool_registry import ToolRegistry
+from tool_runtime import ToolRuntime, _WorkerPool, _init_worker, _run_in_worker
+
+
+def nap(seconds: float) -> str:
+    """
+    Sleep, standing in for a CPU-bound tool
+
+    Args:
+        seconds (float): How long to sleep
+    """
+    time.sleep(seconds)
+    return "done"
+
+
+def _in_thread(function, timeout=5.0):
+    """Run function on a daemon thread; fail instead of hanging the test run."""
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", function()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise AssertionError(f"{function} did not return within {timeout}s")
+    return result.get("value")
+
+
+class WorkerPoolAbandonTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = _WorkerPool(lambda: ThreadPoolExecutor(max_workers=4), workers=4)
+        self.addCleanup(_in_thread, self.pool.shutdown)
+
+    def test_call_finished_before_abandon(self):
+        future = self.pool.submit(lambda: 1)
+        future.result()
+        self.assertFalse(_in_thread(lambda: self.pool.abandon(future)))
+        # The pool still takes calls
+        self.assertEqual(_in_thread(lambda: self.pool.submit(lambda: 2).result()), 2)
+
+    def test_running_call_is_released_when_it_finishes(self):
+        release = threading.Event()
+        future = self.pool.submit(release.wait)
+        time.sleep(0.05)
+        self.assertFalse(_in_thread(lambda: self.pool.abandon(future)))
+        release.set()
+        future.result()
+        self.assertEqual(len(self.pool._abandoned), 0)
+
+    def test_pool_retired_when_half_the_workers_hang(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        futures = [self.pool.submit(release.wait) for _ in range(2)]
+        time.sleep(0.05)
+        self.assertFalse(_in_thread(lambda: self.pool.abandon(futures[0])))
+        self.assertTrue(_in_thread(lambda: self.pool.abandon(futures[1])))
+
+
+class ToolRuntimeTimeoutTest(unittest.TestCase):
+
+    def test_timed_out_call_then_next_call(self):
+        registry = ToolRegistry()
+
+        def slow(seconds: float) -> str:
+            """Sleep"""
+            time.sleep(seconds)
+            return "done"
+        registry.register(slow, timeout=0.1)
+        runtime = ToolRuntime(max_workers=2)
+        self.addCleanup(runtime.shutdown)
+        self.assertIn('"timed_out": true', runtime.execute(registry, "slow", '{"seconds": 0.5}'))
+        self.assertEqual(runtime.execute(registry, "slow", '{"seconds": 0}'), "done")
+
+
+@unittest.skipUnless(hasattr(signal, "setitimer"), "needs SIGALRM timers")
+class ProcessWorkerTest(unittest.TestCase):
+
+    def test_worker_stops_an_overrunning_call(self):
+        previous = signal.getsignal(signal.SIGALRM), signal.getsignal(signal.SIGINT)
+        self.addCleanup(signal.signal, signal.SIGALRM, previous[0])
+        self.addCleanup(signal.signal, signal.SIGINT, previous[1])
+        _init_worker()
+        started = time.perf_counter()
+        result = json.loads(_run_in_worker(__name__, "nap", '{"seconds": 5}', "nap", 0.1))
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertTrue(result["timed_out"])
+
+    def test_retiring_the_pool_lets_other_calls_finish(self):
+        registry = ToolRegistry()
+        registry.register(nap, cpu_bound=True, timeout=2.0)
+        registry.register(nap, name="stuck_nap", cpu_bound=True, timeout=0.3)
+        runtime = ToolRuntime(process_workers=2)
+        self.addCleanup(runtime.shutdown)
+        with ThreadPoolExecutor(max_workers=2) as callers:
+            healthy = callers.submit(runtime.execute, registry, "nap", '{"seconds": 1.0}')
+            stuck = callers.submit(runtime.execute, registry, "stuck_nap", '{"seconds": 30}')
+            self.assertIn('"timed_out": true', stuck.result(5))
+            self.assertEqual(runtime.stats["retired_pools"], 1)
+            self.assertEqual(healthy.result(5), "done")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import asyncio
+import unittest
+
+from openai import AsyncOpenAI, OpenAI
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from circuit_breaker import ModelRouter
+from llm_agent import AsyncLLMAgent, LLMAgent
+from usage_accounting import UsageAccountant
+
+
+def _open_router() -> ModelRouter:
+    router = ModelRouter({"gpt-4o": "gpt-4o-mini"}, min_calls=1, open_seconds=3600)
+    router.breaker("gpt-4o").record(0.1, failed=True)
+    return router
+
+
+class FallbackBillingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockOpenAIServer(latency=0.0).start()
+        self.addCleanup(self.server.stop)
+        self.accountant = UsageAccountant()
+
+    def assert_billed_to_fallback(self):
+        self.assertTrue(self.accountant.calls())
+        self.assertEqual({call.model for call in self.accountant.calls()}, {"gpt-4o-mini"})
+
+    def test_chat(self):
+        client = OpenAI(api_key="mock", base_url=self.server.base_url, max_retries=0)
+        agent = LLMAgent(client=client, verbose=False, router=_open_router(), accountant=self.accountant)
+        agent.chat("What's 2 + 2?")
+        self.assert_billed_to_fallback()
+
+    def test_chat_stream(self):
+        client = OpenAI(api_key="mock", base_url=self.server.base_url, max_retries=0)
+        agent = LLMAgent(client=client, verbose=False, router=_open_router(), accountant=self.accountant)
+        "".join(agent.chat_stream("What's 2 + 2?"))
+        self.assert_billed_to_fallback()
+
+    def test_async_chat(self):
+        async def chat():
+            client = AsyncOpenAI(api_key="mock", base_url=self.server.base_url, max_retries=0)
+            agent = AsyncLLMAgent(client=client, verbose=False, router=_open_router(),
+                                  accountant=self.accountant)
+            await agent.chat("What's 2 + 2?")
+            await client.close()
+        asyncio.run(chat())
+        self.assert_billed_to_fallback()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import threading
+import unittest
+
+from benchmarks.stub_weather_server import StubWeatherServer
+from weather_provider import HTTPWeatherProvider
+
+LOCATIONS = ["Tokyo", "London", "New York"]
+
+
+class BatchPoolTest(unittest.TestCase):
+
+    def test_batches_reuse_the_provider_threads(self):
+        with StubWeatherServer(latency=0.0) as server:
+            provider = HTTPWeatherProvider(server.base_url)
+            before = threading.active_count()
+            first = provider.get_batch(LOCATIONS)
+            self.addCleanup(provider.shutdown)
+            pool = provider.batch_pool
+            threads = threading.active_count()
+            for _ in range(5):
+                self.assertEqual(provider.get_batch(LOCATIONS), first)
+            self.assertIs(provider.batch_pool, pool)
+            self.assertEqual(threading.active_count(), threads)
+        self.assertGreater(threads, before)
+        self.assertEqual([row["location"] for row in first], ["Tokyo, Japan", "London, UK", "New York, NY"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Token counting helpers.
+
+Uses tiktoken when it is installed and falls back to a characters-per-token
+estimate otherwise, which is close enough for budgeting English chat text.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict
+
+try:
+    import tiktoken
+except ImportError:  # Optional dependency
+    tiktoken = None
+
+# Approximate characters per token for English text with OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+# Per-message framing overhead added by the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    """
+    Count the tokens in a piece of text.
+    
+    Args:
+        text (str): The text to count
+        model (str): Model whose tokenizer to use when tiktoken is available
+        
+    Returns:
+        int: Number of tokens (estimated when tiktoken is not installed)
+    """
+    if not text:
+        return 0
+    if tiktoken is not None:
+        return len(_encoding(model).encode(text))
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+def count_message_tokens(message: Dict[str, Any], model: str = "gpt-4o") -> int:
+    """
+    Count the tokens a chat message contributes to a prompt.
+    
+    Args:
+        message (Dict[str, Any]): A chat message dict
+        model (str): Model whose tokenizer to use when tiktoken is available
+        
+    Returns:
+        int: Tokens for the content, any tool calls and the message framing
+    """
+    tokens = MESSAGE_OVERHEAD_TOKENS + count_tokens(message.get("content") or "", model)
+    for tool_call in message.get("tool_calls") or []:
+        function = tool_call["function"] if isinstance(tool_call, dict) else tool_call.function
+        name = function["name"] if isinstance(function, dict) else function.name
+        arguments = function["arguments"] if isinstance(function, dict) else function.arguments
+        tokens += count_tokens(name, model) + count_tokens(arguments, model)
+    return tokens
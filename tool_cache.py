@@ -0,0 +1,146 @@
+"""
+TTL cache for tool results, with negative caching and stampede protection.
+
+The model asks for the same city's weather many times across turns and
+sessions. With a networked weather provider every one of those calls costs a
+round trip, so results are memoized in the agent's tool execution path:
+
+- Each tool opts in with a tool_registry.ToolCachePolicy, either at registration
+  (``@tool(cache=ToolCachePolicy(ttl=600))``) or per cache instance, which
+  overrides the registered one. Tools without a policy are never cached, so
+  tools with side effects are safe by default.
+- "Not found" results (an unknown city) are cached for a shorter negative TTL,
+  and transient failures (the weather service being down) are not cached at all.
+- Entries live in an LRU bounded by max_entries (response_cache.MemoryCacheBackend).
+- Concurrent misses for the same call share one execution through SingleFlight,
+  so a burst of identical lookups hits the data source once. Cancelling one
+  waiter in the burst, even the one running the call, doesn't fail the others.
+
+Calls are keyed with tool_prefetch.call_key, which ignores argument order,
+case and surrounding whitespace of string arguments.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from response_cache import MemoryCacheBackend
+from single_flight import SingleFlight
+from tool_prefetch import call_key
+from tool_registry import ToolCachePolicy
+
+
+class ToolResultCache:
+    """
+    Memoizes tool results in front of the tool registry.
+
+    Usage:
+        cache = ToolResultCache(policies={"get_weather": ToolCachePolicy(ttl=60)})
+        agents = [LLMAgent(tool_cache=cache) for _ in range(10)]
+    """
+
+    def __init__(self, max_entries: int = 1024, policies: Optional[Dict[str, ToolCachePolicy]] = None):
+        """
+        Args:
+            max_entries (int): Results kept before the least recently used are evicted
+            policies (Dict[str, ToolCachePolicy], optional): Per-tool policies overriding
+                the ones tools registered with
+        """
+        self.policies = dict(policies or {})
+        self._entries = MemoryCacheBackend(max_entries)
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "negative": 0, "uncached": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def policy(self, name: str, registered: Optional[ToolCachePolicy] = None) -> Optional[ToolCachePolicy]:
+        """The policy in force for a tool: this cache's override, else the registered one."""
+        return self.policies.get(name, registered)
+
+    def _lookup(self, key: str) -> Optional[str]:
+        result = self._entries.get(key)
+        self._count("hits" if result is not None else "misses")
+        return result
+
+    def _fill(self, key: str, execute: Callable[[], str], policy: ToolCachePolicy) -> str:
+        # A call that finished between our lookup and taking the lead has already stored its result
+        result = self._entries.get(key)
+        if result is None:
+            result = execute()
+            self._store(key, result, policy)
+        return result
+
+    def _store(self, key: str, result: str, policy: ToolCachePolicy):
+        if policy.is_error is not None and policy.is_error(result):
+            self._count("uncached")
+            return
+        ttl = policy.ttl
+        if policy.is_negative is not None and policy.is_negative(result):
+            self._count("negative")
+            ttl = policy.negative_ttl
+        self._entries.set(key, result, time.time() + ttl if ttl is not None else None)
+
+    def call(self, name: str, arguments: str, execute: Callable[[], str],
+             policy: Optional[ToolCachePolicy] = None) -> str:
+        """
+        Return the cached result of a tool call, running it on a miss.
+
+        Args:
+            name (str): Tool name from the model's tool call
+            arguments (str): JSON-encoded arguments from the model's tool call
+            execute (Callable): Runs the tool call
+            policy (ToolCachePolicy, optional): The tool's registered policy
+
+        Returns:
+            str: The tool's result
+        """
+        policy = self.policy(name, policy)
+        if policy is None:
+            return execute()
+        key = ":".join(call_key(name, arguments))
+        result = self._lookup(key)
+        if result is not None:
+            return result
+        return self._flight.do(key, lambda: self._fill(key, execute, policy))
+
+    async def acall(self, name: str, arguments: str, execute: Callable[[], Awaitable[str]],
+                    policy: Optional[ToolCachePolicy] = None) -> str:
+        """Async variant of call(); execute must return an awaitable."""
+        policy = self.policy(name, policy)
+        if policy is None:
+            return await execute()
+        key = ":".join(call_key(name, arguments))
+        result = self._lookup(key)
+        if result is not None:
+            return result
+
+        async def fill() -> str:
+            cached = self._entries.get(key)
+            if cached is not None:
+                return cached
+            result = await execute()
+            self._store(key, result, policy)
+            return result
+        # Each waiter's flight runs as its own task, so cancelling the waiter that leads
+        # the burst stops only its wait; the call still finishes for the others and the cache
+        return await asyncio.shield(asyncio.ensure_future(self._flight.ado(key, fill)))
+
+    def clear(self):
+        self._entries.clear()
+
+    def report(self) -> Dict[str, Any]:
+        """Counters for reporting."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "coalesced": self._flight.stats["coalesced"],
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries)
+        }
@@ -0,0 +1,84 @@
+"""
+Concurrent execution of the tool calls returned in one assistant turn.
+"""
+
+import asyncio
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Sequence
+
+
+class ToolExecutor:
+    """
+    Runs several tool calls at once so a turn takes as long as its slowest tool.
+
+    Sync tools run on a thread pool; async tools are awaited together with
+    asyncio.gather. Results always come back in the order of the tool calls,
+    so the tool messages line up with their tool_call_ids.
+    """
+
+    def __init__(self, max_parallel: int = 4):
+        """
+        Args:
+            max_parallel (int): Maximum number of tool calls running at the same time
+        """
+        self.max_parallel = max(1, max_parallel)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        """Thread pool for sync tools, created on first parallel use."""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="tool")
+            return self._pool
+
+    def run(self, execute: Callable[[Any], str], tool_calls: Sequence[Any]) -> List[str]:
+        """
+        Execute tool calls concurrently on the thread pool.
+
+        Args:
+            execute (Callable): Function that runs a single tool call and returns its result
+            tool_calls (Sequence): Tool calls from the assistant message
+
+        Returns:
+            List[str]: Tool results in the same order as tool_calls
+        """
+        if len(tool_calls) <= 1 or self.max_parallel == 1:
+            return [execute(tool_call) for tool_call in tool_calls]
+        return list(self.pool.map(execute, tool_calls))
+
+    async def arun(self, execute: Callable[[Any], Any], tool_calls: Sequence[Any]) -> List[str]:
+        """
+        Execute tool calls concurrently from an event loop.
+
+        Coroutine functions are awaited directly; plain functions are moved to
+        the thread pool so they don't block the loop.
+
+        Args:
+            execute (Callable): Sync or async function that runs a single tool call
+            tool_calls (Sequence): Tool calls from the assistant message
+
+        Returns:
+            List[str]: Tool results in the same order as tool_calls
+        """
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        loop = asyncio.get_running_loop()
+        is_async = inspect.iscoroutinefunction(execute)
+
+        async def run_one(tool_call):
+            async with semaphore:
+                if is_async:
+                    return await execute(tool_call)
+                return await loop.run_in_executor(self.pool, execute, tool_call)
+
+        return list(await asyncio.gather(*(run_one(tool_call) for tool_call in tool_calls)))
+
+    def shutdown(self):
+        """Release the worker threads."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
@@ -0,0 +1,131 @@
+"""
+Token-minimizing encodings for tool results sent back to the model.
+
+Tool results are JSON strings, and get_weather's are pretty-printed, so every
+tool message pays prompt tokens for indentation, quotes and escaped non-ASCII
+characters ("\\u00b0" for "°"). The agent re-encodes each result just before
+it becomes a tool message; the tool's own result, which the tool result cache
+stores and its policies inspect, is left untouched.
+
+Encodings:
+
+- RAW_ENCODING: the result exactly as the tool returned it.
+- COMPACT_JSON_ENCODING: the same JSON without whitespace or ASCII escapes.
+- ABBREVIATED_JSON_ENCODING: compact JSON with long, well-known keys shortened
+  ("temperature" -> "temp") to names the model still reads without a legend.
+- LINES_ENCODING: one "key: value" line per field; lists of objects (a batch
+  result's "results") become a table with one header line and a "|"-separated
+  row per entry, so their keys are sent once instead of once per entry.
+
+Results that aren't JSON (error messages such as "Unknown function: ...") are
+sent unchanged by every encoding. Tools that return a dict or list instead of a
+JSON string get the same encodings; RAW_ENCODING sends them as plain JSON. Tools pick their default with
+``@tool(output=...)``; an agent's ``tool_output`` overrides it for every tool.
+"""
+
+import json
+from functools import lru_cache
+from typing import Any, Dict, List
+
+RAW_ENCODING = "raw"
+COMPACT_JSON_ENCODING = "compact_json"
+ABBREVIATED_JSON_ENCODING = "abbreviated_json"
+LINES_ENCODING = "lines"
+
+ENCODINGS = (RAW_ENCODING, COMPACT_JSON_ENCODING, ABBREVIATED_JSON_ENCODING, LINES_ENCODING)
+
+# Keys shortened by ABBREVIATED_JSON_ENCODING; short ones ("wind") are already cheap
+KEY_ABBREVIATIONS = {
+    "location": "loc",
+    "temperature": "temp",
+    "condition": "cond",
+    "humidity": "hum",
+    "forecast": "fcst",
+    "requested_location": "asked",
+    "match_confidence": "conf",
+    "description": "desc",
+}
+
+
+def _compact(payload: Any) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _abbreviate(payload: Any) -> Any:
+    if isinstance(payload, dict):
+        return {KEY_ABBREVIATIONS.get(key, key): _abbreviate(value) for key, value in payload.items()}
+    if isinstance(payload, list):
+        return [_abbreviate(item) for item in payload]
+    return payload
+
+
+def _scalar(value: Any) -> str:
+    """A value on one line: strings as they are, anything else as compact JSON."""
+    if isinstance(value, str):
+        return " ".join(value.splitlines())
+    return _compact(value)
+
+
+def _table(rows: List[Dict[str, Any]]) -> List[str]:
+    """A header line of every key in first-seen order, then one "|"-separated row per entry."""
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    lines = ["|".join(columns)]
+    for row in rows:
+        lines.append("|".join(_scalar(row[key]).replace("|", "/") if key in row else "" for key in columns))
+    return lines
+
+
+def _lines(payload: Any) -> str:
+    if not isinstance(payload, dict):
+        return _compact(payload)
+    lines = []
+    for key, value in payload.items():
+        if isinstance(value, list) and value and all(isinstance(row, dict) for row in value):
+            lines.append(f"{key}:")
+            lines.extend(_table(value))
+        else:
+            lines.append(f"{key}: {_scalar(value)}")
+    return "\n".join(lines)
+
+
+def encode_tool_result(result: Any, encoding: str = RAW_ENCODING) -> str:
+    """
+    Re-encode a tool result for its tool message.
+
+    String results repeat (the static weather table's payloads, cached lookups),
+    so their encodings are memoized; other results (dicts, lists) are encoded
+    directly, as they may not be hashable.
+
+    Args:
+        result (Any): The tool's result, normally a JSON string
+        encoding (str): One of ENCODINGS
+
+    Returns:
+        str: The encoded result, or a string result unchanged for RAW_ENCODING and non-JSON results
+    """
+    if isinstance(result, str):
+        return _encode_text(result, encoding)
+    if encoding == RAW_ENCODING:
+        return json.dumps(result, ensure_ascii=False, default=str)
+    return _encode_payload(result, encoding)
+
+
+@lru_cache(maxsize=1024)
+def _encode_text(result: str, encoding: str) -> str:
+    if encoding == RAW_ENCODING:
+        return result
+    try:
+        payload = json.loads(result)
+    except ValueError:
+        return result
+    return _encode_payload(payload, encoding)
+
+
+def _encode_payload(payload: Any, encoding: str) -> str:
+    if encoding == COMPACT_JSON_ENCODING:
+        return _compact(payload)
+    if encoding == ABBREVIATED_JSON_ENCODING:
+        return _compact(_abbreviate(payload))
+    if encoding == LINES_ENCODING:
+        return _lines(payload)
+    raise ValueError(f"Unknown tool output encoding: {encoding}")
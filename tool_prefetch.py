@@ -0,0 +1,203 @@
+"""
+Speculative tool prefetch while the planning LLM call is in flight.
+
+Tool execution normally starts only after the first completion returns its
+tool_calls. SpeculativePrefetcher guesses the likely calls from the user input
+(get_weather for every known location mentioned, or one get_weather_batch call
+for several of them when the agent offers that tool) and starts them on its own
+thread pool as the request is sent. When the model's tool calls arrive, matching
+ones reuse the prefetched results and the rest are discarded as waste.
+
+Wasted work is capped: once more than `waste_budget` of the recent speculative
+calls went unused, speculation pauses and only every `probe_every`-th turn
+speculates, so the prefetcher notices when its guesses become useful again.
+"""
+
+import json
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from intent_planner import extract_locations
+
+
+def _normalize_argument(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.lower().strip()
+    if isinstance(value, list):
+        return [_normalize_argument(item) for item in value]
+    return value
+
+
+def call_key(name: str, arguments: str) -> Tuple[str, str]:
+    """
+    Key identifying a tool call by what it computes.
+
+    String arguments, and strings in list arguments, are compared lowercased
+    and stripped, the same normalization get_weather applies to its location.
+    """
+    try:
+        args = json.loads(arguments or "{}")
+    except json.JSONDecodeError:
+        return name, arguments
+    if isinstance(args, dict):
+        args = {k: _normalize_argument(v) for k, v in args.items()}
+    return name, json.dumps(args, sort_keys=True)
+
+
+def guess_tool_calls(user_input: str, batch: bool = False) -> List[SimpleNamespace]:
+    """
+    Guess the tool calls the model is likely to make for a query.
+
+    Args:
+        user_input (str): The user's query
+        batch (bool): Guess one get_weather_batch call when several locations are mentioned
+
+    Returns:
+        List[SimpleNamespace]: Objects shaped like OpenAI tool calls (id, function.name, function.arguments)
+    """
+    turn = uuid.uuid4().hex[:12]
+    locations = extract_locations(user_input)
+    if batch and len(locations) > 1:
+        return [SimpleNamespace(
+            id=f"call_spec_{turn}_0", type="function",
+            function=SimpleNamespace(name="get_weather_batch", arguments=json.dumps({"locations": locations}))
+        )]
+    return [
+        SimpleNamespace(
+            id=f"call_spec_{turn}_{i}", type="function",
+            function=SimpleNamespace(name="get_weather", arguments=json.dumps({"location": location}))
+        )
+        for i, location in enumerate(locations)
+    ]
+
+
+class Prefetch:
+    """Speculative tool calls started for one turn."""
+
+    def __init__(self, prefetcher: "SpeculativePrefetcher", futures: Dict[Tuple[str, str], Future]):
+        self._prefetcher = prefetcher
+        self._futures = futures
+
+    def resolve(self, tool_calls: Optional[Sequence[Any]]) -> Dict[str, Future]:
+        """
+        Match the model's tool calls against the speculative ones.
+
+        Unmatched speculative calls are cancelled (or left to finish unused) and
+        counted as waste. Call this exactly once per turn, with the model's tool
+        calls or None when it made none.
+
+        Args:
+            tool_calls (Sequence, optional): The tool calls from the assistant message
+
+        Returns:
+            Dict[str, Future]: Prefetched results keyed by the model's tool_call ids
+        """
+        matched, used = {}, set()
+        for tool_call in tool_calls or []:
+            key = call_key(tool_call.function.name, tool_call.function.arguments)
+            if key in self._futures:
+                matched[tool_call.id] = self._futures[key]
+                used.add(key)
+        for key, future in self._futures.items():
+            if key not in used:
+                future.cancel()
+        self._prefetcher._record(
+            hits=len(matched), misses=len(tool_calls or []) - len(matched), wasted=len(self._futures) - len(used)
+        )
+        return matched
+
+
+class SpeculativePrefetcher:
+    """
+    Runs guessed tool calls concurrently with the planning LLM request.
+
+    Usage:
+        agent = LLMAgent(prefetcher=SpeculativePrefetcher(waste_budget=0.5))
+        ...
+        print(agent.prefetcher.report())
+    """
+
+    def __init__(self, max_workers: int = 4, max_guesses: int = 4, waste_budget: float = 0.5,
+                 window: int = 50, min_samples: int = 10, probe_every: int = 10):
+        """
+        Args:
+            max_workers (int): Threads for speculative calls, separate from the tool executor's pool
+            max_guesses (int): Most speculative calls started per turn
+            waste_budget (float): Highest share of recent speculative calls allowed to go unused
+            window (int): Number of recent speculative calls the waste ratio is computed over
+            min_samples (int): Calls needed in the window before the budget is enforced
+            probe_every (int): While over budget, speculate on one turn in this many
+        """
+        self.max_guesses = max_guesses
+        self.waste_budget = waste_budget
+        self.min_samples = min_samples
+        self.probe_every = probe_every
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._recent = deque(maxlen=window)  # True for a wasted speculative call
+        self._turns_paused = 0
+        self._lock = threading.Lock()
+        self.stats = {"turns": 0, "speculated": 0, "hits": 0, "misses": 0, "wasted": 0, "paused_turns": 0}
+
+    def over_budget(self) -> bool:
+        """Whether recent speculation wasted more than the budget allows."""
+        with self._lock:
+            if len(self._recent) < self.min_samples:
+                return False
+            return sum(self._recent) / len(self._recent) > self.waste_budget
+
+    def start(self, user_input: str, execute: Callable[[Any], str], batch: bool = False) -> Optional[Prefetch]:
+        """
+        Start the guessed tool calls for a turn.
+
+        Args:
+            user_input (str): The user's query
+            execute (Callable): Runs one tool call and returns its result
+            batch (bool): Guess one get_weather_batch call for queries about several
+                locations; only when the model is offered that tool
+
+        Returns:
+            Optional[Prefetch]: Handle to resolve once the model's tool calls are known,
+                or None when there is nothing to guess or speculation is paused
+        """
+        guesses = guess_tool_calls(user_input, batch)[:self.max_guesses]
+        if not guesses:
+            return None
+        if self.over_budget():
+            with self._lock:
+                self._turns_paused += 1
+                if self._turns_paused % self.probe_every:
+                    self.stats["paused_turns"] += 1
+                    return None
+        futures = {}
+        for guess in guesses:
+            futures[call_key(guess.function.name, guess.function.arguments)] = self._pool.submit(execute, guess)
+        with self._lock:
+            self.stats["turns"] += 1
+            self.stats["speculated"] += len(futures)
+        return Prefetch(self, futures)
+
+    def _record(self, hits: int, misses: int, wasted: int):
+        with self._lock:
+            self.stats["hits"] += hits
+            self.stats["misses"] += misses
+            self.stats["wasted"] += wasted
+            self._recent.extend([False] * hits + [True] * wasted)
+
+    def report(self) -> Dict[str, Any]:
+        """Counters plus hit rate (model tool calls served from prefetch) and waste rate."""
+        with self._lock:
+            stats = dict(self.stats)
+        calls = stats["hits"] + stats["misses"]
+        return {
+            **stats,
+            "hit_rate": round(stats["hits"] / calls, 3) if calls else 0.0,
+            "waste_rate": round(stats["wasted"] / stats["speculated"], 3) if stats["speculated"] else 0.0
+        }
+
+    def shutdown(self):
+        """Release the worker threads."""
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,365 @@
+"""
+Decorator-based tool registry.
+
+Tools register themselves with ``@tool``. At registration the function's
+signature, type hints and Google-style docstring are turned into the OpenAI
+function-calling schema, and an argument validator is compiled from the same
+type hints, so neither is recomputed per request. Dispatch is a dict lookup by
+tool name, and the list of tool definitions sent with every request is built
+once and reused until another tool registers. A tool can also register an
+async implementation, which aexecute() awaits so I/O-bound tools don't hold a
+worker thread in the async agent, a timeout that tool_runtime.ToolRuntime
+enforces, whether it is CPU-bound, which lets the runtime run it in a
+worker process instead of on a GIL-bound thread, and the encoding its results
+are sent to the model in (see tool_output). Opt-in tools (``@tool(opt_in=True)``)
+stay registered but are left out of the default tool list, so their schemas
+only cost prompt tokens for agents that ask for them.
+
+Usage:
+    @tool
+    def get_time(timezone: str) -> str:
+        \"\"\"
+        Get the current time.
+
+        Args:
+            timezone (str): IANA timezone name, e.g. 'Europe/London'
+        \"\"\"
+"""
+
+import asyncio
+import functools
+import inspect
+import json
+import re
+import threading
+import typing
+from dataclasses import dataclass
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+from tool_output import ENCODINGS, RAW_ENCODING
+
+_JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean", list: "array", dict: "object"}
+# Python types accepted for each JSON type (bool is excluded from numbers explicitly)
+_PY_TYPES = {"string": (str,), "integer": (int,), "number": (int, float), "boolean": (bool,),
+             "array": (list,), "object": (dict,)}
+
+_ARG_LINE = re.compile(r"^(\w+)\s*(?:\([^)]*\))?\s*:\s*(.+)$")
+
+
+class ToolArgumentError(ValueError):
+    """The model called a tool with arguments that don't match its schema."""
+
+
+@dataclass(frozen=True)
+class ToolCachePolicy:
+    """How long a tool's results may be reused by the tool result cache (tool_cache)."""
+
+    ttl: Optional[float] = 300.0        # Seconds a result stays valid, None for no expiry
+    negative_ttl: float = 30.0          # Seconds a "not found" result stays valid
+    is_negative: Optional[Callable[[str], bool]] = None  # Recognizes "not found" results
+    is_error: Optional[Callable[[str], bool]] = None     # Recognizes failures that must not be cached
+
+
+def _parse_docstring(doc: Optional[str]) -> Tuple[str, Dict[str, str]]:
+    """
+    Split a Google-style docstring into its summary and per-argument descriptions.
+
+    Returns:
+        Tuple[str, Dict[str, str]]: The first paragraph and {argument: description}
+    """
+    lines = inspect.cleandoc(doc or "").splitlines()
+    summary = []
+    for line in lines:
+        if not line.strip():
+            break
+        summary.append(line.strip())
+
+    arguments, current, section, base_indent = {}, None, None, None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            continue
+        indent = len(line) - len(line.lstrip())
+        if indent == 0 and stripped.endswith(":"):
+            section, current, base_indent = stripped[:-1], None, None
+            continue
+        if section not in ("Args", "Arguments", "Parameters"):
+            continue
+        base_indent = indent if base_indent is None else base_indent
+        match = _ARG_LINE.match(stripped)
+        if indent == base_indent and match:
+            current = match.group(1)
+            arguments[current] = match.group(2).strip()
+        elif current:
+            arguments[current] += " " + stripped
+    return " ".join(summary), arguments
+
+
+def _json_schema(annotation: Any) -> Tuple[Dict[str, Any], bool]:
+    """
+    Map a type hint to a JSON schema.
+
+    Returns:
+        Tuple[Dict[str, Any], bool]: The schema and whether the hint was Optional[...]
+    """
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Union and type(None) in args:
+        inner = [a for a in args if a is not type(None)]
+        schema, _ = _json_schema(inner[0] if len(inner) == 1 else Any)
+        return schema, True
+    if origin is typing.Literal:
+        return {"type": _JSON_TYPES.get(type(args[0]), "string"), "enum": list(args)}, False
+    if origin in (list, List):
+        schema = {"type": "array"}
+        if args:
+            schema["items"] = _json_schema(args[0])[0]
+        return schema, False
+    if origin in (dict, Dict):
+        return {"type": "object"}, False
+    if annotation in _JSON_TYPES:
+        return {"type": _JSON_TYPES[annotation]}, False
+    return {}, False
+
+
+def _compile_validator(name: str, properties: Dict[str, Dict[str, Any]],
+                       required: List[str]) -> Callable[[Dict[str, Any]], None]:
+    """Build the argument check for one tool from its schema."""
+    checks = []
+    for arg, schema in properties.items():
+        py_types = _PY_TYPES.get(schema.get("type"))
+        enum = tuple(schema["enum"]) if "enum" in schema else None
+        checks.append((arg, py_types, schema.get("type") in ("integer", "number"), enum))
+    required_set = frozenset(required)
+    known = frozenset(properties)
+
+    def validate(arguments: Dict[str, Any]):
+        missing = required_set.difference(arguments)
+        if missing:
+            raise ToolArgumentError(f"{name}: missing required argument(s) {sorted(missing)}")
+        unknown = set(arguments).difference(known)
+        if unknown:
+            raise ToolArgumentError(f"{name}: unexpected argument(s) {sorted(unknown)}")
+        for arg, py_types, numeric, enum in checks:
+            if arg not in arguments or arguments[arg] is None:
+                continue
+            value = arguments[arg]
+            if py_types and (not isinstance(value, py_types) or (numeric and isinstance(value, bool))):
+                raise ToolArgumentError(f"{name}: argument '{arg}' should be {py_types[-1].__name__}")
+            if enum is not None and value not in enum:
+                raise ToolArgumentError(f"{name}: argument '{arg}' must be one of {list(enum)}")
+    return validate
+
+
+@dataclass(frozen=True)
+class RegisteredTool:
+    """A tool function with its schema and compiled argument validator."""
+
+    name: str
+    function: Callable[..., Any]
+    definition: Dict[str, Any]
+    validate: Callable[[Dict[str, Any]], None]
+    async_function: Optional[Callable[..., Awaitable[Any]]] = None
+    cache: Optional[ToolCachePolicy] = None
+    timeout: Optional[float] = None
+    cpu_bound: bool = False
+    output: str = RAW_ENCODING
+    opt_in: bool = False
+
+
+class ToolRegistry:
+    """Tools available to the agent, keyed by name."""
+
+    def __init__(self):
+        self._tools: Dict[str, RegisteredTool] = {}
+        self._definitions: Optional[List[Dict[str, Any]]] = None
+        self._selections: Dict[FrozenSet[str], List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._tools)
+
+    def register(self, function: Callable[..., Any], name: Optional[str] = None,
+                 description: Optional[str] = None,
+                 async_function: Optional[Callable[..., Awaitable[Any]]] = None,
+                 cache: Optional[ToolCachePolicy] = None, timeout: Optional[float] = None,
+                 cpu_bound: bool = False, output: str = RAW_ENCODING, opt_in: bool = False) -> RegisteredTool:
+        """
+        Register a function as a tool, generating its schema and validator.
+
+        Args:
+            function (Callable): The tool implementation
+            name (str, optional): Tool name, defaults to the function name
+            description (str, optional): Overrides the docstring summary
+            async_function (Callable, optional): Coroutine function with the same signature,
+                used by aexecute()
+            cache (ToolCachePolicy, optional): Lets the tool result cache reuse results; tools
+                without one are never cached
+            timeout (float, optional): Seconds a call may take under a ToolRuntime, defaults
+                to the runtime's default timeout
+            cpu_bound (bool): Run in a worker process when the ToolRuntime has a process pool;
+                the function must be importable (module-level) from the worker
+            output (str): Encoding of the tool's results in tool messages, one of
+                tool_output.ENCODINGS; the tool itself still returns its usual string
+            opt_in (bool): Leave the tool out of `definitions`; agents offer it only when they
+                name it (definitions_with)
+
+        Returns:
+            RegisteredTool: The registered tool
+        """
+        name = name or function.__name__
+        if cpu_bound and "<locals>" in function.__qualname__:
+            raise ValueError(f"{name}: CPU-bound tools must be module-level functions so worker "
+                             f"processes can import them")
+        if output not in ENCODINGS:
+            raise ValueError(f"{name}: unknown output encoding {output!r}, expected one of {list(ENCODINGS)}")
+        summary, arg_docs = _parse_docstring(function.__doc__)
+        hints = typing.get_type_hints(function)
+        properties, required = {}, []
+        for param in inspect.signature(function).parameters.values():
+            if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+                continue
+            schema, optional = _json_schema(hints.get(param.name, Any))
+            if param.name in arg_docs:
+                schema["description"] = arg_docs[param.name]
+            properties[param.name] = schema
+            if param.default is param.empty and not optional:
+                required.append(param.name)
+
+        definition = {
+            "type": "function",
+            "function": {
+                "name": name,
+                "description": description or summary,
+                "parameters": {"type": "object", "properties": properties, "required": required}
+            }
+        }
+        registered = RegisteredTool(name, function, definition, _compile_validator(name, properties, required),
+                                    async_function, cache, timeout, cpu_bound, output, opt_in)
+        with self._lock:
+            self._tools[name] = registered
+            self._definitions = None
+            self._selections = {}
+        return registered
+
+    def tool(self, function: Optional[Callable[..., Any]] = None, *, name: Optional[str] = None,
+             description: Optional[str] = None, async_function: Optional[Callable[..., Awaitable[Any]]] = None,
+             cache: Optional[ToolCachePolicy] = None, timeout: Optional[float] = None,
+             cpu_bound: bool = False, output: str = RAW_ENCODING, opt_in: bool = False):
+        """Decorator form of register(); usable as @tool or @tool(name=...)."""
+        def decorate(fn):
+            self.register(fn, name=name, description=description, async_function=async_function, cache=cache,
+                          timeout=timeout, cpu_bound=cpu_bound, output=output, opt_in=opt_in)
+            return fn
+        return decorate(function) if function is not None else decorate
+
+    def get(self, name: str) -> Optional[RegisteredTool]:
+        return self._tools.get(name)
+
+    def definition(self, name: str) -> Dict[str, Any]:
+        """The function-calling schema of one tool."""
+        return self._tools[name].definition
+
+    @property
+    def definitions(self) -> List[Dict[str, Any]]:
+        """Schemas of all tools except opt-in ones, built once and shared; treat as read-only."""
+        definitions = self._definitions
+        if definitions is None:
+            with self._lock:
+                if self._definitions is None:
+                    self._definitions = [t.definition for t in self._tools.values() if not t.opt_in]
+                definitions = self._definitions
+        return definitions
+
+    def definitions_with(self, opt_in: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        Schemas of the default tools plus some opt-in ones.
+
+        Args:
+            opt_in (Iterable[str]): Names of opt-in tools to include
+
+        Returns:
+            List[Dict[str, Any]]: Schemas in registration order, built once per selection
+                and shared; treat as read-only
+        """
+        selected = frozenset(opt_in)
+        definitions = self._selections.get(selected)
+        if definitions is None:
+            with self._lock:
+                definitions = self._selections.setdefault(selected, [
+                    t.definition for t in self._tools.values() if not t.opt_in or t.name in selected
+                ])
+        return definitions
+
+    def _prepare(self, name: str, arguments: str) -> Union[str, Tuple[RegisteredTool, Dict[str, Any]]]:
+        """Look up and validate a tool call; returns an error message when it can't run."""
+        registered = self._tools.get(name)
+        if registered is None:
+            return f"Unknown function: {name}"
+        try:
+            parsed = json.loads(arguments or "{}")
+            if not isinstance(parsed, dict):
+                raise ToolArgumentError(f"{name}: arguments must be a JSON object")
+            registered.validate(parsed)
+        except (json.JSONDecodeError, ToolArgumentError) as e:
+            return f"Invalid arguments: {e}"
+        return registered, parsed
+
+    def check(self, name: str, arguments: str) -> Optional[str]:
+        """The error message execute() would return for a call that can't run, or None when it can."""
+        prepared = self._prepare(name, arguments)
+        return prepared if isinstance(prepared, str) else None
+
+    def execute(self, name: str, arguments: str) -> str:
+        """
+        Run a tool call.
+
+        Args:
+            name (str): Tool name from the model's tool call
+            arguments (str): JSON-encoded arguments from the model's tool call
+
+        Returns:
+            str: The tool's result, or an error message for unknown tools and invalid arguments
+        """
+        prepared = self._prepare(name, arguments)
+        if isinstance(prepared, str):
+            return prepared
+        registered, parsed = prepared
+        return registered.function(**parsed)
+
+    async def aexecute(self, name: str, arguments: str, executor: Optional[Executor] = None) -> str:
+        """
+        Run a tool call from an event loop.
+
+        The tool's async implementation is awaited when it has one; otherwise the
+        sync function runs on the executor so it doesn't block the loop.
+
+        Args:
+            name (str): Tool name from the model's tool call
+            arguments (str): JSON-encoded arguments from the model's tool call
+            executor (Executor, optional): Where sync tools run, defaults to the loop's executor
+
+        Returns:
+            str: The tool's result, or an error message for unknown tools and invalid arguments
+        """
+        prepared = self._prepare(name, arguments)
+        if isinstance(prepared, str):
+            return prepared
+        registered, parsed = prepared
+        if registered.async_function is not None:
+            return await registered.async_function(**parsed)
+        call = functools.partial(registered.function, **parsed)
+        return await asyncio.get_running_loop().run_in_executor(executor, call)
+
+
+# Registry used by the agent unless it is given another one
+default_registry = ToolRegistry()
+tool = default_registry.tool
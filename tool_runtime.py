@@ -0,0 +1,446 @@
+"""
+Deadlines, latency histograms and process isolation for tool execution.
+
+Without a limit, one hung tool call (a weather service that accepts the
+connection and never answers) stalls the whole chat turn. ToolRuntime runs
+every tool call against a deadline:
+
+- Async tool implementations are awaited under asyncio.wait_for, so an
+  overrunning call is cancelled.
+- Sync tools run on the runtime's own worker threads, never on the caller's
+  thread or the tool executor's pool. Python can't kill a thread, so an
+  overrunning sync call is abandoned: the caller gets its answer at the
+  deadline while the call finishes (or hangs) in the background. Once half the
+  workers are held by abandoned calls the pool is retired and a fresh one
+  takes new calls, so hung tools can't starve the rest.
+- With process_workers set, tools registered with ``@tool(cpu_bound=True)``
+  run in a pool of warm worker processes instead, so their computation doesn't
+  hold the GIL that every other session's threads and event loop need.
+  I/O-bound tools stay on threads and asyncio. Only strings cross the process
+  boundary: the tool's module and name, the model's JSON arguments as they
+  arrived and the tool's string result, so pickling costs little more than a
+  copy. Unlike a thread, a worker process stops an overrunning call itself
+  (a SIGALRM timer set to the call's deadline, where the platform has one), so
+  the worker is free again for the next call.
+
+A retired pool is shut down without waiting: the calls still running or queued
+on it, healthy ones included, are left to finish.
+
+A call that misses its deadline returns a structured JSON result
+({"tool", "error", "timed_out": true}) so the model can tell the user instead
+of the turn failing. Deadlines come from the runtime's per-tool overrides,
+else the timeout the tool registered with (``@tool(timeout=...)``), else the
+runtime's default.
+
+Every call's duration goes into a per-tool LatencyHistogram; report() and
+format_report() show which tools are slow.
+"""
+
+import asyncio
+import bisect
+import importlib
+import json
+import multiprocessing
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import (BrokenExecutor, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor,
+                                TimeoutError as FutureTimeoutError, wait)
+from typing import Any, Callable, Dict, Optional, Set, Tuple, Union
+
+from tool_registry import RegisteredTool, ToolRegistry
+
+# Upper bounds of the histogram buckets in milliseconds; slower calls land in an overflow bucket
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+
+class LatencyHistogram:
+    """Call durations counted in fixed log-spaced buckets: constant memory and O(log buckets) to record."""
+
+    def __init__(self, bounds_ms=BUCKET_BOUNDS_MS):
+        self.bounds_ms = tuple(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        ms = seconds * 1000
+        index = bisect.bisect_left(self.bounds_ms, ms)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Estimate a latency percentile.
+
+        Args:
+            p (float): Percentile between 0 and 100
+
+        Returns:
+            Optional[float]: Upper bound in ms of the bucket holding the percentile (the
+                largest duration seen for the overflow bucket), None before any call
+        """
+        with self._lock:
+            if not self.count:
+                return None
+            rank = p / 100 * self.count
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if count and seen >= rank:
+                    break
+            # No estimate exceeds the slowest call seen
+            bound = float(self.bounds_ms[index]) if index < len(self.bounds_ms) else self.max_ms
+            return round(min(bound, self.max_ms), 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Count, mean, p50/p95/p99 and max in ms, and the non-empty buckets."""
+        with self._lock:
+            counts, count, total_ms, max_ms = list(self.counts), self.count, self.total_ms, self.max_ms
+        labels = [f"<={bound}ms" for bound in self.bounds_ms] + [f">{self.bounds_ms[-1]}ms"]
+        return {
+            "count": count,
+            "mean_ms": round(total_ms / count, 2) if count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(max_ms, 2),
+            "buckets": {label: n for label, n in zip(labels, counts) if n}
+        }
+
+
+def timeout_result(name: str, timeout: float) -> str:
+    """The tool result returned to the model for a call that missed its deadline."""
+    return json.dumps({"tool": name, "error": f"{name} timed out after {timeout:g}s", "timed_out": True})
+
+
+def _worker_error_result(name: str) -> str:
+    return json.dumps({"tool": name, "error": f"{name} failed: its worker process exited"})
+
+
+# Functions a worker process has resolved, keyed by (module, qualified name)
+_worker_functions: Dict[Tuple[str, str], Callable[..., str]] = {}
+
+
+class _WorkerDeadline(BaseException):
+    """Raised in a worker process when its call overruns the deadline; not caught by a tool's `except Exception`."""
+
+
+def _deadline_exceeded(signum, frame):
+    raise _WorkerDeadline()
+
+
+def _init_worker():
+    # Ctrl-C is for the agent's process; workers are stopped with the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _deadline_exceeded)
+
+
+def _ping() -> int:
+    return 0
+
+
+def _run_in_worker(module: str, qualname: str, arguments: str, name: str = "",
+                   timeout: Optional[float] = None) -> str:
+    """Entry point in a worker process: import the tool function once, then call it until the deadline."""
+    function = _worker_functions.get((module, qualname))
+    if function is None:
+        # Spawned workers import the script run as __main__ under the name __mp_main__
+        target = sys.modules.get("__mp_main__") if module == "__main__" else None
+        target = target or importlib.import_module(module)
+        for attribute in qualname.split("."):
+            target = getattr(target, attribute)
+        function = _worker_functions[(module, qualname)] = target
+    if timeout is None or not hasattr(signal, "setitimer"):
+        return function(**json.loads(arguments or "{}"))
+    # The caller stops waiting at the deadline; stopping the call too frees this worker
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return function(**json.loads(arguments or "{}"))
+    except _WorkerDeadline:
+        return timeout_result(name, timeout)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class _WorkerPool:
+    """An executor that is replaced once abandoned (overrunning) calls hold half its workers."""
+
+    def __init__(self, create: Callable[[], Executor], workers: int, keep_warm: bool = False):
+        self._create = create
+        self.workers = workers
+        self._keep_warm = keep_warm
+        self._executor: Optional[Executor] = None
+        self._abandoned: Set[Future] = set()
+        self._lock = threading.Lock()
+
+    def _current(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._create()
+        return self._executor
+
+    def submit(self, function: Callable[..., Any], *args) -> Future:
+        with self._lock:
+            try:
+                return self._current().submit(function, *args)
+            except BrokenExecutor:
+                # A worker process died (killed, out of memory); start over with a fresh pool
+                self._executor = None
+                return self._current().submit(function, *args)
+
+    def warm(self):
+        """Start every worker now rather than on the first calls."""
+        wait([self.submit(_ping) for _ in range(self.workers)])
+
+    def abandon(self, future: Future) -> Optional[bool]:
+        """
+        Leave an overrunning call behind.
+
+        Returns:
+            Optional[bool]: None when the call hadn't started and was cancelled, True when
+                the pool was retired, False otherwise
+        """
+        if future.cancel():
+            return None
+        with self._lock:
+            if future.done():
+                # It finished between the deadline and now; nothing is left running
+                return False
+            self._abandoned.add(future)
+            if len(self._abandoned) * 2 >= self.workers and self._executor is not None:
+                self._retire()
+                return True
+        # Registered without the lock: a call that finishes meanwhile runs _release right here
+        future.add_done_callback(self._release)
+        return False
+
+    def _release(self, future: Future):
+        with self._lock:
+            self._abandoned.discard(future)
+
+    def _retire(self):
+        executor, self._executor, self._abandoned = self._executor, None, set()
+        # Other sessions' calls may be running or queued on it: its workers exit once they are done
+        executor.shutdown(wait=False)
+        if self._keep_warm:
+            # Start the replacement's workers now instead of on the next calls
+            replacement = self._current()
+            for _ in range(self.workers):
+                replacement.submit(_ping)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+class ToolRuntime:
+    """
+    Runs registry tool calls with deadlines and records their latency.
+
+    Usage:
+        runtime = ToolRuntime(default_timeout=10.0, timeouts={"get_weather": 5.0}, process_workers=4)
+        agent = LLMAgent(tool_runtime=runtime)
+        ...
+        print(runtime.format_report())
+    """
+
+    def __init__(self, default_timeout: Optional[float] = 30.0, timeouts: Optional[Dict[str, float]] = None,
+                 max_workers: int = 8, process_workers: int = 0):
+        """
+        Args:
+            default_timeout (float, optional): Deadline in seconds for tools that don't set one,
+                None for no limit
+            timeouts (Dict[str, float], optional): Per-tool deadlines overriding the ones tools
+                registered with
+            max_workers (int): Worker threads for sync tools
+            process_workers (int): Worker processes for CPU-bound tools, started (warm) right
+                away; 0 runs CPU-bound tools on the worker threads like any other sync tool
+        """
+        self.default_timeout = default_timeout
+        self.timeouts = dict(timeouts or {})
+        self.max_workers = max(1, max_workers)
+        self._threads = _WorkerPool(
+            lambda: ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tool-runtime"),
+            self.max_workers
+        )
+        self._processes: Optional[_WorkerPool] = None
+        if process_workers > 0:
+            # Spawned rather than forked: the agent's process has threads (pools, HTTP clients) mid-flight
+            context = multiprocessing.get_context("spawn")
+            self._processes = _WorkerPool(
+                lambda: ProcessPoolExecutor(max_workers=process_workers, mp_context=context,
+                                            initializer=_init_worker),
+                process_workers, keep_warm=True
+            )
+            self._processes.warm()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "process_calls": 0, "timeouts": 0, "errors": 0, "abandoned": 0,
+                      "retired_pools": 0}
+        self._tool_stats: Dict[str, Dict[str, int]] = {}
+
+    def timeout(self, registry: ToolRegistry, name: str) -> Optional[float]:
+        """The deadline in force for a tool: this runtime's override, else the registered one, else the default."""
+        if name in self.timeouts:
+            return self.timeouts[name]
+        registered = registry.get(name)
+        if registered is not None and registered.timeout is not None:
+            return registered.timeout
+        return self.default_timeout
+
+    def _in_process(self, registered: Optional[RegisteredTool]) -> bool:
+        return self._processes is not None and registered is not None and registered.cpu_bound
+
+    def _submit(self, registry: ToolRegistry, name: str, arguments: str) -> Union[str, Tuple[Future, _WorkerPool]]:
+        """Start a sync tool call on a worker thread or process; returns an error message when it can't run."""
+        registered = registry.get(name)
+        if not self._in_process(registered):
+            return self._threads.submit(registry.execute, name, arguments), self._threads
+        # Invalid calls are answered here instead of costing a round trip to a worker
+        error = registry.check(name, arguments)
+        if error is not None:
+            return error
+        with self._lock:
+            self.stats["process_calls"] += 1
+        function = registered.function
+        return self._processes.submit(_run_in_worker, function.__module__, function.__qualname__,
+                                      arguments, name, self.timeout(registry, name)), self._processes
+
+    def _abandon(self, future: Future, pool: _WorkerPool):
+        retired = pool.abandon(future)
+        if retired is None:
+            return
+        with self._lock:
+            self.stats["abandoned"] += 1
+            self.stats["retired_pools"] += retired
+
+    def _record(self, name: str, started: float, outcome: Optional[str] = None):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+                self._tool_stats[name] = {"timeouts": 0, "errors": 0}
+            self.stats["calls"] += 1
+            if outcome is not None:
+                self.stats[outcome] += 1
+                self._tool_stats[name][outcome] += 1
+        histogram.record(elapsed)
+
+    def execute(self, registry: ToolRegistry, name: str, arguments: str) -> str:
+        """
+        Run a tool call on a worker thread (or process) and wait for it until the deadline.
+
+        Args:
+            registry (ToolRegistry): Registry the tool is registered in
+            name (str): Tool name from the model's tool call
+            arguments (str): JSON-encoded arguments from the model's tool call
+
+        Returns:
+            str: The tool's result, or a timeout result when it missed the deadline
+        """
+        timeout = self.timeout(registry, name)
+        started = time.perf_counter()
+        submitted = self._submit(registry, name, arguments)
+        if isinstance(submitted, str):
+            self._record(name, started)
+            return submitted
+        future, pool = submitted
+        try:
+            result = future.result(timeout)
+        except FutureTimeoutError:
+            self._abandon(future, pool)
+            self._record(name, started, "timeouts")
+            return timeout_result(name, timeout)
+        except BrokenExecutor:
+            self._record(name, started, "errors")
+            return _worker_error_result(name)
+        except Exception:
+            self._record(name, started, "errors")
+            raise
+        self._record(name, started)
+        return result
+
+    async def aexecute(self, registry: ToolRegistry, name: str, arguments: str) -> str:
+        """
+        Run a tool call from an event loop until the deadline.
+
+        Async implementations are awaited and cancelled when they overrun; sync
+        tools run on the runtime's worker threads (or processes) and are abandoned.
+
+        Args:
+            registry (ToolRegistry): Registry the tool is registered in
+            name (str): Tool name from the model's tool call
+            arguments (str): JSON-encoded arguments from the model's tool call
+
+        Returns:
+            str: The tool's result, or a timeout result when it missed the deadline
+        """
+        timeout = self.timeout(registry, name)
+        started = time.perf_counter()
+        registered = registry.get(name)
+        future, pool = None, None
+        if registered is not None and registered.async_function is not None:
+            call = registry.aexecute(name, arguments)
+        else:
+            submitted = self._submit(registry, name, arguments)
+            if isinstance(submitted, str):
+                self._record(name, started)
+                return submitted
+            future, pool = submitted
+            call = asyncio.wrap_future(future)
+        try:
+            result = await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            if future is not None:
+                self._abandon(future, pool)
+            self._record(name, started, "timeouts")
+            return timeout_result(name, timeout)
+        except BrokenExecutor:
+            self._record(name, started, "errors")
+            return _worker_error_result(name)
+        except Exception:
+            self._record(name, started, "errors")
+            raise
+        self._record(name, started)
+        return result
+
+    def report(self) -> Dict[str, Any]:
+        """Runtime counters and, per tool, its latency histogram with timeouts and errors."""
+        with self._lock:
+            histograms = dict(self._histograms)
+            tool_stats = {name: dict(stats) for name, stats in self._tool_stats.items()}
+            stats = dict(self.stats)
+        return {
+            **stats,
+            "tools": {name: {**histogram.snapshot(), **tool_stats[name]} for name, histogram in histograms.items()}
+        }
+
+    def format_report(self) -> str:
+        """Human-readable per-tool latency report, slowest p95 first."""
+        report = self.report()
+        lines = [f"🧰 Tools: {report['calls']} calls ({report['process_calls']} in worker processes), "
+                 f"{report['timeouts']} timed out, {report['errors']} failed"]
+        for name, tool in sorted(report["tools"].items(), key=lambda item: -(item[1]["p95_ms"] or 0)):
+            lines.append(f"   {name}: {tool['count']} calls, p50 {tool['p50_ms']} ms, p95 {tool['p95_ms']} ms, "
+                         f"max {tool['max_ms']} ms, {tool['timeouts']} timeouts, {tool['errors']} errors")
+        return "\n".join(lines)
+
+    def shutdown(self):
+        """Release the worker threads and processes; abandoned thread calls are left to finish."""
+        self._threads.shutdown()
+        if self._processes is not None:
+            self._processes.shutdown()
+
+
+# Runtime used by the agent unless it is given another one; shared so the histograms cover the process
+default_runtime = ToolRuntime()
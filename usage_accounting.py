@@ -0,0 +1,197 @@
+"""
+Token usage and cost accounting for LLM calls.
+
+UsageAccountant records the prompt, completion and cached tokens of every LLM
+call together with its dollar cost from a configurable price table, tagged with
+the session and chat turn it belongs to. Totals can be read per call, per turn,
+per session and per model.
+
+Recording is lock-free: each thread appends to its own bucket, and buckets are
+only combined when a report is read. A lock is taken once per thread, the first
+time it records.
+"""
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class ModelPrice:
+    """USD per million tokens."""
+
+    input: float
+    cached_input: float
+    output: float
+
+
+# List prices; override or extend with UsageAccountant(prices={...})
+DEFAULT_PRICES = {
+    "gpt-4o": ModelPrice(input=2.50, cached_input=1.25, output=10.00),
+    "gpt-4o-mini": ModelPrice(input=0.15, cached_input=0.075, output=0.60),
+    "gpt-4.1": ModelPrice(input=2.00, cached_input=0.50, output=8.00),
+    "gpt-4.1-mini": ModelPrice(input=0.40, cached_input=0.10, output=1.60),
+    "gpt-3.5-turbo": ModelPrice(input=0.50, cached_input=0.50, output=1.50),
+}
+
+
+@dataclass(frozen=True)
+class CallUsage:
+    """Tokens and cost of one LLM call."""
+
+    session: str
+    turn: int
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    cached_tokens: int
+    cost: float
+
+
+class _Bucket:
+    """One thread's records; only that thread writes to it."""
+
+    def __init__(self, max_calls: int):
+        self.calls = deque(maxlen=max_calls)
+        # (session, turn, model) -> [calls, prompt, completion, cached, cost]
+        self.totals: Dict[Tuple[str, int, str], List[float]] = {}
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0, "cost": 0.0}
+
+
+class UsageAccountant:
+    """
+    Collects token usage and cost across agents and threads.
+
+    Usage:
+        accountant = UsageAccountant()
+        agent = LLMAgent(accountant=accountant)
+        ...
+        print(accountant.format_report())
+    """
+
+    def __init__(self, prices: Optional[Dict[str, ModelPrice]] = None, max_calls: int = 10000):
+        """
+        Args:
+            prices (Dict[str, ModelPrice], optional): Prices merged over DEFAULT_PRICES
+            max_calls (int): Per-call records kept per thread; totals are always exact
+        """
+        self.prices = {**DEFAULT_PRICES, **(prices or {})}
+        self.max_calls = max_calls
+        self._local = threading.local()
+        self._buckets: List[_Bucket] = []
+        self._register_lock = threading.Lock()
+
+    def _bucket(self) -> _Bucket:
+        bucket = getattr(self._local, "bucket", None)
+        if bucket is None:
+            bucket = self._local.bucket = _Bucket(self.max_calls)
+            with self._register_lock:
+                self._buckets.append(bucket)
+        return bucket
+
+    def price(self, model: str) -> Optional[ModelPrice]:
+        """
+        Look up a model's price, matching dated snapshots such as gpt-4o-2024-08-06
+        to the longest priced prefix.
+        """
+        if model in self.prices:
+            return self.prices[model]
+        matches = [name for name in self.prices if model.startswith(name + "-")]
+        return self.prices[max(matches, key=len)] if matches else None
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+        """Dollar cost of a call; unpriced models cost 0."""
+        price = self.price(model)
+        if price is None:
+            return 0.0
+        return ((prompt_tokens - cached_tokens) * price.input + cached_tokens * price.cached_input
+                + completion_tokens * price.output) / 1e6
+
+    def record(self, session: str, turn: int, model: str, usage) -> Optional[CallUsage]:
+        """
+        Record one LLM call.
+
+        Args:
+            session (str): Session id of the calling agent
+            turn (int): Chat turn number within the session
+            model (str): Model the request was sent to
+            usage: The usage object of a completion or of the final stream chunk
+
+        Returns:
+            Optional[CallUsage]: The recorded call, or None when the response had no usage
+        """
+        if usage is None:
+            return None
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None) or 0
+        call = CallUsage(session, turn, model, usage.prompt_tokens, usage.completion_tokens, cached_tokens,
+                         self.cost(model, usage.prompt_tokens, usage.completion_tokens, cached_tokens))
+
+        bucket = self._bucket()
+        bucket.calls.append(call)
+        totals = bucket.totals.setdefault((session, turn, model), [0, 0, 0, 0, 0.0])
+        totals[0] += 1
+        totals[1] += call.prompt_tokens
+        totals[2] += call.completion_tokens
+        totals[3] += call.cached_tokens
+        totals[4] += call.cost
+        return call
+
+    def calls(self) -> List[CallUsage]:
+        """Recent per-call records from every thread."""
+        with self._register_lock:
+            buckets = list(self._buckets)
+        return [call for bucket in buckets for call in list(bucket.calls)]
+
+    def totals(self, by: str = "model", session: Optional[str] = None) -> Dict[Any, Dict[str, Any]]:
+        """
+        Aggregate usage.
+
+        Args:
+            by (str): "model", "session" or "turn" (keys are (session, turn) pairs)
+            session (str, optional): Only include this session
+
+        Returns:
+            Dict[Any, Dict[str, Any]]: Calls, token counts and cost per group
+        """
+        index = {"session": lambda s, t, m: s, "turn": lambda s, t, m: (s, t), "model": lambda s, t, m: m}[by]
+        with self._register_lock:
+            buckets = list(self._buckets)
+        grouped: Dict[Any, Dict[str, Any]] = {}
+        for bucket in buckets:
+            for (s, t, m), (calls, prompt, completion, cached, cost) in list(bucket.totals.items()):
+                if session is not None and s != session:
+                    continue
+                group = grouped.setdefault(index(s, t, m), _empty_totals())
+                group["calls"] += calls
+                group["prompt_tokens"] += prompt
+                group["completion_tokens"] += completion
+                group["cached_tokens"] += cached
+                group["cost"] += cost
+        return grouped
+
+    def report(self, session: Optional[str] = None) -> Dict[str, Any]:
+        """Overall totals plus the breakdown per model and per session."""
+        by_model = self.totals("model", session)
+        overall = _empty_totals()
+        for group in by_model.values():
+            for field in overall:
+                overall[field] += group[field]
+        return {"total": overall, "by_model": by_model, "by_session": self.totals("session", session)}
+
+    def format_report(self, session: Optional[str] = None) -> str:
+        """Human-readable usage report."""
+        report = self.report(session)
+        total = report["total"]
+        lines = [f"💵 Usage: {total['calls']} LLM calls, {total['prompt_tokens']} prompt tokens "
+                 f"({total['cached_tokens']} cached), {total['completion_tokens']} completion tokens, "
+                 f"${total['cost']:.4f}"]
+        for model, group in sorted(report["by_model"].items()):
+            priced = "" if self.price(model) else " (no price)"
+            lines.append(f"   {model}: {group['calls']} calls, {group['prompt_tokens']} + "
+                         f"{group['completion_tokens']} tokens, ${group['cost']:.4f}{priced}")
+        return "\n".join(lines)
@@ -0,0 +1,195 @@
+"""
+Weather data providers behind the get_weather tool.
+
+get_weather asks the active provider for a location's weather. The default,
+StaticWeatherProvider (in weather_tool), serves the built-in demo table.
+HTTPWeatherProvider queries a weather service instead. It uses the process-wide
+pooled httpx clients, a timeout per attempt, and retries with jittered backoff
+for timeouts, connection errors, 429 and 5xx. The async agent calls aget(), which
+awaits the request on the event loop instead of holding a worker thread for
+the length of the request. get_batch()/aget_batch() look up several locations
+for the get_weather_batch tool; the HTTP provider sends those requests
+concurrently.
+
+The service is expected to answer ``GET {base_url}/weather?location=<name>``
+with the JSON payload for that location (benchmarks/stub_weather_server.py is
+a local stand-in).
+"""
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+from client_factory import get_async_http_client, get_http_client
+from resilience import RETRYABLE_STATUS_CODES, RetryPolicy
+
+# Worker threads an HTTP provider sends sync batch lookups' requests from
+BATCH_CONCURRENCY = 8
+
+
+def is_retryable_http(exc: BaseException) -> bool:
+    """Whether an httpx error from the weather service is worth retrying."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS_CODES or exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+def decode_payload(result: str) -> Dict[str, Any]:
+    """Decode a provider's JSON payload; anything but a JSON object becomes an error payload."""
+    try:
+        payload = json.loads(result)
+    except json.JSONDecodeError:
+        return {"error": "Malformed weather payload"}
+    return payload if isinstance(payload, dict) else {"error": "Malformed weather payload"}
+
+
+class WeatherProvider:
+    """Source of the JSON weather payloads returned by get_weather."""
+
+    def get(self, location: str) -> str:
+        """
+        Get the weather for a location.
+
+        Args:
+            location (str): The city or location, as given by the model
+
+        Returns:
+            str: JSON string containing weather information
+        """
+        raise NotImplementedError
+
+    async def aget(self, location: str) -> str:
+        """Async get(); providers without async I/O run get() on a worker thread."""
+        return await asyncio.get_running_loop().run_in_executor(None, self.get, location)
+
+    def get_batch(self, locations: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Get the weather for several locations.
+
+        Args:
+            locations (Sequence[str]): The cities or locations, as given by the model
+
+        Returns:
+            List[Dict[str, Any]]: Decoded payloads in the order of locations
+        """
+        return [decode_payload(self.get(location)) for location in locations]
+
+    async def aget_batch(self, locations: Sequence[str]) -> List[Dict[str, Any]]:
+        """Async get_batch(); the lookups run concurrently."""
+        results = await asyncio.gather(*(self.aget(location) for location in locations))
+        return [decode_payload(result) for result in results]
+
+
+class HTTPWeatherProvider(WeatherProvider):
+    """
+    Weather from an HTTP service, over the shared connection pools.
+
+    Failures that survive the retries are returned as a JSON payload with an
+    "error" field, so the model can tell the user instead of the turn failing.
+    A 404 means the service has no data for the location and is marked "not_found".
+
+    Usage:
+        set_weather_provider(HTTPWeatherProvider("http://localhost:8766"))
+    """
+
+    def __init__(self, base_url: str, retry: Optional[RetryPolicy] = None, api_key: Optional[str] = None,
+                 client: Optional[httpx.Client] = None, async_client: Optional[httpx.AsyncClient] = None):
+        """
+        Args:
+            base_url (str): Service root, e.g. "http://localhost:8766"
+            retry (RetryPolicy, optional): Attempts, backoff and per-attempt timeout,
+                defaults to 3 attempts with a 5 second timeout each
+            api_key (str, optional): Sent as a bearer token when set
+            client (httpx.Client, optional): Defaults to the shared pooled client
+            async_client (httpx.AsyncClient, optional): Defaults to the shared pooled async client
+        """
+        self.url = base_url.rstrip("/") + "/weather"
+        self.retry = retry or RetryPolicy(max_attempts=3, base_delay=0.1, max_delay=2.0, attempt_timeout=5.0)
+        self.headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self._client = client
+        self._async_client = async_client
+        self._lock = threading.Lock()
+        self._batch_pool: Optional[ThreadPoolExecutor] = None
+        self.stats = {"requests": 0, "retries": 0, "failures": 0}
+
+    @property
+    def batch_pool(self) -> ThreadPoolExecutor:
+        """Threads for sync batch lookups, created on first use and shared by every batch."""
+        with self._lock:
+            if self._batch_pool is None:
+                self._batch_pool = ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY,
+                                                      thread_name_prefix="weather-batch")
+            return self._batch_pool
+
+    @property
+    def client(self) -> httpx.Client:
+        return self._client or get_http_client()
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        return self._async_client or get_async_http_client()
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _request(self, location: str) -> Dict:
+        self._count("requests")
+        return {"url": self.url, "params": {"location": location}, "headers": self.headers,
+                "timeout": self.retry.attempt_timeout}
+
+    def _should_retry(self, attempt: int, exc: httpx.HTTPError) -> bool:
+        if attempt + 1 < self.retry.max_attempts and is_retryable_http(exc) and not self.retry.gives_up(exc):
+            self._count("retries")
+            return True
+        self._count("failures")
+        return False
+
+    @staticmethod
+    def _error(location: str, exc: httpx.HTTPError) -> str:
+        if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 404:
+            return json.dumps({"location": location, "error": f"No weather data for {location}", "not_found": True})
+        if isinstance(exc, httpx.HTTPStatusError):
+            reason = f"HTTP {exc.response.status_code}"
+        else:
+            reason = type(exc).__name__
+        return json.dumps({"location": location, "error": f"Weather service unavailable ({reason})"})
+
+    def get(self, location: str) -> str:
+        for attempt in range(self.retry.max_attempts):
+            try:
+                response = self.client.get(**self._request(location))
+                response.raise_for_status()
+                return response.text
+            except httpx.HTTPError as e:
+                if not self._should_retry(attempt, e):
+                    return self._error(location, e)
+                time.sleep(self.retry.delay(attempt, e))
+
+    async def aget(self, location: str) -> str:
+        for attempt in range(self.retry.max_attempts):
+            try:
+                response = await self.async_client.get(**self._request(location))
+                response.raise_for_status()
+                return response.text
+            except httpx.HTTPError as e:
+                if not self._should_retry(attempt, e):
+                    return self._error(location, e)
+                await asyncio.sleep(self.retry.delay(attempt, e))
+
+    def get_batch(self, locations: Sequence[str]) -> List[Dict[str, Any]]:
+        if len(locations) < 2:
+            return super().get_batch(locations)
+        return [decode_payload(result) for result in self.batch_pool.map(self.get, locations)]
+
+    def shutdown(self):
+        """Release the batch worker threads."""
+        with self._lock:
+            if self._batch_pool is not None:
+                self._batch_pool.shutdown(wait=False)
+                self._batch_pool = None
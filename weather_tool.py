@@ -1,92 +1,304 @@
 """
 Simple weather tool that returns hardcoded example data for demonstration purposes.
+
+The data comes from a pluggable provider (see weather_provider); the hardcoded
+table below is the default one. get_weather_batch answers multi-location
+questions ("Compare the weather between New York and Tokyo") with one tool call
+and one compact payload instead of a get_weather call and tool message per city.
+It is opt-in (LLMAgent(opt_in_tools=["get_weather_batch"])): its schema adds
+prompt tokens to every request that carries tools, which only pays off for
+multi-city questions.
+Both tools' results reach the model as "key: value" lines (a table for batches)
+rather than the JSON they return; see tool_output.
 """
 
 import json
-from typing import Dict, Any
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Sequence
+
+from location_resolver import LocationMatch, LocationResolver, normalize as normalize_location
+from tool_output import LINES_ENCODING
+from tool_registry import ToolCachePolicy, default_registry, tool
+from weather_provider import WeatherProvider, decode_payload
+
+
+# Hardcoded weather data for demonstration, keyed by normalized location name
+_WEATHER_ROWS = {
+    "san francisco": {
+        "location": "San Francisco, CA",
+        "temperature": "68°F (20°C)",
+        "condition": "Partly cloudy",
+        "humidity": "65%",
+        "wind": "12 mph NW",
+        "forecast": "Mild and pleasant with some clouds"
+    },
+    "new york": {
+        "location": "New York, NY",
+        "temperature": "72°F (22°C)",
+        "condition": "Sunny",
+        "humidity": "58%",
+        "wind": "8 mph SW",
+        "forecast": "Clear skies and comfortable temperatures"
+    },
+    "london": {
+        "location": "London, UK",
+        "temperature": "59°F (15°C)",
+        "condition": "Light rain",
+        "humidity": "78%",
+        "wind": "15 mph W",
+        "forecast": "Typical London weather with light showers"
+    },
+    "tokyo": {
+        "location": "Tokyo, Japan",
+        "temperature": "75°F (24°C)",
+        "condition": "Clear",
+        "humidity": "62%",
+        "wind": "6 mph E",
+        "forecast": "Beautiful clear day with mild temperatures"
+    }
+}
+
+# Read-only table and its JSON payloads, serialized once at import
+WEATHER_DATA = MappingProxyType({key: MappingProxyType(row) for key, row in _WEATHER_ROWS.items()})
+WEATHER_JSON = MappingProxyType({key: json.dumps(row, indent=2) for key, row in _WEATHER_ROWS.items()})
+
+# Every location get_weather has data for
+KNOWN_LOCATIONS = tuple(WEATHER_DATA)
+
+_ALIASES = {
+    "sf": "san francisco",
+    "san fran": "san francisco",
+    "nyc": "new york",
+    "ny": "new york",
+    "new york city": "new york",
+    "london england": "london",
+    "tokyo jp": "tokyo",
+}
+
+
+# Alias index: normalized name, display name ("San Francisco, CA") or alias -> table key
+LOCATION_INDEX = MappingProxyType({
+    **{normalize_location(alias): key for alias, key in _ALIASES.items()},
+    **{normalize_location(row["location"]): key for key, row in _WEATHER_ROWS.items()},
+    **{key: key for key in _WEATHER_ROWS},
+})
+
+
+def resolve_location(location: str) -> Optional[str]:
+    """
+    Resolve a location name or alias to its weather table key.
+    
+    Args:
+        location (str): Location as given by the user or the model, e.g. "NYC" or "Tokyo, Japan"
+        
+    Returns:
+        Optional[str]: The table key, or None for locations without data
+    """
+    key = LOCATION_INDEX.get(location.lower().strip())
+    if key is None:
+        key = LOCATION_INDEX.get(normalize_location(location))
+    return key
+
+
+# Fuzzy fallback for misspellings ("San Fransisco", "Tokio") over the same names
+LOCATION_RESOLVER = LocationResolver(LOCATION_INDEX)
+
+# Fuzzy matches below this confidence are treated as unknown locations
+FUZZY_MIN_CONFIDENCE = 0.8
+
+
+def match_location(location: str) -> Optional[LocationMatch]:
+    """
+    Find the closest known location for a name the alias index doesn't know.
+    
+    Args:
+        location (str): Location as given by the user or the model
+        
+    Returns:
+        Optional[LocationMatch]: The best match, or None when it is below FUZZY_MIN_CONFIDENCE
+    """
+    match = LOCATION_RESOLVER.resolve(location)
+    if match is None or match.confidence < FUZZY_MIN_CONFIDENCE:
+        return None
+    return match
+
+
+@lru_cache(maxsize=1024)
+def _matched_location_json(location: str) -> Optional[str]:
+    """Payload for a fuzzy match, noting what was asked for and how confident the match is."""
+    match = match_location(location)
+    if match is None:
+        return None
+    return json.dumps({
+        **_WEATHER_ROWS[match.key],
+        "requested_location": location,
+        "match_confidence": match.confidence
+    }, indent=2)
+
+
+@lru_cache(maxsize=1024)
+def _unknown_location_json(location: str) -> str:
+    """Default response for locations without data."""
+    return json.dumps({
+        "location": location,
+        "temperature": "72°F (22°C)",
+        "condition": "Unknown",
+        "humidity": "60%",
+        "wind": "10 mph",
+        "forecast": f"Weather data not available for {location}, but it's probably nice!"
+    }, indent=2)
+
+
+class StaticWeatherProvider(WeatherProvider):
+    """The hardcoded demo table, with alias and fuzzy location matching."""
+
+    def get(self, location: str) -> str:
+        # Resolve names and aliases ("SF", "Tokyo, Japan") to a table key in O(1)
+        location_key = resolve_location(location)
+        
+        # Payloads are serialized once at import
+        if location_key is not None:
+            return WEATHER_JSON[location_key]
+        # Misspellings fall back to the closest known location when the match is confident
+        return _matched_location_json(location) or _unknown_location_json(location)
+
+    async def aget(self, location: str) -> str:
+        # No I/O, so there is nothing to gain from a worker thread
+        return self.get(location)
+
+    def get_batch(self, locations: Sequence[str]) -> List[Dict[str, Any]]:
+        # Rows for indexed names are shallow copies of the table rows (flat dicts of strings),
+        # so nothing is decoded and callers can't alter the table; only names the index
+        # doesn't know take the fuzzy path
+        keys = [resolve_location(location) for location in locations]
+        return [dict(_WEATHER_ROWS[key]) if key is not None else json.loads(self.get(location))
+                for key, location in zip(keys, locations)]
+
+    async def aget_batch(self, locations: Sequence[str]) -> List[Dict[str, Any]]:
+        return self.get_batch(locations)
+
+
+_provider: WeatherProvider = StaticWeatherProvider()
+
+
+def get_weather_provider() -> WeatherProvider:
+    """The provider get_weather currently reads from."""
+    return _provider
 
 
+def set_weather_provider(provider: Optional[WeatherProvider] = None) -> WeatherProvider:
+    """
+    Replace the provider behind get_weather.
+    
+    Args:
+        provider (WeatherProvider, optional): The new provider, None restores the static table
+        
+    Returns:
+        WeatherProvider: The provider that was active before
+    """
+    global _provider
+    previous, _provider = _provider, provider or StaticWeatherProvider()
+    return previous
+
+
+def _rows(result: str) -> List[Dict[str, Any]]:
+    """The per-location payloads of a get_weather or get_weather_batch result."""
+    payload = decode_payload(result)
+    rows = payload.get("results")
+    return [row for row in rows if isinstance(row, dict)] if isinstance(rows, list) else [payload]
+
+
+def _is_unknown_location(result: str) -> bool:
+    """The static table's default response, or the weather service's 404, for any location."""
+    return any(row.get("condition") == "Unknown" or row.get("not_found") for row in _rows(result))
+
+
+def _is_service_error(result: str) -> bool:
+    """A provider failure worth retrying on the next call rather than caching."""
+    return any("error" in row and not row.get("not_found") for row in _rows(result))
+
+
+# Weather changes slowly; results with an unknown location are remembered briefly in case data appears
+WEATHER_CACHE_POLICY = ToolCachePolicy(ttl=600.0, negative_ttl=60.0,
+                                       is_negative=_is_unknown_location, is_error=_is_service_error)
+
+
+async def aget_weather(location: str) -> str:
+    """Async get_weather, used by the async agent so HTTP providers don't block a thread."""
+    return await _provider.aget(location)
+
+
+# Deadline for one call under the tool runtime: the HTTP provider's three 5 s attempts and their backoff
+WEATHER_TOOL_TIMEOUT = 20.0
+
+
+@tool(async_function=aget_weather, cache=WEATHER_CACHE_POLICY, timeout=WEATHER_TOOL_TIMEOUT,
+      output=LINES_ENCODING)
 def get_weather(location: str) -> str:
     """
-    Get weather information for a given location.
+    Get current weather information for a specific location
     
     Args:
-        location (str): The location to get weather for
+        location (str): The city or location to get weather for (e.g., 'San Francisco', 'New York', 'London')
         
     Returns:
         str: JSON string containing weather information
     """
 
     #TODO - add tool call instrumentation here (OPTIONAL)
-    # Hardcoded weather data for demonstration
-    weather_data = {
-        "san francisco": {
-            "location": "San Francisco, CA",
-            "temperature": "68°F (20°C)",
-            "condition": "Partly cloudy",
-            "humidity": "65%",
-            "wind": "12 mph NW",
-            "forecast": "Mild and pleasant with some clouds"
-        },
-        "new york": {
-            "location": "New York, NY",
-            "temperature": "72°F (22°C)",
-            "condition": "Sunny",
-            "humidity": "58%",
-            "wind": "8 mph SW",
-            "forecast": "Clear skies and comfortable temperatures"
-        },
-        "london": {
-            "location": "London, UK",
-            "temperature": "59°F (15°C)",
-            "condition": "Light rain",
-            "humidity": "78%",
-            "wind": "15 mph W",
-            "forecast": "Typical London weather with light showers"
-        },
-        "tokyo": {
-            "location": "Tokyo, Japan",
-            "temperature": "75°F (24°C)",
-            "condition": "Clear",
-            "humidity": "62%",
-            "wind": "6 mph E",
-            "forecast": "Beautiful clear day with mild temperatures"
-        }
-    }
-    
-    # Normalize location to lowercase for lookup
-    location_key = location.lower().strip()
+    return _provider.get(location)
+
+
+# Tool definition for OpenAI function calling, generated from the signature and docstring above
+WEATHER_TOOL_DEFINITION = default_registry.definition("get_weather")
+
+# Distinct locations one get_weather_batch call may look up
+MAX_BATCH_LOCATIONS = 20
+
+
+def _unique_locations(locations: Sequence[Any]) -> List[str]:
+    """Drop repeated locations ("Tokyo", " tokyo "), keeping the first spelling of each."""
+    unique = {}
+    for location in locations:
+        location = str(location).strip()
+        unique.setdefault(normalize_location(location), location)
+    return list(unique.values())
+
+
+def _batch_json(rows: Sequence[Dict[str, Any]]) -> str:
+    """One compact payload for all locations: no indentation or escaped non-ASCII characters."""
+    return json.dumps({"results": list(rows)}, ensure_ascii=False, separators=(",", ":"))
+
+
+def _too_many_locations_json(count: int) -> str:
+    return json.dumps({"error": f"{count} locations requested, at most {MAX_BATCH_LOCATIONS} per call"})
+
+
+async def aget_weather_batch(locations: List[str]) -> str:
+    """Async get_weather_batch; the HTTP provider looks the locations up concurrently."""
+    unique = _unique_locations(locations)
+    if len(unique) > MAX_BATCH_LOCATIONS:
+        return _too_many_locations_json(len(unique))
+    return _batch_json(await _provider.aget_batch(unique))
+
+
+@tool(async_function=aget_weather_batch, cache=WEATHER_CACHE_POLICY, timeout=WEATHER_TOOL_TIMEOUT,
+      output=LINES_ENCODING, opt_in=True)
+def get_weather_batch(locations: List[str]) -> str:
+    """
+    Get current weather for several locations in one call; use instead of repeated get_weather calls
     
-    # Check if we have data for this location
-    if location_key in weather_data:
-        return json.dumps(weather_data[location_key], indent=2)
-    else:
-        # Default response for unknown locations
-        return json.dumps({
-            "location": location,
-            "temperature": "72°F (22°C)",
-            "condition": "Unknown",
-            "humidity": "60%",
-            "wind": "10 mph",
-            "forecast": f"Weather data not available for {location}, but it's probably nice!"
-        }, indent=2)
-
-
-# Tool definition for OpenAI function calling
-WEATHER_TOOL_DEFINITION = {
-    "type": "function",
-    "function": {
-        "name": "get_weather",
-        "description": "Get current weather information for a specific location",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "location": {
-                    "type": "string",
-                    "description": "The city or location to get weather for (e.g., 'San Francisco', 'New York', 'London')"
-                }
-            },
-            "required": ["location"]
-        }
-    }
-} 
\ No newline at end of file
+    Args:
+        locations (List[str]): Cities or locations, e.g. ['New York', 'Tokyo']
+        
+    Returns:
+        str: Compact JSON string with a "results" list, one weather entry per distinct location
+    """
+    unique = _unique_locations(locations)
+    if len(unique) > MAX_BATCH_LOCATIONS:
+        return _too_many_locations_json(len(unique))
+    return _batch_json(_provider.get_batch(unique))
+
+
+WEATHER_BATCH_TOOL_DEFINITION = default_registry.definition("get_weather_batch")